@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+合成项目目录
+确定性地生成任意规模的MCP项目数据，用于基准测试和离线的GitHub API模拟
+
+- 分类、标签、语言和词汇按Zipf分布抽取，少数热门取值覆盖大部分项目
+- star数服从帕累托分布，fork数与star数相关
+- README包含标题、段落、安装命令、链接和徽章，长度服从对数正态分布
+相同的种子和编号总是生成相同的项目，单个项目可以按编号随机访问。
+
+用法:
+    python benchmarks/catalogue.py --projects 1000 --output catalogue.ndjson
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Sequence
+
+CATEGORIES = [
+    "Databases", "Browser Automation", "File Systems", "Developer Tools", "Search", "Cloud Platforms",
+    "Communication", "Knowledge & Memory", "Finance", "Monitoring", "Security", "Data Science",
+    "Version Control", "Location Services", "Media", "Customer Data", "Gaming", "Research",
+    "Sports", "Travel", "Marketing", "Legal", "Healthcare", "Education",
+]
+TAGS = [
+    "python", "typescript", "sqlite", "postgres", "docker", "kubernetes", "aws", "gcp", "azure",
+    "github", "slack", "discord", "notion", "obsidian", "vector", "embeddings", "rag", "llm",
+    "browser", "playwright", "puppeteer", "filesystem", "git", "api", "cli", "rust", "go",
+    "redis", "mongodb", "mysql", "elasticsearch", "weather", "maps", "calendar", "email",
+    "jira", "linear", "sentry", "grafana", "prometheus", "stripe", "shopify", "youtube", "spotify",
+]
+LANGUAGES = ["Python", "TypeScript", "JavaScript", "Go", "Rust", "Java", "C#", "Kotlin", "Ruby", "Swift", ""]
+VOCABULARY = (
+    "server tool client model context protocol query database file directory search browser page "
+    "fetch scrape index vector memory store cache api endpoint request response token auth "
+    "config deploy container cluster cloud bucket storage event stream message channel user "
+    "repository commit branch issue pull review test build release metric log trace alert "
+    "schema table row column document embedding retrieval prompt agent workflow task schedule "
+    "image audio video transcript translate summarize analyze report dashboard chart map route"
+).split()
+
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+_CATEGORY_WEIGHTS = _zipf_weights(len(CATEGORIES))
+_TAG_WEIGHTS = _zipf_weights(len(TAGS))
+_LANGUAGE_WEIGHTS = _zipf_weights(len(LANGUAGES), 1.4)
+_WORD_WEIGHTS = _zipf_weights(len(VOCABULARY), 0.9)
+_EPOCH = datetime(2024, 11, 25)
+
+
+def _pick(rng: random.Random, values: Sequence[str], cumulative: List[float]) -> str:
+    return values[bisect_left(cumulative, rng.random() * cumulative[-1])]
+
+
+def _sample(rng: random.Random, values: Sequence[str], cumulative: List[float], count: int) -> List[str]:
+    picked: List[str] = []
+    while len(picked) < count:
+        value = _pick(rng, values, cumulative)
+        if value not in picked:
+            picked.append(value)
+    return picked
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    words = [_pick(rng, VOCABULARY, _WORD_WEIGHTS) for _ in range(length)]
+    return " ".join(words).capitalize() + "."
+
+
+def generate_readme(rng: random.Random, name: str, owner: str, size: int) -> str:
+    """
+    生成接近真实结构的README
+
+    Args:
+        rng: 随机数生成器
+        name: 项目名称
+        owner: 仓库所有者
+        size: 目标长度（字节）
+
+    Returns:
+        str: Markdown文本
+    """
+    parts = [
+        f"# {name}",
+        f"[![npm](https://img.shields.io/npm/v/{name}.svg)](https://www.npmjs.com/package/{name}) "
+        f"[![License](https://img.shields.io/badge/license-MIT-blue.svg)](LICENSE)",
+        _sentence(rng, rng.randint(12, 30)),
+        "## Installation",
+        "```bash",
+        f"npx -y {name}" if rng.random() < 0.5 else f"pip install {name}",
+        "```",
+    ]
+    length = sum(len(part) + 2 for part in parts)
+    section = 0
+    while length < size:
+        section += 1
+        if section % 3 == 1:
+            heading = f"## {_sentence(rng, rng.randint(1, 3))[:-1]}"
+            parts.append(heading)
+            length += len(heading) + 2
+        paragraph = _sentence(rng, rng.randint(20, 80))
+        if rng.random() < 0.3:
+            paragraph += f" See [{owner}/{name}](https://github.com/{owner}/{name}) for details."
+        if rng.random() < 0.2:
+            items = "\n".join(f"- {_sentence(rng, rng.randint(3, 10))}" for _ in range(rng.randint(2, 6)))
+            paragraph += "\n\n" + items
+        parts.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(parts) + "\n"
+
+
+def generate_project(index: int, seed: int = 0, readme_size: int = 4096) -> Dict:
+    """
+    生成编号为index的项目，结果只取决于seed和index
+
+    Args:
+        index: 项目编号
+        seed: 目录种子
+        readme_size: README长度的中位数（字节），0表示不生成README
+
+    Returns:
+        Dict: 可直接用于ProjectService.upsert_projects的项目数据，另含owner和pushed_at
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    owner = f"owner{index % 997}"
+    name = f"mcp-{_pick(rng, TAGS, _TAG_WEIGHTS)}-{_pick(rng, VOCABULARY, _WORD_WEIGHTS)}-{index}"
+    stars = int(rng.paretovariate(1.2)) - 1
+    categories = _sample(rng, CATEGORIES, _CATEGORY_WEIGHTS, 1 + (rng.random() < 0.3))
+    tags = _sample(rng, TAGS, _TAG_WEIGHTS, rng.randint(0, 4))
+    size = int(readme_size * math.exp(rng.gauss(0, 0.6))) if readme_size else 0
+    return {
+        "name": name,
+        "owner": owner,
+        "description": _sentence(rng, rng.randint(6, 18)),
+        "repo_url": f"https://github.com/{owner}/{name}",
+        "readme_content": generate_readme(rng, name, owner, size) if size else "",
+        "stars": stars,
+        "forks": int(stars * rng.uniform(0.02, 0.2)),
+        "language": _pick(rng, LANGUAGES, _LANGUAGE_WEIGHTS) or None,
+        "categories": categories,
+        "tags": tags,
+        "pushed_at": (_EPOCH + timedelta(minutes=rng.randint(0, 60 * 24 * 365))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+
+def generate_catalogue(count: int, seed: int = 0, readme_size: int = 4096, start: int = 0) -> Iterator[Dict]:
+    """
+    依次生成编号为[start, start + count)的项目
+
+    Args:
+        count: 项目数
+        seed: 目录种子
+        readme_size: README长度的中位数（字节）
+        start: 起始编号
+
+    Yields:
+        Dict: 项目数据
+    """
+    for index in range(start, start + count):
+        yield generate_project(index, seed, readme_size)
+
+
+def query_workload(count: int, seed: int = 0) -> List[str]:
+    """
+    生成查询负载：单词、多词、前缀、短语和少量无结果的查询
+
+    Args:
+        count: 查询数
+        seed: 种子
+
+    Returns:
+        List[str]: 查询列表
+    """
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            query = _pick(rng, VOCABULARY, _WORD_WEIGHTS)
+        elif roll < 0.7:
+            query = f"{_pick(rng, TAGS, _TAG_WEIGHTS)} {_pick(rng, VOCABULARY, _WORD_WEIGHTS)}"
+        elif roll < 0.8:
+            query = _pick(rng, VOCABULARY, _WORD_WEIGHTS)[:3] + "*"
+        elif roll < 0.95:
+            query = f'"{_pick(rng, VOCABULARY, _WORD_WEIGHTS)} {_pick(rng, VOCABULARY, _WORD_WEIGHTS)}"'
+        else:
+            query = f"zz{rng.randint(0, 10**6)}"
+        queries.append(query)
+    return queries
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic MCP project catalogue as NDJSON")
+    parser.add_argument("--projects", type=int, default=1000, help="number of projects")
+    parser.add_argument("--seed", type=int, default=0, help="catalogue seed")
+    parser.add_argument("--readme-size", type=int, default=4096, help="median README size in bytes")
+    parser.add_argument("--output", help="output file, defaults to stdout")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for project in generate_catalogue(args.projects, args.seed, args.readme_size):
+            output.write(json.dumps(project, ensure_ascii=False) + "\n")
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地GitHub API模拟服务
+基于合成目录实现爬虫用到的搜索、仓库信息和README接口，用于离线测试和基准测试抓取流程
+
+- 搜索结果按star数降序分页，total_count与真实API一样最多返回1000条
+- 响应带ETag，If-None-Match命中时返回304，可以测量条件请求缓存的效果
+- 可配置的固定延迟，模拟网络往返
+
+用法:
+    python benchmarks/fake_github.py --projects 1000 --port 8765 --latency 0.02
+    然后在配置中设置 github.api_base_url: "http://127.0.0.1:8765"
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from catalogue import generate_project
+
+SEARCH_RESULT_LIMIT = 1000
+
+
+class FakeGitHub:
+    """
+    GitHub API模拟服务
+
+    项目按需生成，只缓存按star数排序的搜索顺序，内存占用与README大小无关。
+    """
+
+    def __init__(self, projects: int, seed: int = 0, readme_size: int = 4096, latency: float = 0.0):
+        """
+        初始化模拟服务
+
+        Args:
+            projects: 目录中的项目数
+            seed: 目录种子
+            readme_size: README长度的中位数（字节）
+            latency: 每个请求的固定延迟（秒）
+        """
+        self.projects = projects
+        self.seed = seed
+        self.readme_size = readme_size
+        self.latency = latency
+        self.requests: Dict[str, int] = {"search": 0, "repo": 0, "readme": 0, "not_modified": 0}
+        self._order = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def _project(self, index: int) -> Dict:
+        return generate_project(index, self.seed, self.readme_size)
+
+    def _search_order(self):
+        if self._order is None:
+            stars = [(self._project(index)["stars"], index) for index in range(self.projects)]
+            self._order = [index for _, index in sorted(stars, reverse=True)]
+        return self._order
+
+    def _index_from_repo(self, repo: str) -> Optional[int]:
+        try:
+            index = int(repo.rsplit("-", 1)[-1])
+        except ValueError:
+            return None
+        return index if 0 <= index < self.projects else None
+
+    async def _respond(self, request: web.Request, body: Dict) -> web.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        payload = json.dumps(body).encode("utf-8")
+        etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+        headers = {
+            "ETag": etag,
+            "X-RateLimit-Remaining": "5000",
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+        }
+        if request.headers.get("If-None-Match") == etag:
+            self.requests["not_modified"] += 1
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=payload, content_type="application/json", headers=headers)
+
+    async def search(self, request: web.Request) -> web.Response:
+        self.requests["search"] += 1
+        page = int(request.query.get("page", 1))
+        per_page = min(int(request.query.get("per_page", 30)), 100)
+        order = self._search_order()[:SEARCH_RESULT_LIMIT]
+        items = []
+        for index in order[(page - 1) * per_page:page * per_page]:
+            project = self._project(index)
+            items.append({
+                "full_name": f"{project['owner']}/{project['name']}",
+                "name": project["name"],
+                "html_url": project["repo_url"],
+                "description": project["description"],
+                "stargazers_count": project["stars"],
+                "forks_count": project["forks"],
+                "language": project["language"],
+                "pushed_at": project["pushed_at"],
+                "updated_at": project["pushed_at"],
+            })
+        return await self._respond(request, {"total_count": self.projects, "items": items})
+
+    async def repo(self, request: web.Request) -> web.Response:
+        self.requests["repo"] += 1
+        index = self._index_from_repo(request.match_info["repo"])
+        if index is None:
+            return web.json_response({"message": "Not Found"}, status=404)
+        project = self._project(index)
+        return await self._respond(request, {
+            "full_name": f"{project['owner']}/{project['name']}",
+            "stargazers_count": project["stars"],
+            "forks_count": project["forks"],
+            "language": project["language"],
+            "pushed_at": project["pushed_at"],
+        })
+
+    async def readme(self, request: web.Request) -> web.Response:
+        self.requests["readme"] += 1
+        index = self._index_from_repo(request.match_info["repo"])
+        if index is None:
+            return web.json_response({"message": "Not Found"}, status=404)
+        content = self._project(index)["readme_content"].encode("utf-8")
+        return await self._respond(request, {"encoding": "base64", "content": base64.b64encode(content).decode("ascii")})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/search/repositories", self.search)
+        app.router.add_get("/repos/{owner}/{repo}", self.repo)
+        app.router.add_get("/repos/{owner}/{repo}/readme", self.readme)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        启动服务
+
+        Args:
+            host: 监听地址
+            port: 端口，0表示随机分配
+
+        Returns:
+            str: API基础URL
+        """
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """停止服务"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve(args):
+    fake = FakeGitHub(args.projects, args.seed, args.readme_size, args.latency)
+    url = await fake.start(port=args.port)
+    print(f"Fake GitHub API serving {args.projects} projects at {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic catalogue through a fake GitHub API")
+    parser.add_argument("--projects", type=int, default=1000, help="number of projects")
+    parser.add_argument("--seed", type=int, default=0, help="catalogue seed")
+    parser.add_argument("--readme-size", type=int, default=4096, help="median README size in bytes")
+    parser.add_argument("--latency", type=float, default=0.0, help="fixed delay per request in seconds")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+README解析基准测试
+对比基于BeautifulSoup的旧解析器与单遍Markdown解析器的耗时和提取结果
+
+用法:
+    python benchmarks/readme_parser_bench.py [--corpus DIR] [--repeat N] [--batch N] [--workers N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from mcp_search_server.utils.readme_parser import parse_readme, parse_readmes  # noqa: E402
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "readmes"
+
+
+def legacy_parse_readme(content: str) -> Dict:
+    """旧版GitHubCrawler.parse_readme_content的实现，作为对比基线"""
+    soup = BeautifulSoup(content, 'html.parser')
+    title = soup.find('h1')
+    title = title.text.strip() if title else ""
+    description = ""
+    for p in soup.find_all('p'):
+        if len(p.text.strip()) > 30:
+            description = p.text.strip()
+            break
+    categories = [h2.text.strip() for h2 in soup.find_all('h2')]
+    links = [a['href'] for a in soup.find_all('a', href=True) if 'github.com' in a['href']]
+    return {
+        "title": title,
+        "description": description,
+        "categories": categories,
+        "tags": [],
+        "related_links": links
+    }
+
+
+def load_corpus(extra_dir: str = None) -> Dict[str, str]:
+    """加载README语料：自带样例、仓库中的Markdown文档以及可选的外部目录"""
+    paths = sorted(FIXTURE_DIR.glob("*.md"))
+    paths += [ROOT / "README.md", ROOT / "demo" / "MCP_README.md"]
+    if extra_dir:
+        paths += sorted(Path(extra_dir).rglob("*.md"))
+    return {str(path.relative_to(ROOT) if path.is_relative_to(ROOT) else path): path.read_text(encoding="utf-8")
+            for path in paths if path.is_file()}
+
+
+def time_parser(parser: Callable[[str], Dict], documents: List[str], repeat: int) -> float:
+    """返回解析全部文档的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            parser(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="README parser benchmark")
+    parser.add_argument("--corpus", help="additional directory of README .md files")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions, best run is reported")
+    parser.add_argument("--batch", type=int, default=2000, help="number of READMEs in the batch benchmark")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size for the batch benchmark")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    documents = list(corpus.values())
+    total_kb = sum(len(document.encode("utf-8")) for document in documents) / 1024
+    print(f"corpus: {len(documents)} READMEs, {total_kb:.1f} KiB\n")
+
+    print(f"{'file':<45}{'legacy ms':>11}{'new ms':>9}{'speedup':>9}  legacy/new headings, links, description")
+    for name, document in corpus.items():
+        legacy_time = time_parser(legacy_parse_readme, [document], args.repeat)
+        new_time = time_parser(parse_readme, [document], args.repeat)
+        legacy, new = legacy_parse_readme(document), parse_readme(document)
+        print(
+            f"{name[-44:]:<45}{legacy_time * 1000:>11.3f}{new_time * 1000:>9.3f}{legacy_time / new_time:>8.1f}x  "
+            f"{len(legacy['categories'])}/{len(new['headings'])}, "
+            f"{len(legacy['related_links'])}/{len(new['links'])}, "
+            f"{'Y' if legacy['description'] else 'N'}/{'Y' if new['description'] else 'N'}"
+        )
+
+    legacy_total = time_parser(legacy_parse_readme, documents, args.repeat)
+    new_total = time_parser(parse_readme, documents, args.repeat)
+    print(f"\ncorpus total: legacy {legacy_total * 1000:.2f} ms, new {new_total * 1000:.2f} ms, "
+          f"speedup {legacy_total / new_total:.1f}x")
+
+    # 批量解析：模拟一次刷新中的大量README
+    batch = [documents[i % len(documents)] for i in range(args.batch)]
+    start = time.perf_counter()
+    parse_readmes(batch, max_workers=1)
+    serial = time.perf_counter() - start
+    start = time.perf_counter()
+    parse_readmes(batch, max_workers=args.workers)
+    pooled = time.perf_counter() - start
+    print(f"batch of {len(batch)}: in-process {serial * 1000:.1f} ms, process pool {pooled * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索和写入热点路径的基准测试
+在临时SQLite数据库上加载合成目录，按场景测量延迟分布，结果可保存为JSON并与基线对比
+
+场景:
+    cold_search       新建服务器，setup加首次查询（加载项目存储和索引）
+    warm_search       项目存储和数据库两种路径上的关键词查询，每次查询前清空结果缓存
+    deep_pagination   深翻页：页码分页与游标分页
+    facet_filtering   过滤表达式和分面计数
+    bulk_ingest       批量upsert新项目和已有项目，以及逐条create_project作为对照
+    concurrent_tools  通过FastMCP并发调用search_projects工具
+    readme_parse      解析合成README
+    crawl             通过本地GitHub API模拟服务执行refresh_projects
+
+用法:
+    python benchmarks/run.py --projects 10000 --output results.json
+    python benchmarks/run.py --projects 10000 --compare results.json
+    python benchmarks/run.py --scenarios warm_search,facet_filtering --queries 500
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from catalogue import generate_catalogue, query_workload  # noqa: E402
+from fake_github import FakeGitHub  # noqa: E402
+
+from mcp_search_server.core.server import MCPSearchServer  # noqa: E402
+from mcp_search_server.utils.readme_parser import parse_readme  # noqa: E402
+
+SCENARIOS = (
+    "cold_search", "warm_search", "deep_pagination", "facet_filtering",
+    "bulk_ingest", "concurrent_tools", "readme_parse", "crawl",
+)
+FILTER_WORKLOAD = [
+    ("category", 'category:Databases'),
+    ("category_tag", 'category:"Developer Tools" tag:python'),
+    ("or_not", '(tag:docker OR tag:kubernetes) -language:Java'),
+    ("stars_range", 'stars:>=50'),
+    ("combined", 'category:Search (tag:vector OR tag:embeddings) stars:10..5000'),
+]
+# 写入数据库时只保留项目表中的字段
+PROJECT_FIELDS = (
+    "name", "description", "repo_url", "readme_content", "stars", "forks", "language", "categories", "tags",
+)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    汇总延迟样本
+
+    Args:
+        samples: 每次操作的耗时（秒）
+
+    Returns:
+        Dict[str, float]: 次数、吞吐量和以毫秒为单位的均值、分位数、最小值、最大值
+    """
+    ordered = sorted(samples)
+    count = len(ordered)
+    total = sum(ordered)
+
+    def percentile(p: float) -> float:
+        return ordered[min(count - 1, int(p * count))] * 1000
+
+    return {
+        "count": count,
+        "mean_ms": total / count * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "min_ms": ordered[0] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_s": count / total if total else 0.0,
+    }
+
+
+async def measure(operation: Callable[[], Awaitable], repeat: int, before: Optional[Callable[[], Awaitable]] = None) -> Dict:
+    """执行operation repeat次并汇总耗时，before在每次计时之前执行"""
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            await before()
+        start = time.perf_counter()
+        await operation()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def project_rows(count: int, seed: int, readme_size: int, start: int = 0) -> List[Dict]:
+    return [{field: project[field] for field in PROJECT_FIELDS}
+            for project in generate_catalogue(count, seed, readme_size, start)]
+
+
+class Benchmark:
+    """基准测试运行器，每个场景在临时目录中的独立数据库上运行"""
+
+    def __init__(self, args: argparse.Namespace, workdir: Path):
+        self.args = args
+        self.workdir = workdir
+        self.queries = query_workload(args.queries, args.seed)
+        self._database: Optional[Path] = None
+
+    def make_server(self, name: str = "bench", database: Optional[Path] = None, **overrides) -> MCPSearchServer:
+        """
+        创建使用临时数据库和临时缓存目录的服务器
+
+        Args:
+            name: 数据库文件名
+            database: 已有的数据库文件，默认新建
+            **overrides: 覆盖的配置段
+
+        Returns:
+            MCPSearchServer: 服务器
+        """
+        database = database or self.workdir / f"{name}.db"
+        config = {
+            "database": {"url": f"sqlite+aiosqlite:///{database}"},
+            "github": {
+                "token": "benchmark",
+                "cache_dir": str(self.workdir / f"{name}_http_cache"),
+                "readme_parse_workers": 1,
+            },
+            "search": {"min_score": 0.0},
+            "snapshot": {"path": None},
+        }
+        for section, values in overrides.items():
+            config[section] = {**config.get(section, {}), **values}
+        return MCPSearchServer(config=config)
+
+    async def loaded_database(self) -> Path:
+        """返回已写入完整目录的数据库文件，首次调用时生成"""
+        if self._database is None:
+            path = self.workdir / "catalogue.db"
+            server = self.make_server(database=path)
+            rows = project_rows(self.args.projects, self.args.seed, self.args.readme_size)
+            async with server._session() as session:
+                await server._project_service(session).upsert_projects(rows, mark_crawled=False)
+            await server.stop()
+            self._database = path
+        return self._database
+
+    async def cold_search(self) -> Dict:
+        database = await self.loaded_database()
+        results = {}
+        for store in (True, False):
+            samples = []
+            for _ in range(self.args.cold_repeat):
+                server = self.make_server(database=database, search={"store": store})
+                start = time.perf_counter()
+                await server._search(self.queries[0])
+                samples.append(time.perf_counter() - start)
+                await server.stop()
+            results["store" if store else "database"] = summarize(samples)
+        return results
+
+    async def warm_search(self) -> Dict:
+        database = await self.loaded_database()
+        results = {}
+        for store in (True, False):
+            server = self.make_server(database=database, search={"store": store})
+            await server.setup()
+            queries = iter(self.queries * 2)
+            results["store" if store else "database"] = await measure(
+                lambda: server._search(next(queries)), len(self.queries),
+                before=server.result_cache.invalidate
+            )
+            await server.stop()
+        return results
+
+    async def deep_pagination(self) -> Dict:
+        database = await self.loaded_database()
+        size = 20
+        pages = max(1, min(self.args.projects // size, self.args.max_pages))
+        results = {}
+        for store in (True, False):
+            label = "store" if store else "database"
+            server = self.make_server(database=database, search={"store": store})
+            await server.setup()
+            offset_samples, cursor_samples = [], []
+            cursor = None
+            for page in range(1, pages + 1):
+                await server.result_cache.invalidate()
+                start = time.perf_counter()
+                await server._search("", page=page, size=size)
+                offset_samples.append(time.perf_counter() - start)
+                await server.result_cache.invalidate()
+                start = time.perf_counter()
+                result = await server._search("", size=size, cursor=cursor)
+                cursor_samples.append(time.perf_counter() - start)
+                cursor = result.get("next_cursor")
+                if cursor is None:
+                    break
+            results[f"{label}_offset"] = summarize(offset_samples)
+            results[f"{label}_cursor"] = summarize(cursor_samples)
+            await server.stop()
+        return results
+
+    async def facet_filtering(self) -> Dict:
+        database = await self.loaded_database()
+        repeat = max(1, len(self.queries) // len(FILTER_WORKLOAD))
+        results = {}
+        for store in (True, False):
+            label = "store" if store else "database"
+            server = self.make_server(database=database, search={"store": store})
+            await server.setup()
+            for name, expression in FILTER_WORKLOAD:
+                results[f"{label}_{name}"] = await measure(
+                    lambda: server._search("", filters=expression), repeat,
+                    before=server.result_cache.invalidate
+                )
+                results[f"{label}_{name}_facets"] = await measure(
+                    lambda: server._search("server", filters=expression, facets=True), repeat,
+                    before=server.result_cache.invalidate
+                )
+            await server.stop()
+        return results
+
+    async def bulk_ingest(self) -> Dict:
+        server = self.make_server("ingest", search={"store": False})
+        count = self.args.projects
+        rows = project_rows(count, self.args.seed, self.args.readme_size)
+        results = {}
+        async with server._session() as session:
+            service = server._project_service(session)
+            start = time.perf_counter()
+            await service.upsert_projects(rows, mark_crawled=False)
+            elapsed = time.perf_counter() - start
+            results["upsert_new"] = {"projects": count, "seconds": elapsed, "projects_per_s": count / elapsed}
+
+            # 同一批项目重新写入一次，star数变化，走更新路径
+            for row in rows:
+                row["stars"] += 1
+            start = time.perf_counter()
+            await service.upsert_projects(rows, mark_crawled=False)
+            elapsed = time.perf_counter() - start
+            results["upsert_existing"] = {"projects": count, "seconds": elapsed, "projects_per_s": count / elapsed}
+
+            sample = project_rows(min(count, self.args.single_sample), self.args.seed + 1, self.args.readme_size, count)
+            rows = iter(sample)
+            results["create_project"] = await measure(lambda: service.create_project(next(rows)), len(sample))
+        await server.stop()
+        return results
+
+    async def concurrent_tools(self) -> Dict:
+        database = await self.loaded_database()
+        server = self.make_server(database=database)
+        await server.setup()
+        results = {}
+        for concurrency in self.args.concurrency:
+            batches = max(1, len(self.queries) // concurrency)
+            queries = iter(self.queries * 2)
+
+            async def call_batch():
+                await asyncio.gather(*(
+                    server.mcp.call_tool("search_projects", {"query": next(queries)})
+                    for _ in range(concurrency)
+                ))
+
+            summary = await measure(call_batch, batches, before=server.result_cache.invalidate)
+            summary["calls_per_s"] = summary["ops_per_s"] * concurrency
+            results[f"concurrency_{concurrency}"] = summary
+        await server.stop()
+        return results
+
+    async def readme_parse(self) -> Dict:
+        readmes = [project["readme_content"] for project in
+                   generate_catalogue(min(self.args.projects, 2000), self.args.seed, self.args.readme_size)]
+        documents = iter(readmes)
+
+        async def parse():
+            parse_readme(next(documents))
+
+        summary = await measure(parse, len(readmes))
+        summary["bytes_per_s"] = sum(len(readme) for readme in readmes) / (summary["mean_ms"] / 1000 * len(readmes))
+        return summary
+
+    async def crawl(self) -> Dict:
+        fake = FakeGitHub(self.args.projects, self.args.seed, self.args.readme_size, self.args.latency)
+        url = await fake.start()
+        server = self.make_server("crawl", github={"api_base_url": url, "concurrency": 16})
+        results = {}
+        try:
+            for label, force in (("initial", False), ("incremental", False), ("forced", True)):
+                before = dict(fake.requests)
+                start = time.perf_counter()
+                refresh = await server.refresh_projects(force=force)
+                elapsed = time.perf_counter() - start
+                if refresh.get("status") != "success":
+                    raise RuntimeError(f"refresh failed: {refresh.get('message')}")
+                results[label] = {
+                    "seconds": elapsed,
+                    "written": refresh["new_projects"] + refresh["updated_projects"],
+                    "skipped": refresh["skipped_projects"],
+                    "requests": {key: fake.requests[key] - before[key] for key in fake.requests},
+                }
+        finally:
+            await server.stop()
+            await fake.stop()
+        return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """
+    对比两次运行的结果
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+
+    Returns:
+        List[str]: 每个共同指标一行，列出基线值、本次值和比值（本次/基线）
+    """
+    lines = []
+
+    def walk(path: str, now, before):
+        if isinstance(now, dict) and isinstance(before, dict):
+            for key in now:
+                if key in before:
+                    walk(f"{path}.{key}" if path else key, now[key], before[key])
+        elif isinstance(now, (int, float)) and isinstance(before, (int, float)) and before:
+            if path.endswith(("_ms", "seconds", "_per_s")):
+                lines.append(f"{path:<60} {before:>12.3f} {now:>12.3f} {now / before:>7.2f}x")
+
+    walk("", current["results"], baseline.get("results", {}))
+    return lines
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}, expected {', '.join(SCENARIOS)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="mcp_bench_") as workdir:
+        bench = Benchmark(args, Path(workdir))
+        for scenario in scenarios:
+            start = time.perf_counter()
+            results[scenario] = await getattr(bench, scenario)()
+            print(f"{scenario}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    return {
+        "metadata": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": {
+                "projects": args.projects, "seed": args.seed, "readme_size": args.readme_size,
+                "queries": args.queries, "concurrency": args.concurrency, "latency": args.latency,
+            },
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search and ingestion hot paths on a synthetic catalogue")
+    parser.add_argument("--projects", type=int, default=10000, help="catalogue size")
+    parser.add_argument("--seed", type=int, default=0, help="catalogue and workload seed")
+    parser.add_argument("--readme-size", type=int, default=2048, help="median README size in bytes")
+    parser.add_argument("--queries", type=int, default=200, help="queries per search scenario")
+    parser.add_argument("--scenarios", help=f"comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=lambda value: [int(v) for v in value.split(",")], default=[1, 8, 32],
+                        help="comma separated concurrency levels for concurrent_tools")
+    parser.add_argument("--cold-repeat", type=int, default=3, help="server starts measured by cold_search")
+    parser.add_argument("--max-pages", type=int, default=200, help="pages walked by deep_pagination")
+    parser.add_argument("--single-sample", type=int, default=200, help="projects written one by one in bulk_ingest")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake GitHub API latency per request in seconds")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print(f"{'metric':<60} {'baseline':>12} {'current':>12} {'ratio':>8}")
+        print("\n".join(compare(report, baseline)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,52 @@
 """JVM MCP Server入口点"""
 
+import argparse
+import asyncio
+import json
+import sys
+
 from .core.server import MCPSearchServer
 
 
+async def _build_snapshot(server: MCPSearchServer, path: str):
+    """构建搜索快照后释放数据库连接"""
+    try:
+        return await server.build_snapshot(path)
+    finally:
+        await server.stop()
+
+
+async def _export(server: MCPSearchServer, path: str, include_readme: bool):
+    """将全部项目以NDJSON流式写入文件（-表示标准输出）后释放数据库连接"""
+    output = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+    try:
+        async for chunk in server.iter_export(include_readme=include_readme):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        await server.stop()
+
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(prog="mcp-search-server")
+    subparsers = parser.add_subparsers(dest="command")
+    snapshot_parser = subparsers.add_parser("build-snapshot", help="build the search snapshot from the database")
+    snapshot_parser.add_argument("path", nargs="?", default="data/search.snapshot", help="snapshot file path")
+    export_parser = subparsers.add_parser("export", help="stream all projects as NDJSON")
+    export_parser.add_argument("path", nargs="?", default="-", help="output file, - for stdout")
+    export_parser.add_argument("--include-readme", action="store_true", help="include README content")
+    args = parser.parse_args()
+    
     server = MCPSearchServer()
+    if args.command == "build-snapshot":
+        print(json.dumps(asyncio.run(_build_snapshot(server, args.path)), ensure_ascii=False))
+        return
+    if args.command == "export":
+        asyncio.run(_export(server, args.path, args.include_readme))
+        return
     server.start()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -7,14 +7,56 @@ MCP Search Server
 """
 
 from mcp.server.fastmcp import FastMCP
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Callable, List, Dict, Optional
 import logging
-from sqlalchemy.orm import sessionmaker
-from ..models.database import init_db
-from ..services.project_service import ProjectService
-from ..utils.github_crawler import GitHubCrawler
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.database import create_db_engine, create_session_factory, init_db, is_file_sqlite, SQLITE_DEFAULTS
+from ..services.project_service import ProjectService, CountCache
+from ..services.search_backend import create_search_backend
+from ..services.facets import DEFAULT_FACET_LIMIT
+from ..services.fuzzy_index import FuzzyIndex, SUGGESTION_KINDS
+from ..services.semantic_index import SemanticIndex, SEARCH_MODES
+from ..services.ranking import reciprocal_rank_fusion
+from ..services.recommendation import RecommendationScheduler
+from ..services.jobs import JobManager, MAX_FINISHED_JOBS
+from ..services.docs import (
+    EXPORT_BATCH_SIZE, clamp_chunk_size, decode_chunk, find_section, ndjson_lines
+)
+from ..services.snapshot import SearchSnapshot, build_snapshot
+from ..services.project_store import ProjectStore, load_project_records
+from ..utils.github_crawler import GitHubCrawler, repo_changed_since, topic_tags
+from ..utils.http_cache import HTTPCache
+from ..utils.readme_parser import parse_readmes
+from ..utils.awesome_parser import parse_awesome_list
+from ..utils.catalogue_source import CatalogueSource
+from ..utils.cache import create_cache, make_cache_key
+from ..utils.metrics import MetricsRegistry, instrument_engine
+from ..utils.profiler import SamplingProfiler
+from ..utils.pagination import encode_cursor, decode_cursor
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
 import asyncio
+import copy
+import json
+import re
+import time
 from datetime import datetime
+from pathlib import Path, PurePosixPath
+
+# 单次批量搜索的最大查询数
+MAX_BATCH_SIZE = 20
+# 批量搜索中每个查询可用的字段及默认值（query必填）
+BATCH_SPEC_DEFAULTS = {
+    "page": 1,
+    "size": 10,
+    "category": None,
+    "cursor": None,
+    "filters": None,
+    "facets": False,
+    "fuzzy": True,
+    "mode": "keyword",
+}
 
 class MCPSearchServer:
     """
@@ -32,23 +74,1227 @@ class MCPSearchServer:
         """
         self.server_name = server_name
         self.config = config or {}
-        self.mcp = FastMCP(server_name)
+        self.mcp = FastMCP(server_name, lifespan=self._lifespan)
         self.logger = logging.getLogger(server_name)
         
-        # 初始化数据库
+        # 初始化数据库（异步engine，表结构在首次使用时创建）
         database_config = self.config.get("database", {})
-        database_url = database_config.get("url")
-        self.engine = init_db(database_url)  # 如果url为None，将使用默认SQLite
-        self.Session = sessionmaker(bind=self.engine)
+        sqlite_options = {**SQLITE_DEFAULTS, **database_config.get("sqlite", {})}
+        database_url = database_config.get("url")  # 如果url为None，将使用默认SQLite
+        split_sqlite = is_file_sqlite(database_url or "sqlite:///data/mcp_search.db")
+        self.engine = create_db_engine(
+            database_url,
+            echo=database_config.get("echo", False),
+            # SQLite同一时间只允许一个写事务，写入统一经过单个连接
+            pool_size=1 if split_sqlite else database_config.get("pool_size"),
+            max_overflow=0 if split_sqlite else database_config.get("max_overflow"),
+            pool_timeout=database_config.get("pool_timeout"),
+            pool_recycle=database_config.get("pool_recycle"),
+            sqlite_options=sqlite_options
+        )
+        self.Session = create_session_factory(self.engine)
+        # 文件SQLite的查询使用独立的只读连接池，每个会话读取一致的已提交快照，
+        # WAL模式下刷新期间的长写事务不会阻塞搜索；其他数据库读写共用一个engine
+        self.read_engine = self.engine
+        if split_sqlite:
+            self.read_engine = create_db_engine(
+                self.engine.url.render_as_string(hide_password=False),
+                echo=database_config.get("echo", False),
+                pool_size=sqlite_options["read_pool_size"],
+                max_overflow=database_config.get("max_overflow"),
+                pool_timeout=database_config.get("pool_timeout"),
+                pool_recycle=database_config.get("pool_recycle"),
+                sqlite_options=sqlite_options,
+                read_only=True
+            )
+        self.ReadSession = create_session_factory(self.read_engine)
+        self._db_ready = False
+        self._db_lock = asyncio.Lock()
+        
+        # 初始化全文检索后端
+        search_config = self.config.get("search", {})
+        self.search_backend = create_search_backend(self.engine, search_config.get("backend"))
+        self.count_cache = CountCache(ttl=search_config.get("count_cache_ttl", 60))
+        self.result_cache = create_cache(self.config.get("cache", {}))
         
         # 初始化GitHub爬虫
         self.github_token = self.config.get("github", {}).get("token")
         if not self.github_token:
             self.logger.warning("GitHub token not provided, some features may be limited")
+        github_config = self.config.get("github", {})
+        self.http_cache = HTTPCache(
+            cache_dir=github_config.get("cache_dir", "data/http_cache"),
+            max_bytes=int(github_config.get("cache_max_size_mb", 256) * 1024 * 1024)
+        )
+        
+        # 加载预构建的搜索快照，存在时搜索直接在快照上执行
+        snapshot_config = self.config.get("snapshot", {})
+        self.snapshot_path = snapshot_config.get("path")
+        self.snapshot_rebuild_on_write = snapshot_config.get("rebuild_on_write", False)
+        self.snapshot_rebuild_delay = snapshot_config.get("rebuild_delay", 30)
+        self.snapshot = self._open_snapshot()
+        # 快照是否包含数据库中的最新数据，过期的快照不用于创建项目存储
+        self._snapshot_current = False
+        # 写入次数，用于判断快照构建期间是否又有写入
+        self._writes = 0
+        
+        # 进程内只读项目存储，搜索和浏览在存储上执行，数据库只作为数据源
+        self.use_store = search_config.get("store", True)
+        self.store: Optional[ProjectStore] = None
+        # 当前项目存储所基于的快照，从数据库构建时为None
+        self._store_snapshot: Optional[SearchSnapshot] = None
+        # 项目名称、标签和分类上的模糊匹配索引，用于拼写纠错和补全
+        self.fuzzy_index: Optional[FuzzyIndex] = None
+        
+        # 可选的语义检索，需要安装numpy
+        semantic_config = self.config.get("semantic", {})
+        self.semantic: Optional[SemanticIndex] = None
+        self.semantic_path = semantic_config.get("path", "data/semantic")
+        self.semantic_candidates = semantic_config.get("candidates", 100)
+        if semantic_config.get("enabled", False):
+            self.semantic = SemanticIndex(
+                dimensions=semantic_config.get("dimensions", 128),
+                vocabulary_size=semantic_config.get("vocabulary_size", 20000),
+                nprobe=semantic_config.get("nprobe", 8),
+                batch_size=semantic_config.get("batch_size", 1024)
+            )
+            self._semantic_loaded = False
+        
+        # 初始化推荐调度器
+        recommendation_config = self.config.get("recommendation", {})
+        self.recommendations = RecommendationScheduler(
+            self._read_session,
+            update_interval=recommendation_config.get("update_interval", 86400),
+            pool_size=recommendation_config.get("pool_size", 50),
+            min_stars=recommendation_config.get("min_stars", 10)
+        )
+            
+        # 后台任务：刷新和导入在工作协程中依次执行，工具调用只返回任务ID
+        jobs_config = self.config.get("jobs", {})
+        self.jobs = JobManager(max_finished=jobs_config.get("history", MAX_FINISHED_JOBS))
+        self.refresh_interval = jobs_config.get("refresh_interval", 0)
+        self.refresh_on_start = jobs_config.get("refresh_on_start", False)
+        
+        # 运行指标：工具和资源的延迟、SQL语句、GitHub请求和缓存命中率
+        metrics_config = self.config.get("metrics", {})
+        self.metrics = MetricsRegistry()
+        self.metrics_enabled = metrics_config.get("enabled", True)
+        self.profiler = SamplingProfiler()
+        self.profile_interval = metrics_config.get("profile_interval_ms", 10) / 1000
+        self.started_at = time.time()
+        if self.metrics_enabled:
+            instrument_engine(self.engine, self.metrics)
+            if self.read_engine is not self.engine:
+                instrument_engine(self.read_engine, self.metrics)
+            self.metrics.add_collector(self._collect_metrics)
             
         self._setup_tools()
         self._setup_resources()
+        if self.metrics_enabled and metrics_config.get("prometheus", False):
+            self._setup_prometheus_route(metrics_config.get("prometheus_path", "/metrics"))
+        export_config = self.config.get("export", {})
+        if export_config.get("http", False):
+            self._setup_export_route(export_config.get("http_path", "/export.ndjson"))
+        
+    async def setup(self):
+        """
+        初始化数据库表和检索索引
+        可重复调用，只会执行一次
+        """
+        if self._db_ready:
+            return
+        async with self._db_lock:
+            if self._db_ready:
+                return
+            await init_db(self.engine)
+            await self.search_backend.setup(self.engine)
+            self._db_ready = True
+            await self._backfill_readme_outlines()
+            await self._seed_from_snapshot()
+            await self._check_snapshot()
+            await self._load_store()
+            await self._load_fuzzy_index()
+            await self._update_semantic_index()
+            
+    def _open_snapshot(self) -> Optional[SearchSnapshot]:
+        """
+        映射配置的快照文件，文件不存在或格式不兼容时返回None
+        
+        Returns:
+            Optional[SearchSnapshot]: 搜索快照
+        """
+        try:
+            started = time.perf_counter()
+            snapshot = SearchSnapshot.open(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring search snapshot {self.snapshot_path}: {e}")
+            return None
+        if snapshot is not None:
+            self.logger.info(
+                f"Loaded search snapshot with {snapshot.size} projects "
+                f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+        return snapshot
+        
+    async def _backfill_readme_outlines(self):
+        """为升级前写入、尚无章节目录的项目生成README目录"""
+        async with self.Session() as session:
+            backfilled = await self._project_service(session).backfill_readme_outlines()
+        if backfilled:
+            self.logger.info(f"Generated README outlines for {backfilled} projects")
+            
+    async def _seed_from_snapshot(self):
+        """空数据库从快照导入项目，使推荐、统计等依赖数据库的功能也能立即使用"""
+        if self.snapshot is None or self.snapshot.size == 0:
+            return
+        async with self.Session() as session:
+            project_service = self._project_service(session)
+            if await project_service.has_projects():
+                return
+            written = await project_service.upsert_projects(
+                list(self.snapshot.iter_records()),
+                chunk_size=None,
+                mark_crawled=False
+            )
+        self.logger.info(f"Seeded database with {written['new']} projects from the search snapshot")
+        
+    async def _check_snapshot(self):
+        """比较快照与数据库的数据版本，上次构建快照后数据库有写入时不使用快照创建项目存储"""
+        if self.snapshot is None:
+            return
+        async with self._read_session() as session:
+            projects, updated_at = await self._project_service(session).get_data_version()
+        self._snapshot_current = self.snapshot.matches(projects, updated_at)
+        if not self._snapshot_current:
+            self.logger.warning(
+                f"Search snapshot {self.snapshot_path} is older than the database, "
+                f"loading the project store from the database until it is rebuilt"
+            )
+            
+    async def build_snapshot(self, path: Optional[str] = None, progress: Optional[Callable] = None) -> Dict:
+        """
+        由数据库构建搜索快照并切换到新快照
+        
+        Args:
+            path: 快照文件路径，默认使用配置中的snapshot.path
+            progress: 进度回调，以(阶段, 已完成数, 总数)调用，见Job.report
+            
+        Returns:
+            Dict: 快照元信息
+        """
+        progress = progress or (lambda stage, done=None, total=None: None)
+        path = path or self.snapshot_path or "data/search.snapshot"
+        writes = self._writes
+        progress("building")
+        async with self._read_session() as session:
+            info = await build_snapshot(session, path)
+        if self.snapshot_path is None or Path(path).resolve() == Path(self.snapshot_path).resolve():
+            # 旧快照的映射在仍被引用时保持有效，由垃圾回收释放
+            self.snapshot_path = path
+            self.snapshot = SearchSnapshot(path)
+            # 构建期间又有写入时新快照仍然过期，等待下一次重建
+            self._snapshot_current = writes == self._writes
+        return info
+        
+    async def _rebuild_snapshot(self, progress: Optional[Callable] = None) -> Dict:
+        """
+        后台重建快照：先等待rebuild_delay，让连续的写入合并到同一次重建；
+        构建期间又有写入时再次构建，直到快照包含最新数据
+        
+        Args:
+            progress: 进度回调，见build_snapshot
+            
+        Returns:
+            Dict: 快照元信息
+        """
+        while True:
+            if progress is not None:
+                progress("waiting")
+            await asyncio.sleep(self.snapshot_rebuild_delay)
+            info = await self.build_snapshot(progress=progress)
+            if self._snapshot_current:
+                return info
+                
+    async def _load_store(self):
+        """加载项目存储：快照与数据库一致时直接基于快照创建，否则从数据库构建"""
+        if not self.use_store:
+            return
+        started = time.perf_counter()
+        snapshot = self.snapshot if self._snapshot_current else None
+        if snapshot is not None:
+            store = await asyncio.to_thread(snapshot.to_store)
+        else:
+            async with self.ReadSession() as session:
+                store = await ProjectStore.load(session)
+        self.store, self._store_snapshot = store, snapshot
+        self.logger.info(
+            f"Loaded project store with {store.size} projects in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        
+    async def _load_fuzzy_index(self):
+        """
+        构建模糊匹配索引：项目存储基于快照时使用快照中保存的词表，
+        否则使用存储中的记录或从数据库读取
+        """
+        if self._store_snapshot is not None:
+            self.fuzzy_index = await asyncio.to_thread(self._store_snapshot.fuzzy_index)
+            return
+        if self.store is not None:
+            store = self.store
+            entries = [
+                (record.name, record.categories, record.tags, store.stars[doc])
+                for doc, record in enumerate(store.records)
+            ]
+        else:
+            async with self.ReadSession() as session:
+                entries = await self._project_service(session).get_label_entries()
+        self.fuzzy_index = await asyncio.to_thread(FuzzyIndex.build, entries)
+        
+    def _known_term(self, term: str) -> bool:
+        """查询词是否已能匹配到项目，能匹配的词不做拼写纠正"""
+        if self.store is not None:
+            return bool(self.store.text_index.term_range(term.encode("utf-8")))
+        return self.fuzzy_index.has_prefix(term)
+        
+    async def _update_semantic_index(self):
+        """增量更新语义索引并保存，只为新增或文本变化的项目计算向量"""
+        if self.semantic is None:
+            return
+        if not self._semantic_loaded:
+            await asyncio.to_thread(self.semantic.load, self.semantic_path)
+            self._semantic_loaded = True
+        started = time.perf_counter()
+        async with self.ReadSession() as session:
+            records = await load_project_records(session)
+        # 在副本上更新，完成后整体替换，更新期间的查询仍使用旧索引
+        index = copy.copy(self.semantic)
+        stats = await asyncio.to_thread(index.update, records)
+        await asyncio.to_thread(index.save, self.semantic_path)
+        self.semantic = index
+        self.logger.info(
+            f"Updated semantic index: {stats['embedded']} embedded, {stats['reused']} reused, "
+            f"{stats['removed']} removed, refit={stats['refit']} in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        
+    async def _after_write(self):
+        """
+        数据写入后更新依赖全量数据的派生结构
+        
+        快照此后视为过期，项目存储改从数据库构建；开启rebuild_on_write时提交后台任务重建快照，
+        任务等待和排队期间的多次写入合并为一次重建。
+        """
+        self._writes += 1
+        self._snapshot_current = False
+        await self._load_store()
+        await self._load_fuzzy_index()
+        await self._update_semantic_index()
+        await self.recommendations.run_once()
+        if self.snapshot_path and self.snapshot_rebuild_on_write:
+            self.submit_job("build_snapshot")
+        
+    async def _search(
+        self,
+        query: str,
+        page: int = 1,
+        size: int = 10,
+        category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[str] = None,
+        facets: bool = False,
+        fuzzy: bool = False,
+        mode: str = "keyword",
+        session: Optional[AsyncSession] = None,
+        memo: Optional[Dict] = None
+    ) -> Dict:
+        """
+        搜索项目，启用项目存储时在存储上执行，否则查询数据库
+        
+        Args:
+            query: 搜索关键词
+            page: 页码
+            size: 每页大小
+            category: 分类
+            cursor: 游标
+            filters: 过滤表达式
+            facets: 是否返回分面计数
+            fuzzy: 是否纠正拼写错误的查询词，纠正后的查询在corrected_query中返回
+            mode: 搜索模式，keyword、semantic或hybrid
+            session: 复用的数据库会话，默认为本次搜索新建会话
+            memo: 多个搜索之间共享的项目存储中间结果
+            
+        Returns:
+            Dict: 搜索结果
+            
+        Raises:
+            ValueError: 参数无效
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}, expected one of {', '.join(SEARCH_MODES)}")
+        await self.setup()
+        if fuzzy and query and self.fuzzy_index is not None:
+            corrected = self.fuzzy_index.correct_query(query, self._known_term)
+            if corrected != query:
+                results = await self._search(
+                    corrected, page=page, size=size, category=category, cursor=cursor,
+                    filters=filters, facets=facets, mode=mode, session=session, memo=memo
+                )
+                return {**results, "corrected_query": corrected}
+        if mode != "keyword":
+            return await self._semantic_search(
+                query, page, size, category, cursor, filters, facets, mode, session=session, memo=memo
+            )
+        search_config = self.config.get("search", {})
+        facet_limit = search_config.get("facet_limit", DEFAULT_FACET_LIMIT)
+        if self.store is not None:
+            return self.store.search(
+                query,
+                page=page,
+                size=size,
+                category=category,
+                cursor=cursor,
+                min_score=search_config.get("min_score", 0.0),
+                filters=filters,
+                facets=facets,
+                facet_limit=facet_limit,
+                memo=memo
+            )
+        async with self._shared_session(session) as session:
+            project_service = self._project_service(session)
+            return await project_service.search_projects(
+                query=query,
+                page=page,
+                size=size,
+                category=category,
+                cursor=cursor,
+                filters=filters,
+                facets=facets,
+                facet_limit=facet_limit
+            )
+            
+    async def _semantic_search(
+        self,
+        query: str,
+        page: int,
+        size: int,
+        category: Optional[str],
+        cursor: Optional[str],
+        filters: Optional[str],
+        facets: bool,
+        mode: str,
+        session: Optional[AsyncSession] = None,
+        memo: Optional[Dict] = None
+    ) -> Dict:
+        """
+        语义或混合搜索
+        
+        语义模式按向量相似度排序；混合模式取关键词和语义各自的前semantic.candidates条结果，
+        以倒数排名融合。结果集以候选数为上限，只支持页码分页。
+        
+        Args:
+            query: 搜索文本
+            page: 页码
+            size: 每页大小
+            category: 分类
+            cursor: 游标（不支持）
+            filters: 过滤表达式
+            facets: 是否返回分面计数（不支持）
+            mode: semantic或hybrid
+            session: 复用的数据库会话
+            memo: 共享的项目存储中间结果
+            
+        Returns:
+            Dict: 搜索结果，score为相似度（semantic）或融合得分（hybrid）
+            
+        Raises:
+            ValueError: 未启用语义检索，或使用了不支持的参数
+        """
+        if self.semantic is None:
+            raise ValueError(f"Search mode {mode} requires semantic.enabled in the configuration")
+        if cursor or facets:
+            raise ValueError(f"Search mode {mode} supports page-based pagination only, without facets")
+        if not query:
+            raise ValueError(f"Search mode {mode} requires a query")
+            
+        limit = self.semantic_candidates
+        if self.store is not None:
+            allowed = self.store.filter_ids(category=category, filters=filters)
+        else:
+            async with self._shared_session(session) as shared:
+                allowed = await self._project_service(shared).filter_ids(category=category, filters=filters)
+        ranked = await asyncio.to_thread(self.semantic.search, query, limit, allowed)
+        if mode == "hybrid":
+            keyword = await self._search(
+                query, page=1, size=limit, category=category, filters=filters, session=session, memo=memo
+            )
+            ranked = reciprocal_rank_fusion([
+                [item["id"] for item in keyword["items"]],
+                [project_id for project_id, _ in ranked]
+            ])
+            
+        window = ranked[(page - 1) * size:page * size]
+        if self.store is not None:
+            items = [
+                self.store.to_dict(self.store.doc_by_id[project_id], score)
+                for project_id, score in window if project_id in self.store.doc_by_id
+            ]
+        else:
+            async with self._shared_session(session) as shared:
+                items = await self._project_service(shared).get_projects_by_ids([project_id for project_id, _ in window])
+            scores = dict(window)
+            for item in items:
+                item["score"] = round(scores[item["id"]], 6)
+        return {
+            "total": len(ranked),
+            "page": page,
+            "size": size,
+            "items": items,
+            "next_cursor": None
+        }
+        
+    @asynccontextmanager
+    async def _lifespan(self, app: FastMCP) -> AsyncIterator[None]:
+        """
+        服务器生命周期，运行期间在后台定时更新推荐快照、执行刷新任务
+        
+        Args:
+            app: FastMCP实例
+        """
+        self.recommendations.start()
+        self.jobs.start()
+        if self.refresh_interval:
+            # 开启启动时刷新时，第一次定时刷新推迟一个周期
+            self.jobs.schedule(
+                "refresh_projects", self._job_runner("refresh_projects", {"force": False}),
+                self.refresh_interval, delay=self.refresh_interval if self.refresh_on_start else 0, force=False
+            )
+        if self.refresh_on_start:
+            self.submit_job("refresh_projects", force=False)
+        try:
+            yield
+        finally:
+            await self.jobs.stop()
+            await self.recommendations.stop()
+            
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        """
+        获取异步数据库会话，首次使用时完成数据库初始化
+        
+        Yields:
+            AsyncSession: 数据库会话
+        """
+        await self.setup()
+        async with self.Session() as session:
+            yield session
+            
+    @asynccontextmanager
+    async def _read_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        获取只读数据库会话，用于搜索和派生数据的加载
+        
+        Yields:
+            AsyncSession: 只读连接池上的会话，文件SQLite时会话内读取同一快照
+        """
+        await self.setup()
+        async with self.ReadSession() as session:
+            yield session
+            
+    @asynccontextmanager
+    async def _shared_session(self, session: Optional[AsyncSession] = None) -> AsyncIterator[AsyncSession]:
+        """
+        复用传入的会话，未传入时新建会话
+        
+        Args:
+            session: 已有的数据库会话
+            
+        Yields:
+            AsyncSession: 数据库会话
+        """
+        if session is not None:
+            yield session
+            return
+        async with self._read_session() as session:
+            yield session
+            
+    async def search_batch(self, specs: List[Dict]) -> List[Dict]:
+        """
+        批量执行搜索
+        
+        完全相同的查询只执行一次；所有查询共享同一个数据库会话（未启用项目存储时）
+        和同一份项目存储中间结果（相同词的倒排表、相同过滤条件的位图）。
+        单个查询的参数错误只影响该查询，对应结果为{"error": 错误信息}。
+        
+        Args:
+            specs: 查询列表，每项的字段同search_projects工具的参数，query必填
+            
+        Returns:
+            List[Dict]: 与specs顺序一致的搜索结果
+            
+        Raises:
+            ValueError: 查询数超过search.max_batch_size
+        """
+        max_batch_size = self.config.get("search", {}).get("max_batch_size", MAX_BATCH_SIZE)
+        if len(specs) > max_batch_size:
+            raise ValueError(f"Batch contains {len(specs)} queries, at most {max_batch_size} are allowed")
+        await self.setup()
+        
+        keys = []
+        unique: Dict[str, Dict] = {}
+        for spec in specs:
+            unknown = set(spec) - set(BATCH_SPEC_DEFAULTS) - {"query"}
+            if not isinstance(spec.get("query"), str) or unknown:
+                keys.append(None)
+                continue
+            spec = {**BATCH_SPEC_DEFAULTS, **spec}
+            key = make_cache_key("batch", **spec)
+            keys.append(key)
+            unique.setdefault(key, spec)
+            
+        results: Dict[str, Dict] = {}
+        memo: Dict = {}
+        async with self._read_session() as session:
+            for key, spec in unique.items():
+                try:
+                    results[key] = await self._search(**spec, session=session, memo=memo)
+                except ValueError as e:
+                    results[key] = {"error": str(e)}
+                    
+        invalid = {"error": f"Each query needs a string 'query' and only these fields: query, {', '.join(BATCH_SPEC_DEFAULTS)}"}
+        return [results[key] if key is not None else invalid for key in keys]
+        
+    async def get_project_docs(
+        self,
+        project: str,
+        section: Optional[str] = None,
+        offset: int = 0,
+        length: Optional[int] = None
+    ) -> Dict:
+        """
+        分块读取项目README
+        
+        每次只从数据库截取请求的字节范围，响应大小不超过docs.max_chunk_bytes，与README总长度无关。
+        章节目录在写入README时生成并保存，读取时不加载README全文。
+        块边界落在多字节字符中间时向前收缩到字符边界，next_offset指向下一块的起点。
+        
+        Args:
+            project: 仓库地址或项目名称
+            section: 章节锚点、标题或序号，读取范围限定在该章节内
+            offset: 相对于读取范围起点的字节偏移
+            length: 块大小（字节）
+            
+        Returns:
+            Dict: 项目信息、README大小、读取范围、本块内容和next_offset（已读完时为None）；
+                不指定章节且offset为0时附带章节目录
+                
+        Raises:
+            ValueError: 项目或章节不存在，或offset为负数
+        """
+        if offset < 0:
+            raise ValueError(f"offset must not be negative: {offset}")
+        docs_config = self.config.get("docs", {})
+        length = clamp_chunk_size(length or docs_config.get("chunk_bytes"))
+        length = min(length, docs_config.get("max_chunk_bytes", length))
+        
+        async with self._read_session() as session:
+            service = self._project_service(session)
+            found = await service.find_project_readme(project)
+            if found is None:
+                raise ValueError(f"Project not found: {project}")
+            sections = found["sections"]
+            start, end = 0, found["size"]
+            if section is not None:
+                selected = find_section(sections, section)
+                if selected is None:
+                    raise ValueError(f"Section not found: {section}")
+                start, end = selected["start"], selected["end"]
+                
+            position = min(start + offset, end)
+            data = b""
+            if position < end:
+                data = await service.read_readme_bytes(found["id"], position, min(length, end - position))
+                
+        reached_end = position + len(data) >= end
+        content, skipped, used = decode_chunk(data, at_start=offset == 0, at_end=reached_end)
+        result = {
+            "project": {key: found[key] for key in ("id", "name", "repo_url")},
+            "size": found["size"],
+            "range": {"start": start, "end": end},
+            "offset": offset + skipped,
+            "content": content,
+            "next_offset": None if reached_end else offset + used,
+        }
+        if section is not None:
+            result["section"] = {key: selected[key] for key in ("index", "level", "title", "anchor", "bytes")}
+        elif offset == 0:
+            result["sections"] = [
+                {key: item[key] for key in ("index", "level", "title", "anchor", "start", "bytes")}
+                for item in sections
+            ]
+        return result
+        
+    async def iter_export(
+        self,
+        include_readme: bool = False,
+        batch_size: int = EXPORT_BATCH_SIZE,
+        after_id: int = 0
+    ) -> AsyncIterator[str]:
+        """
+        以NDJSON流式导出全部项目
+        
+        按id分批读取，每批序列化后立即交给调用方，内存占用只与批大小有关。
+        整个导出在同一个只读会话中进行，文件SQLite时看到的是同一个快照。
+        
+        Args:
+            include_readme: 是否包含README
+            batch_size: 每批项目数
+            after_id: 从id大于该值的项目开始
+            
+        Yields:
+            str: 一批项目的NDJSON文本
+        """
+        async with self._read_session() as session:
+            service = self._project_service(session)
+            async for batch in service.iter_projects(batch_size, after_id=after_id, include_readme=include_readme):
+                yield ndjson_lines(batch)
+                
+    async def export_page(self, cursor: Optional[str] = None, limit: int = EXPORT_BATCH_SIZE,
+                          include_readme: bool = False) -> Dict:
+        """
+        导出一页项目，MCP工具结果无法流式返回，因此按游标逐页导出
+        
+        Args:
+            cursor: 上一页返回的next_cursor
+            limit: 每页项目数，不超过export.max_page_size
+            include_readme: 是否包含README
+            
+        Returns:
+            Dict: format、本页项目数count、NDJSON文本data和next_cursor（已导出全部时为None）
+            
+        Raises:
+            ValueError: 游标无效或limit不是正数
+        """
+        max_page_size = self.config.get("export", {}).get("max_page_size", EXPORT_BATCH_SIZE)
+        if limit < 1:
+            raise ValueError(f"limit must be positive: {limit}")
+        limit = min(limit, max_page_size)
+        after_id = 0
+        if cursor:
+            after_id = decode_cursor(cursor, "export")[0]
+            
+        async with self._read_session() as session:
+            service = self._project_service(session)
+            batch: List[Dict] = []
+            async for batch in service.iter_projects(limit, after_id=after_id, include_readme=include_readme):
+                break
+        return {
+            "format": "ndjson",
+            "count": len(batch),
+            "data": ndjson_lines(batch),
+            "next_cursor": encode_cursor("export", [batch[-1]["id"]]) if len(batch) == limit else None,
+        }
+        
+    def _job_runner(self, kind: str, params: Dict) -> Callable:
+        """
+        返回执行指定写入任务的协程函数
+        
+        Args:
+            kind: refresh_projects、ingest_awesome_lists、refresh_catalogue或build_snapshot
+            params: 任务参数
+            
+        Returns:
+            Callable: 接收Job并返回结果字典的协程函数
+        """
+        method = {
+            "refresh_projects": self.refresh_projects,
+            "ingest_awesome_lists": self.ingest_awesome_lists,
+            "refresh_catalogue": self.refresh_catalogue,
+            "build_snapshot": self._rebuild_snapshot,
+        }[kind]
+        
+        async def run(job) -> Dict:
+            return await method(**params, progress=job.report)
+        return run
+        
+    def submit_job(self, kind: str, **params) -> Dict:
+        """
+        提交后台写入任务，立即返回
+        
+        相同类型和参数的任务正在排队或执行时不会重复提交，返回已有任务并标记deduplicated。
+        
+        Args:
+            kind: refresh_projects、ingest_awesome_lists、refresh_catalogue或build_snapshot
+            **params: 对应方法的参数
+            
+        Returns:
+            Dict: 任务信息，包含job_id和status
+        """
+        job, deduplicated = self.jobs.submit(kind, self._job_runner(kind, params), **params)
+        return {**job.to_dict(), "deduplicated": deduplicated}
+        
+    def _crawler(self) -> GitHubCrawler:
+        """
+        按配置创建GitHub爬虫
+        
+        Returns:
+            GitHubCrawler: GitHub爬虫
+        """
+        github_config = self.config.get("github", {})
+        return GitHubCrawler(
+            self.github_token,
+            api_base_url=github_config.get("api_base_url", "https://api.github.com"),
+            concurrency=github_config.get("concurrency", 8),
+            rate_limit_delay=github_config.get("rate_limit_delay", 60),
+            cache=self.http_cache,
+            metrics=self.metrics if self.metrics_enabled else None
+        )
+        
+    def _project_service(self, session) -> ProjectService:
+        """
+        创建绑定到指定会话的项目服务
+        
+        Args:
+            session: 数据库会话
+            
+        Returns:
+            ProjectService: 项目服务
+        """
+        search_config = self.config.get("search", {})
+        return ProjectService(
+            session,
+            search_backend=self.search_backend,
+            min_score=search_config.get("min_score", 0.0),
+            count_mode=search_config.get("count_mode", "exact"),
+            count_cache=self.count_cache,
+            result_cache=self.result_cache
+        )
+        
+    async def refresh_projects(self, force: bool = False, progress: Optional[Callable] = None) -> Dict:
+        """
+        从GitHub刷新项目数据
+        
+        增量模式下，将搜索结果中的pushed_at/updated_at与库中的last_crawled_at比较，
+        只为新项目和有变更的项目获取README和统计信息；force为True时全量重新抓取。
+        抓取失败（包括非200响应和限流）的仓库不写入，库中原有的统计信息和last_crawled_at保持不变，
+        下一次增量刷新会重试这些仓库。last_crawled_at记为发出请求的时间，
+        抓取和写入之间有新推送的仓库在下一次刷新时仍被视为有变更。
+        爬取期间不占用数据库会话，只在读取爬取状态和写入结果时短暂打开会话；
+        写入完成后才替换项目存储，搜索在此之前一直使用上一版数据。
+        
+        Args:
+            force: 是否强制全量重新抓取
+            progress: 进度回调，以(阶段, 已完成数, 总数)调用，见Job.report
+            
+        Returns:
+            Dict: 刷新结果
+        """
+        progress = progress or (lambda stage, done=None, total=None: None)
+        try:
+            async with self._crawler() as crawler:
+                # 搜索MCP相关项目（所有分页）
+                progress("searching")
+                items = await crawler.search_all_repos("topic:mcp-project")
+                
+                # 筛选需要重新抓取的仓库
+                if force:
+                    changed = items
+                else:
+                    async with self._session() as session:
+                        states = await self._project_service(session).get_crawl_states(
+                            [item["html_url"] for item in items]
+                        )
+                    changed = [
+                        item for item in items
+                        if repo_changed_since(item, states.get(item["html_url"]))
+                    ]
+                    
+                # 并发获取README和统计信息
+                progress("crawling", 0, len(changed))
+                details = await crawler.crawl_repos(
+                    changed, progress=lambda done, total: progress("crawling", done, total)
+                )
+                if len(details) < len(changed):
+                    crawled = {detail["item"]["html_url"] for detail in details}
+                    failed = [item["full_name"] for item in changed if item["html_url"] not in crawled]
+                    self.logger.warning(
+                        f"Keeping stored data for {len(failed)} repositories that failed to crawl: "
+                        f"{', '.join(failed[:10])}{' ...' if len(failed) > 10 else ''}"
+                    )
+                
+            # 批量解析README，数量较多时在进程池中并行，不阻塞事件循环
+            progress("parsing", 0, len(details))
+            project_infos = await asyncio.to_thread(
+                parse_readmes,
+                [detail["readme"] or "" for detail in details],
+                self.config.get("github", {}).get("readme_parse_workers")
+            )
+            projects_data = []
+            
+            for detail, project_info in zip(details, project_infos):
+                item, readme, stats = detail["item"], detail["readme"], detail["stats"]
+                
+                # 准备项目数据
+                projects_data.append({
+                    "name": item["name"],
+                    "description": item["description"] or project_info["description"],
+                    "repo_url": item["html_url"],
+                    "readme_content": readme,
+                    "stars": stats["stars"],
+                    "forks": stats["forks"],
+                    "language": stats["language"],
+                    "tags": topic_tags(item),
+                    "last_crawled_at": detail["fetched_at"]
+                })
+                
+            # 批量创建或更新项目；主题得到的标签按当前主题替换，
+            # 分类来自awesome列表和目录仓库的章节，刷新时不修改
+            progress("writing", 0, len(projects_data))
+            async with self._session() as session:
+                written = await self._project_service(session).upsert_projects(
+                    projects_data,
+                    chunk_size=self.config.get("database", {}).get("write_chunk_size", 500),
+                    replace_labels={"tags"}
+                )
+                
+            # 数据有变化时立即更新搜索快照和推荐
+            if written["new"] or written["updated"]:
+                progress("indexing")
+                await self._after_write()
+                
+            return {
+                "status": "success",
+                "mode": "full" if force else "incremental",
+                "new_projects": written["new"],
+                "updated_projects": written["updated"],
+                "skipped_projects": len(items) - len(changed),
+                "failed_projects": len(changed) - len(details),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to refresh projects: {e}")
+            return {
+                "status": "error",
+                "message": str(e),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+    async def _load_awesome_list(self, crawler: GitHubCrawler, source: str) -> str:
+        """
+        读取一个awesome列表的Markdown内容
+        
+        Args:
+            crawler: GitHub爬虫
+            source: 本地文件、本地git检出目录、owner/repo或GitHub仓库地址
+            
+        Returns:
+            str: Markdown内容
+        """
+        path = Path(source).expanduser()
+        if path.is_dir():
+            readmes = sorted(path.glob("[Rr][Ee][Aa][Dd][Mm][Ee].md"))
+            if not readmes:
+                raise FileNotFoundError(f"No README.md in {source}")
+            path = readmes[0]
+        if path.is_file():
+            return await asyncio.to_thread(path.read_text, encoding="utf-8")
+            
+        match = re.match(r"^(?:https?://github\.com/)?([\w.-]+)/([\w.-]+?)(?:\.git)?/?$", source)
+        if not match:
+            raise ValueError(f"Unsupported awesome list source: {source}")
+        readme = await crawler.get_readme(match.group(1), match.group(2))
+        if not readme:
+            raise ValueError(f"Failed to fetch awesome list: {source}")
+        return readme
+        
+    async def ingest_awesome_lists(self, sources: Optional[List[str]] = None, progress: Optional[Callable] = None) -> Dict:
+        """
+        导入awesome列表
+        
+        每个列表只读取一次README，章节标题作为分类、列表项作为项目，
+        所有项目在单个事务中批量写入。已由GitHub抓取过的项目只追加分类，
+        不覆盖抓取得到的名称和描述。
+        
+        Args:
+            sources: 列表来源，默认使用配置中的awesome.sources
+            progress: 进度回调，以(阶段, 已完成数, 总数)调用，见Job.report
+            
+        Returns:
+            Dict: 导入结果
+        """
+        progress = progress or (lambda stage, done=None, total=None: None)
+        awesome_config = self.config.get("awesome", {})
+        sources = sources or awesome_config.get("sources", [])
+        category = awesome_config.get("category", "awesome-mcp")
+        try:
+            progress("loading", 0, len(sources))
+            loaded = 0
+            
+            async def load(crawler: GitHubCrawler, source: str) -> str:
+                nonlocal loaded
+                try:
+                    return await self._load_awesome_list(crawler, source)
+                finally:
+                    # 每个来源读取完成（含失败）后报告进度
+                    loaded += 1
+                    progress("loading", loaded, len(sources))
+                    
+            async with self._crawler() as crawler:
+                contents = await asyncio.gather(
+                    *(load(crawler, source) for source in sources),
+                    return_exceptions=True
+                )
+                
+            entries: Dict[str, Dict] = {}
+            failed = []
+            for source, content in zip(sources, contents):
+                if isinstance(content, Exception):
+                    self.logger.error(f"Failed to load awesome list {source}: {content}")
+                    failed.append(source)
+                    continue
+                parsed = await asyncio.to_thread(parse_awesome_list, content, [category])
+                for entry in parsed:
+                    existing = entries.get(entry["repo_url"])
+                    if existing is None:
+                        entries[entry["repo_url"]] = entry
+                    else:
+                        existing["categories"] += [c for c in entry["categories"] if c not in existing["categories"]]
+                        
+            progress("writing", 0, len(entries))
+            async with self._session() as session:
+                project_service = self._project_service(session)
+                states = await project_service.get_crawl_states(list(entries))
+                projects_data = []
+                for repo_url, entry in entries.items():
+                    if states.get(repo_url) is not None:
+                        entry = {"repo_url": repo_url, "categories": entry["categories"]}
+                    projects_data.append(entry)
+                written = await project_service.upsert_projects(
+                    projects_data,
+                    chunk_size=None,
+                    replace_labels=False,
+                    mark_crawled=False
+                )
+                
+            if written["new"] or written["updated"]:
+                progress("indexing")
+                await self._after_write()
+                
+            return {
+                "status": "success" if not failed else "partial",
+                "sources": len(sources) - len(failed),
+                "failed_sources": failed,
+                "new_projects": written["new"],
+                "updated_projects": written["updated"],
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to ingest awesome lists: {e}")
+            return {
+                "status": "error",
+                "message": str(e),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+    def _catalogue_source(self) -> Optional[CatalogueSource]:
+        """
+        按配置创建目录仓库数据源
+        
+        Returns:
+            Optional[CatalogueSource]: 未配置目录仓库时返回None
+        """
+        catalogue_config = self.config.get("catalogue", {})
+        if not catalogue_config.get("repo_url"):
+            return None
+        return CatalogueSource(
+            catalogue_config["repo_url"],
+            mirror_dir=catalogue_config.get("mirror_dir", "data/catalogue.git"),
+            branch=catalogue_config.get("branch", "main"),
+            pattern=catalogue_config.get("pattern", "*.md")
+        )
+        
+    async def refresh_catalogue(self, force: bool = False, progress: Optional[Callable] = None) -> Dict:
+        """
+        从目录仓库增量更新项目
+        
+        同步本地镜像后，用git diff找出上次索引的提交与最新提交之间变更的Markdown文件，
+        只重新解析这些文件：文件名作为分类，章节标题作为子分类，列表项作为项目。
+        从变更文件中移除且不再被其他文件引用的项目会被删除，仍被其他文件引用的项目来源改为该文件。
+        
+        Args:
+            force: 是否忽略上次索引的提交，全量重新索引
+            progress: 进度回调，以(阶段, 已完成数, 总数)调用，见Job.report
+            
+        Returns:
+            Dict: 更新结果
+        """
+        progress = progress or (lambda stage, done=None, total=None: None)
+        source = self._catalogue_source()
+        if source is None:
+            return {
+                "status": "error",
+                "message": "catalogue.repo_url is not configured",
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        try:
+            progress("syncing")
+            head = await source.sync()
+            async with self._read_session() as session:
+                base = None if force else await self._project_service(session).get_catalogue_commit(source.repo_url)
+            if base == head:
+                return {
+                    "status": "unchanged",
+                    "commit": head,
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+                
+            # git操作和解析不占用写会话，只在应用变更时打开
+            progress("parsing")
+            changes = await source.changes_since(base, head)
+            entries: Dict[str, Dict] = {}
+            for path, content in changes.changed.items():
+                file_category = PurePosixPath(path).stem
+                extra = [] if file_category.lower() == "readme" else [file_category]
+                parsed = await asyncio.to_thread(parse_awesome_list, content, extra)
+                for entry in parsed:
+                    existing = entries.get(entry["repo_url"])
+                    if existing is None:
+                        entries[entry["repo_url"]] = {**entry, "source": f"catalogue:{path}"}
+                    else:
+                        existing["categories"] += [c for c in entry["categories"] if c not in existing["categories"]]
+                        
+            # 原本来自变更文件、但本次解析中已不存在的项目
+            async with self._read_session() as session:
+                project_service = self._project_service(session)
+                if changes.full:
+                    previous = await project_service.get_urls_by_source(prefix="catalogue:")
+                else:
+                    previous = await project_service.get_urls_by_source(
+                        sources=[f"catalogue:{path}" for path in [*changes.changed, *changes.deleted]]
+                    )
+            stale = [url for url in previous if url not in entries]
+            # 仍被其他文件列出的项目保留，来源改为列出它的文件
+            moved: Dict[str, str] = {}
+            if stale and not changes.full:
+                moved = await source.referenced_urls(head, stale)
+                stale = [url for url in stale if url not in moved]
+                
+            progress("writing", 0, len(entries) + len(moved))
+            async with self._session() as session:
+                project_service = self._project_service(session)
+                # 已由GitHub抓取过的项目只更新分类和来源
+                states = await project_service.get_crawl_states(list(entries))
+                projects_data = [
+                    {key: entry[key] for key in ("repo_url", "categories", "source")}
+                    if states.get(repo_url) is not None else entry
+                    for repo_url, entry in entries.items()
+                ]
+                projects_data += [
+                    {"repo_url": repo_url, "source": f"catalogue:{path}"}
+                    for repo_url, path in moved.items()
+                ]
+                written = await project_service.upsert_projects(
+                    projects_data,
+                    chunk_size=None,
+                    replace_labels=False,
+                    mark_crawled=False
+                )
+                deleted = await project_service.delete_projects(stale)
+                await project_service.set_catalogue_commit(source.repo_url, head)
+                
+            if written["new"] or written["updated"] or deleted:
+                progress("indexing")
+                await self._after_write()
+                
+            return {
+                "status": "success",
+                "mode": "full" if changes.full else "incremental",
+                "commit": head,
+                "changed_files": len(changes.changed),
+                "deleted_files": len(changes.deleted),
+                "new_projects": written["new"],
+                "updated_projects": written["updated"],
+                "deleted_projects": deleted,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to refresh catalogue: {e}")
+            return {
+                "status": "error",
+                "message": str(e),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+    def _collect_metrics(self) -> List:
+        """
+        导出时读取各组件自身维护的统计
         
+        Returns:
+            List: (指标名, 说明, 值, 标签)列表
+        """
+        samples = [("uptime_seconds", "Seconds since the server was created", round(time.time() - self.started_at, 3), {})]
+        cache_stats = self.result_cache.stats()
+        for key in ("hits", "misses", "hit_ratio", "invalidations", "evictions", "size"):
+            if key in cache_stats:
+                samples.append((f"result_cache_{key}", f"Search result cache {key.replace('_', ' ')}", cache_stats[key], {}))
+        if self.store is not None:
+            samples.append(("store_projects", "Projects held in the in-memory store", self.store.size, {}))
+        if self.semantic is not None and self.semantic.size:
+            samples.append(("semantic_vectors", "Projects embedded in the semantic index", self.semantic.size, {}))
+        samples.append(("profiler_running", "Whether the sampling profiler is running", int(self.profiler.running), {}))
+        return samples
+        
+    def _tool(self):
+        """
+        注册MCP工具，启用指标时记录每次调用的延迟和结果
+        
+        Returns:
+            Callable: 用法与FastMCP.tool()相同的装饰器
+        """
+        def decorator(fn):
+            if self.metrics_enabled:
+                fn = self.metrics.instrument("tool", fn.__name__, fn)
+            return self.mcp.tool()(fn)
+        return decorator
+        
+    def _resource(self, uri: str):
+        """
+        注册MCP资源，启用指标时记录每次读取的延迟和结果
+        
+        Args:
+            uri: 资源URI
+            
+        Returns:
+            Callable: 用法与FastMCP.resource()相同的装饰器
+        """
+        def decorator(fn):
+            if self.metrics_enabled:
+                fn = self.metrics.instrument("resource", uri, fn)
+            return self.mcp.resource(uri)(fn)
+        return decorator
+        
+    def _setup_prometheus_route(self, path: str):
+        """
+        注册Prometheus文本格式的HTTP端点，只在以sse或streamable-http方式运行时可用
+        
+        Args:
+            path: 端点路径
+        """
+        @self.mcp.custom_route(path, methods=["GET"])
+        async def prometheus_metrics(request: Request) -> PlainTextResponse:
+            return PlainTextResponse(self.metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+            
+    def _setup_export_route(self, path: str):
+        """
+        注册流式NDJSON导出的HTTP端点，只在以sse或streamable-http方式运行时可用
+        查询参数include_readme=true时包含README
+        
+        Args:
+            path: 端点路径
+        """
+        @self.mcp.custom_route(path, methods=["GET"])
+        async def export_ndjson(request: Request) -> StreamingResponse:
+            include_readme = request.query_params.get("include_readme", "").lower() in ("1", "true", "yes")
+            return StreamingResponse(self.iter_export(include_readme=include_readme), media_type="application/x-ndjson")
+            
     def _setup_tools(self):
         """
         设置MCP工具
@@ -57,137 +1303,204 @@ class MCPSearchServer:
         self._setup_search_tools()
         self._setup_install_tools()
         self._setup_recommendation_tools()
+        self._setup_diagnostic_tools()
         
     def _setup_search_tools(self):
         """设置搜索相关工具"""
         
-        @self.mcp.tool()
-        async def search_projects(query: str, page: int = 1, size: int = 10, category: str = None) -> Dict:
+        @self._tool()
+        async def search_projects(
+            query: str,
+            page: int = 1,
+            size: int = 10,
+            category: str = None,
+            cursor: str = None,
+            filters: str = None,
+            facets: bool = False,
+            fuzzy: bool = True,
+            mode: str = "keyword"
+        ) -> Dict:
             """
             搜索MCP项目
             
             Args:
-                query: 搜索关键词
+                query: 搜索关键词，为空时按star数浏览
                 page: 页码
                 size: 每页大小
                 category: 分类
+                cursor: 游标，传入上一页结果中的next_cursor以获取下一页（遍历全部结果时推荐使用）
+                filters: 过滤表达式，支持category:、tag:、language:、stars:范围以及AND/OR/NOT和括号，
+                    例如 category:database (tag:python OR tag:go) -language:java stars:>=100
+                facets: 是否在结果中返回完整结果集的分类、标签和语言计数，用于逐步细化过滤
+                fuzzy: 是否容忍拼写错误；没有任何匹配的词会按项目名称、标签和分类纠正，
+                    实际使用的查询在corrected_query中返回
+                mode: 搜索模式：keyword按关键词匹配；semantic按语义相似度，可找到用词不同但含义相近的项目；
+                    hybrid融合两者。semantic和hybrid需要在配置中启用，只支持页码分页
                 
             Returns:
                 Dict: 搜索结果
             """
-            session = self.Session()
-            try:
-                project_service = ProjectService(session)
-                results = project_service.search_projects(
-                    query=query,
-                    page=page,
-                    size=size,
-                    category=category
-                )
-                return results
-            finally:
-                session.close()
+            return await self._search(
+                query, page=page, size=size, category=category, cursor=cursor,
+                filters=filters, facets=facets, fuzzy=fuzzy, mode=mode
+            )
+            
+        @self._tool()
+        async def search_projects_batch(queries: List[Dict]) -> List[Dict]:
+            """
+            一次执行多个搜索，适合需要对比或组合多个相关查询的场景
+            
+            Args:
+                queries: 查询列表，每项为包含search_projects参数的对象，例如
+                    [{"query": "postgres"}, {"query": "sqlite", "filters": "stars:>=100", "size": 5}]；
+                    query必填，其余字段可选：page、size、category、cursor、filters、facets、fuzzy、mode
+                    
+            Returns:
+                List[Dict]: 与queries顺序一致的搜索结果，参数错误的查询对应{"error": 错误信息}
+            """
+            return await self.search_batch(queries)
             
-        @self.mcp.tool()
-        async def list_awesome_projects(page: int = 1, size: int = 10) -> Dict:
+        @self._tool()
+        async def suggest(prefix: str, limit: int = 10, type: str = None) -> List[Dict]:
+            """
+            按前缀补全项目名称、分类和标签，前缀有拼写错误时返回纠正后的补全
+            
+            Args:
+                prefix: 已输入的前缀
+                limit: 返回条数
+                type: 限定类型：project、category或tag
+                
+            Returns:
+                List[Dict]: 补全结果，包含text、type和weight（项目为star数，分类和标签为项目数）
+            """
+            if type is not None and type not in SUGGESTION_KINDS:
+                raise ValueError(f"Unknown suggestion type: {type}, expected one of {', '.join(SUGGESTION_KINDS)}")
+            await self.setup()
+            return self.fuzzy_index.suggest(prefix, limit=limit, kinds=[type] if type else None)
+            
+        @self._tool()
+        async def list_awesome_projects(page: int = 1, size: int = 10, cursor: str = None) -> Dict:
             """
             获取Awesome MCP项目列表
             
             Args:
                 page: 页码
                 size: 每页大小
+                cursor: 游标，传入上一页结果中的next_cursor以获取下一页
                 
             Returns:
                 Dict: 项目列表
             """
-            session = self.Session()
-            try:
-                project_service = ProjectService(session)
-                results = project_service.search_projects(
-                    query="",
-                    page=page,
-                    size=size,
-                    category="awesome-mcp"
-                )
-                return results
-            finally:
-                session.close()
+            return await self._search(
+                "",
+                page=page,
+                size=size,
+                category=self.config.get("awesome", {}).get("category", "awesome-mcp"),
+                cursor=cursor
+            )
                 
-        @self.mcp.tool()
+        @self._tool()
         async def refresh_projects(force: bool = False) -> Dict:
             """
-            刷新项目数据
+            在后台刷新项目数据，立即返回任务ID，用refresh_status查询进度和结果
+            默认增量刷新，只重新抓取有变更的仓库；刷新完成前搜索使用现有数据
             
             Args:
-                force: 是否强制刷新所有项目
+                force: 是否强制全量重新抓取所有项目
                 
             Returns:
-                Dict: 刷新结果
+                Dict: 任务信息（job_id、status），已有相同任务在执行时返回该任务
             """
-            try:
-                async with GitHubCrawler(self.github_token) as crawler:
-                    # 搜索MCP相关项目
-                    search_results = await crawler.search_repos("topic:mcp-project")
-                    
-                    session = self.Session()
-                    try:
-                        project_service = ProjectService(session)
-                        updated = 0
-                        new = 0
-                        
-                        for item in search_results.get("items", []):
-                            owner, repo = item["full_name"].split("/")
-                            
-                            # 获取项目详细信息
-                            readme = await crawler.get_readme(owner, repo)
-                            stats = await crawler.get_repo_stats(owner, repo)
-                            
-                            # 解析README
-                            project_info = crawler.parse_readme_content(readme)
-                            
-                            # 准备项目数据
-                            project_data = {
-                                "name": item["name"],
-                                "description": item["description"] or project_info["description"],
-                                "repo_url": item["html_url"],
-                                "readme_content": readme,
-                                "stars": stats["stars"],
-                                "forks": stats["forks"],
-                                "language": stats["language"],
-                                "categories": project_info["categories"],
-                                "tags": project_info["tags"]
-                            }
-                            
-                            # 创建或更新项目
-                            project = project_service.create_project(project_data)
-                            if project:
-                                new += 1
-                            else:
-                                updated += 1
-                                
-                        return {
-                            "status": "success",
-                            "new_projects": new,
-                            "updated_projects": updated,
-                            "timestamp": datetime.utcnow().isoformat()
-                        }
-                    finally:
-                        session.close()
-            except Exception as e:
-                self.logger.error(f"Failed to refresh projects: {e}")
-                return {
-                    "status": "error",
-                    "message": str(e),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-        # 设置refresh_projects工具
-        # self.refresh_projects = refresh_projects;
-
+            return self.submit_job("refresh_projects", force=force)
+            
+        @self._tool()
+        async def refresh_status(job_id: str = None, limit: int = 10) -> Dict:
+            """
+            查询后台刷新和导入任务的状态
+            
+            Args:
+                job_id: refresh_projects、ingest_awesome_lists或refresh_catalogue返回的任务ID，
+                    为空时列出最近的任务
+                limit: 列出的任务数
+                
+            Returns:
+                Dict: 任务状态（queued、running、succeeded、failed）、当前阶段和进度，
+                    结束后包含result或error
+            """
+            if job_id is None:
+                return {"jobs": [job.to_dict() for job in self.jobs.jobs(limit)]}
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise ValueError(f"Unknown job: {job_id}")
+            return job.to_dict()
+            
+        @self._tool()
+        async def ingest_awesome_lists(sources: List[str] = None) -> Dict:
+            """
+            在后台导入awesome MCP列表，按章节分类批量入库，立即返回任务ID
+            
+            Args:
+                sources: 列表来源（owner/repo、GitHub地址或本地路径），默认使用配置中的列表
+                
+            Returns:
+                Dict: 任务信息（job_id、status），用refresh_status查询结果
+            """
+            return self.submit_job("ingest_awesome_lists", sources=sources)
+            
+        @self._tool()
+        async def refresh_catalogue(force: bool = False) -> Dict:
+            """
+            在后台从目录仓库更新项目，只重新解析上次索引后变更的文件，立即返回任务ID
+            
+            Args:
+                force: 是否全量重新索引
+                
+            Returns:
+                Dict: 任务信息（job_id、status），用refresh_status查询结果
+            """
+            return self.submit_job("refresh_catalogue", force=force)
+            
+        @self._tool()
+        async def get_project_docs(
+            project: str,
+            section: str = None,
+            offset: int = 0,
+            length: int = None
+        ) -> Dict:
+            """
+            分块读取项目README，适合较长的文档
+            首次调用（不指定section）返回章节目录和第一块内容，之后可按章节读取，或传入next_offset继续读取
+            
+            Args:
+                project: 仓库地址或项目名称
+                section: 章节锚点、标题或目录中的序号，只读取该章节（含子章节）
+                offset: 字节偏移，传入上一次返回的next_offset
+                length: 块大小（字节），默认16KB
+                
+            Returns:
+                Dict: 项目信息、README大小、本块内容content和next_offset（读完时为None），首块附带sections目录
+            """
+            return await self.get_project_docs(project, section=section, offset=offset, length=length)
+            
+        @self._tool()
+        async def export_projects(cursor: str = None, limit: int = EXPORT_BATCH_SIZE, include_readme: bool = False) -> Dict:
+            """
+            按页导出全部项目，每页为NDJSON文本（每行一个项目）
+            
+            Args:
+                cursor: 游标，传入上一页结果中的next_cursor以获取下一页
+                limit: 每页项目数
+                include_readme: 是否包含README内容
+                
+            Returns:
+                Dict: count、NDJSON文本data和next_cursor（已导出全部时为None）
+            """
+            return await self.export_page(cursor=cursor, limit=limit, include_readme=include_readme)
             
     def _setup_install_tools(self):
         """设置安装相关工具"""
         
-        @self.mcp.tool()
+        @self._tool()
         def install_project(project_url: str) -> Dict:
             """
             安装MCP项目
@@ -207,26 +1520,41 @@ class MCPSearchServer:
     def _setup_recommendation_tools(self):
         """设置推荐相关工具"""
         
-        @self.mcp.tool()
-        def get_daily_recommendations() -> List[Dict]:
+        @self._tool()
+        async def get_daily_recommendations() -> List[Dict]:
             """
             获取每日推荐项目
             
             Returns:
                 List[Dict]: 推荐项目列表
             """
-            session = self.Session()
-            try:
-                project_service = ProjectService(session)
-                results = project_service.search_projects(
-                    query="",
-                    page=1,
-                    size=5,
-                    category=None
-                )
-                return results["items"]
-            finally:
-                session.close()
+            snapshot = await self.recommendations.get_snapshot()
+            return snapshot.daily
+            
+    def _setup_diagnostic_tools(self):
+        """设置诊断相关工具"""
+        
+        @self._tool()
+        async def profiler(action: str = "status", interval_ms: float = None, duration: float = None) -> Dict:
+            """
+            控制服务器内置的采样分析器，用于定位真实负载下的慢路径
+            
+            Args:
+                action: start开始采样（清空上次结果），stop停止采样，status查看当前结果
+                interval_ms: 采样间隔（毫秒），默认使用配置中的metrics.profile_interval_ms
+                duration: 自动停止前的采样时长（秒），默认直到调用stop
+                
+            Returns:
+                Dict: 分析器状态和按样本数排序的函数、调用栈
+            """
+            if action == "start":
+                interval = interval_ms / 1000 if interval_ms else self.profile_interval
+                self.profiler.start(interval=interval, duration=duration)
+            elif action == "stop":
+                self.profiler.stop()
+            elif action != "status":
+                raise ValueError(f"Unknown profiler action: {action}, expected start, stop or status")
+            return self.profiler.report()
             
     def _setup_resources(self):
         """
@@ -234,53 +1562,29 @@ class MCPSearchServer:
         包括每日推荐、统计信息等
         """
         
-        @self.mcp.resource("daily://recommendations")
-        def get_daily_recommendations_resource() -> str:
+        @self._resource("daily://recommendations")
+        async def get_daily_recommendations_resource() -> str:
             """
             获取每日推荐项目资源
             """
-            session = self.Session()
-            try:
-                project_service = ProjectService(session)
-                results = project_service.search_projects(
-                    query="",
-                    page=1,
-                    size=5,
-                    category=None
-                )
-                
-                # 生成Markdown格式的推荐列表
-                markdown = "# 今日推荐MCP项目\n\n"
-                for project in results["items"]:
-                    markdown += f"## {project['name']}\n"
-                    markdown += f"{project['description']}\n\n"
-                    markdown += f"- Stars: {project['stars']}\n"
-                    markdown += f"- Language: {project['language']}\n"
-                    markdown += f"- URL: {project['repo_url']}\n\n"
-                
-                return markdown
-            finally:
-                session.close()
+            snapshot = await self.recommendations.get_snapshot()
+            return snapshot.recommendations_markdown
             
-        @self.mcp.resource("stats://overview")
-        def get_stats_overview() -> str:
+        @self._resource("stats://overview")
+        async def get_stats_overview() -> str:
             """
             获取MCP项目统计信息
             """
-            session = self.Session()
-            try:
-                project_service = ProjectService(session)
-                results = project_service.search_projects(query="", page=1, size=1)
-                
-                return f"""
-                # MCP项目统计
-                
-                - 总项目数: {results['total']}
-                - 今日新增: {0}  # TODO: 实现新增统计
-                - 本周热门: {results['items'][0]['name'] if results['items'] else '暂无'}
-                """
-            finally:
-                session.close()
+            snapshot = await self.recommendations.get_snapshot()
+            return snapshot.stats_markdown
+            
+        @self._resource("metrics://server")
+        async def get_server_metrics() -> str:
+            """
+            获取服务器运行指标（JSON）：工具和资源的调用次数、延迟分位数和进行中的调用数，
+            SQL语句数和耗时，GitHub请求数、延迟和缓存命中，结果缓存命中率
+            """
+            return json.dumps(self.metrics.snapshot(), ensure_ascii=False)
             
     def start(self):
         """
@@ -292,15 +1596,18 @@ class MCPSearchServer:
         """
         self.logger.info(f"Starting MCP Search Server")
         
-        # 启动时刷新项目数据
-        # asyncio.create_task( self.refresh_projects())
-        
+        # 启动时刷新和定时刷新由生命周期中的后台任务执行，见jobs配置
         self.mcp.run()
         
-    def stop(self):
+    async def stop(self):
         """
         停止MCP服务器
         """
         self.logger.info("Stopping MCP Search Server")
+        await self.jobs.stop()
+        await self.recommendations.stop()
+        self.profiler.stop()
         # 关闭数据库连接
-        self.engine.dispose() 
\ No newline at end of file
+        await self.engine.dispose()
+        if self.read_engine is not self.engine:
+            await self.read_engine.dispose() 
\ No newline at end of file
@@ -6,27 +6,41 @@
 定义项目相关的数据库表结构
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Table, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Float, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
 
 Base = declarative_base()
 
+# SQLite连接参数的默认值，见config.example.yaml中的database.sqlite
+SQLITE_DEFAULTS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size_mb": 256,
+    "cache_size_mb": 64,
+    "busy_timeout_ms": 5000,
+    "read_pool_size": 4,
+}
+
 # 项目-分类关联表
 project_category = Table(
     'project_category',
     Base.metadata,
-    Column('project_id', Integer, ForeignKey('projects.id')),
-    Column('category_id', Integer, ForeignKey('categories.id'))
+    Column('project_id', Integer, ForeignKey('projects.id'), primary_key=True),
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
 )
 
 # 项目-标签关联表
 project_tag = Table(
     'project_tag',
     Base.metadata,
-    Column('project_id', Integer, ForeignKey('projects.id')),
-    Column('tag_id', Integer, ForeignKey('tags.id'))
+    Column('project_id', Integer, ForeignKey('projects.id'), primary_key=True),
+    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True)
 )
 
 class Project(Base):
@@ -38,13 +52,15 @@ class Project(Base):
     description = Column(String(1000))
     repo_url = Column(String(200), unique=True, nullable=False)
     readme_content = Column(String(10000))
-    stars = Column(Integer, default=0)
+    readme_outline = Column(Text)  # README章节目录（JSON），随README一起写入，读取文档时无需加载README全文
+    stars = Column(Integer, default=0, index=True)
     forks = Column(Integer, default=0)
     language = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
     last_crawled_at = Column(DateTime)
     search_score = Column(Float, default=0.0)  # 用于搜索排序
+    source = Column(String(300), index=True)  # 项目来源，如目录仓库中的文件"catalogue:servers/db.md"
     
     # 关系
     categories = relationship("Category", secondary=project_category, back_populates="projects")
@@ -73,33 +89,95 @@ class Tag(Base):
     # 关系
     projects = relationship("Project", secondary=project_tag, back_populates="tags")
 
-def init_db(database_url: str = None):
+class CatalogueState(Base):
+    """目录仓库索引状态表，记录每个目录仓库最近一次索引的提交"""
+    __tablename__ = 'catalogue_states'
+    
+    id = Column(Integer, primary_key=True)
+    repo_url = Column(String(300), unique=True, nullable=False)
+    commit = Column(String(64), nullable=False)
+    indexed_at = Column(DateTime, default=datetime.utcnow)
+
+def sqlite_pragmas(options: Optional[Dict] = None, read_only: bool = False) -> List[str]:
     """
-    初始化数据库
+    生成SQLite连接建立时执行的PRAGMA语句
     
     Args:
-        database_url: 数据库URL，如果不提供则使用默认的SQLite数据库
+        options: database.sqlite配置，缺省项使用SQLITE_DEFAULTS
+        read_only: 是否为只读连接；只读连接不修改日志模式，并禁止写入
         
     Returns:
-        SQLAlchemy engine实例
+        List[str]: PRAGMA语句
     """
-    import os
-    from pathlib import Path
+    options = {**SQLITE_DEFAULTS, **(options or {})}
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(options['busy_timeout_ms'])}",
+        f"PRAGMA mmap_size = {int(options['mmap_size_mb'] * 1024 * 1024)}",
+        # 负值表示以KiB为单位
+        f"PRAGMA cache_size = {-int(options['cache_size_mb'] * 1024)}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # 日志模式写入数据库文件，由写连接设置一次后对所有连接生效
+        pragmas.insert(0, f"PRAGMA journal_mode = {options['journal_mode']}")
+        pragmas.append(f"PRAGMA synchronous = {options['synchronous']}")
+    return pragmas
+
+def is_file_sqlite(database_url: str) -> bool:
+    """是否为文件SQLite数据库（内存数据库只有一个连接，不区分读写）"""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+def create_db_engine(
+    database_url: str = None,
+    echo: bool = False,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    pool_timeout: Optional[float] = None,
+    pool_recycle: Optional[int] = None,
+    sqlite_options: Optional[Dict] = None,
+    read_only: bool = False
+) -> AsyncEngine:
+    """
+    创建异步数据库engine
     
+    文件SQLite数据库的每个连接在建立时执行sqlite_pragmas生成的PRAGMA。
+    只读engine的每个会话以显式BEGIN开始，会话内的所有查询看到同一个已提交的快照；
+    WAL模式下读事务不会被写事务阻塞，也不会阻塞写事务。
+    
+    Args:
+        database_url: 数据库URL，如果不提供则使用默认的SQLite数据库；
+            未指定异步驱动的sqlite URL会自动切换为aiosqlite
+        echo: 是否输出SQL语句
+        pool_size: 连接池大小
+        max_overflow: 连接池允许超出pool_size的连接数
+        pool_timeout: 获取连接的超时时间（秒）
+        pool_recycle: 连接回收时间（秒）
+        sqlite_options: database.sqlite配置（日志模式、mmap、缓存大小等）
+        read_only: 是否创建只读engine，只对文件SQLite数据库有效
+        
+    Returns:
+        AsyncEngine: SQLAlchemy异步engine实例
+    """
     if database_url is None:
         # 确保data目录存在
         data_dir = Path("data")
         data_dir.mkdir(exist_ok=True)
         
         # 使用默认的SQLite数据库
-        database_url = "sqlite:///data/mcp_search.db"
-    
+        database_url = "sqlite+aiosqlite:///data/mcp_search.db"
+        
     # 检查数据库类型
-    db_type = database_url.split(":")[0].lower()
+    scheme, _, rest = database_url.partition(":")
+    db_type = scheme.split("+")[0].lower()
+    if scheme.lower() == "sqlite":
+        database_url = f"sqlite+aiosqlite:{rest}"
     
     # 根据数据库类型设置不同的engine参数
     engine_kwargs = {
-        "echo": False  # 默认不输出SQL语句
+        "echo": echo
     }
     
     if db_type == "sqlite":
@@ -107,7 +185,84 @@ def init_db(database_url: str = None):
         engine_kwargs.update({
             "connect_args": {"check_same_thread": False},  # 允许多线程访问
         })
+        
+    # 内存SQLite使用单连接池，不支持连接池参数
+    if not (db_type == "sqlite" and make_url(database_url).database in (None, "", ":memory:")):
+        pool_options = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle
+        }
+        engine_kwargs.update({k: v for k, v in pool_options.items() if v is not None})
     
-    engine = create_engine(database_url, **engine_kwargs)
-    Base.metadata.create_all(engine)
-    return engine 
\ No newline at end of file
+    engine = create_async_engine(database_url, **engine_kwargs)
+    if is_file_sqlite(database_url):
+        pragmas = sqlite_pragmas(sqlite_options, read_only=read_only)
+        
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            if read_only:
+                # 关闭驱动隐式管理的事务，改为在begin事件中显式BEGIN
+                dbapi_connection.isolation_level = None
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+            
+        if read_only:
+            @event.listens_for(engine.sync_engine, "begin")
+            def begin_snapshot(conn):
+                conn.exec_driver_sql("BEGIN")
+                
+    return engine
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    """
+    创建异步会话工厂
+    
+    Args:
+        engine: 异步engine
+        
+    Returns:
+        async_sessionmaker: 会话工厂，提交后不过期对象，便于提交后继续读取属性
+    """
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+async def init_db(engine: AsyncEngine) -> AsyncEngine:
+    """
+    初始化数据库，创建缺失的表
+    
+    Args:
+        engine: 异步engine
+        
+    Returns:
+        AsyncEngine: 传入的engine
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+    return engine
+
+def _add_missing_columns(conn) -> None:
+    """
+    为已存在的表补充模型中新增的可空列及其索引
+    create_all只创建缺失的表，旧数据库升级后需要补齐新增字段
+    
+    Args:
+        conn: 同步数据库连接
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing and column.nullable]
+        if not missing:
+            continue
+        preparer = conn.dialect.identifier_preparer
+        for column in missing:
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+            )
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+项目文档
+README的章节目录、按字节范围分块读取，以及目录的NDJSON导出格式
+"""
+
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..utils.readme_parser import _ATX_HEADING, _FENCE, _clean_inline
+
+# 单次返回的文档块默认大小和上限（字节）
+DEFAULT_CHUNK_BYTES = 16 * 1024
+MIN_CHUNK_BYTES = 256
+MAX_CHUNK_BYTES = 256 * 1024
+# 导出时每批读取的项目数
+EXPORT_BATCH_SIZE = 500
+
+_ANCHOR_STRIP = re.compile(r"[^\w\- ]", re.UNICODE)
+
+
+def _anchor(title: str, seen: Dict[str, int]) -> str:
+    """按GitHub的规则生成标题锚点：小写、去除标点、空格换成-，重复的锚点追加序号"""
+    anchor = _ANCHOR_STRIP.sub("", title.lower()).replace(" ", "-")
+    count = seen.get(anchor, 0)
+    seen[anchor] = count + 1
+    return f"{anchor}-{count}" if count else anchor
+
+
+def outline(content: str) -> List[Dict]:
+    """
+    生成README的章节目录
+
+    每个ATX标题（代码块内的除外）开始一个章节，章节一直延续到下一个同级或更高级标题，
+    因此包含其子章节。第一个标题之前的非空内容作为序言（index 0，level 0）。
+
+    Args:
+        content: README文本
+
+    Returns:
+        List[Dict]: 章节列表，包含index、level、title、anchor，以及UTF-8字节偏移start、end和大小bytes
+    """
+    headings: List[Tuple[int, int, str]] = []
+    position = 0
+    fence: Optional[str] = None
+    for line in content.splitlines(keepends=True):
+        stripped = line.lstrip()
+        if fence is not None:
+            if stripped.startswith(fence):
+                fence = None
+        elif stripped[:1] in ("`", "~"):
+            match = _FENCE.match(line)
+            if match:
+                fence = match.group(1)
+        elif stripped[:1] == "#":
+            match = _ATX_HEADING.match(line.rstrip("\r\n"))
+            if match:
+                headings.append((position, len(match.group(1)), _clean_inline(match.group(2) or "")))
+        position += len(line.encode("utf-8"))
+    size = position
+
+    sections = []
+    if (headings[0][0] if headings else size) > 0 and content.strip():
+        sections.append({"level": 0, "title": "", "anchor": "", "start": 0,
+                         "end": headings[0][0] if headings else size})
+    seen: Dict[str, int] = {}
+    for number, (start, level, title) in enumerate(headings):
+        end = next((later for later, later_level, _ in headings[number + 1:] if later_level <= level), size)
+        sections.append({"level": level, "title": title, "anchor": _anchor(title, seen), "start": start, "end": end})
+    for index, section in enumerate(sections):
+        section["index"] = index
+        section["bytes"] = section["end"] - section["start"]
+    return sections
+
+
+def dump_outline(content: Optional[str]) -> str:
+    """生成README的章节目录并序列化为JSON，随README一起写入数据库"""
+    return json.dumps(outline(content or ""), ensure_ascii=False)
+
+
+def load_outline(value: Optional[str]) -> List[Dict]:
+    """反序列化数据库中保存的章节目录，未生成时返回空目录"""
+    return json.loads(value) if value else []
+
+
+def find_section(sections: List[Dict], key: str) -> Optional[Dict]:
+    """
+    按锚点、标题（不区分大小写）或序号查找章节
+
+    Args:
+        sections: outline返回的章节列表
+        key: 锚点、标题或序号
+
+    Returns:
+        Optional[Dict]: 章节，找不到时返回None
+    """
+    key = key.strip()
+    if key.isdigit():
+        index = int(key)
+        return sections[index] if index < len(sections) else None
+    lowered = key.lower().lstrip("#")
+    for field in ("anchor", "title"):
+        for section in sections:
+            if section[field].lower() == lowered:
+                return section
+    return None
+
+
+def clamp_chunk_size(length: Optional[int]) -> int:
+    """将请求的块大小限制在[MIN_CHUNK_BYTES, MAX_CHUNK_BYTES]内"""
+    return min(max(length or DEFAULT_CHUNK_BYTES, MIN_CHUNK_BYTES), MAX_CHUNK_BYTES)
+
+
+def decode_chunk(data: bytes, at_start: bool = True, at_end: bool = True) -> Tuple[str, int, int]:
+    """
+    将按字节截取的块解码为文本，丢弃被截断的多字节字符
+
+    Args:
+        data: 字节块
+        at_start: 块是否从文本开头或字符边界开始；否则跳过开头的UTF-8后续字节
+        at_end: 块是否到达范围末尾；否则去掉末尾不完整的字符
+
+    Returns:
+        Tuple[str, int, int]: 文本，以及实际使用的字节在块内的起止位置
+    """
+    start, end = 0, len(data)
+    if not at_start:
+        while start < end and data[start] & 0xC0 == 0x80:
+            start += 1
+    if not at_end:
+        # 从末尾找到最后一个字符的首字节，字符不完整时在其之前截断
+        lead = end - 1
+        while lead > start and data[lead] & 0xC0 == 0x80:
+            lead -= 1
+        if lead >= start:
+            first = data[lead]
+            width = 1 if first < 0x80 else 2 if first >> 5 == 0b110 else 3 if first >> 4 == 0b1110 else 4
+            if lead + width > end:
+                end = lead
+    return data[start:end].decode("utf-8", errors="replace"), start, end
+
+
+def ndjson_lines(projects: Iterable[Dict]) -> str:
+    """
+    将一批项目序列化为NDJSON
+
+    Args:
+        projects: 项目字典
+
+    Returns:
+        str: 每行一个JSON对象，以换行结尾
+    """
+    return "".join(json.dumps(project, ensure_ascii=False) + "\n" for project in projects)
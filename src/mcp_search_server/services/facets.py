@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分面过滤
+解析分类、标签、语言和star范围的过滤表达式，并提供数据库查询的等价条件
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, not_, or_, select, true
+
+from ..models.database import Project, Category, Tag, project_category, project_tag
+
+# 支持分面计数的字段
+FACET_FIELDS = ("category", "tag", "language")
+# 可用于过滤的字段
+FILTER_FIELDS = FACET_FIELDS + ("stars",)
+# 每个分面默认返回的取值个数
+DEFAULT_FACET_LIMIT = 10
+
+# 词法：括号、取反前缀、AND/OR/NOT关键字、field:"带空格的值"、field:值
+_TOKEN_RE = re.compile(
+    r'\s*(?:(?P<paren>[()])'
+    r'|(?P<neg>-)(?=\S)'
+    r'|(?P<field>\w+):(?:"(?P<quoted>[^"]*)"|(?P<value>[^\s()]+))'
+    r'|(?P<word>[^\s()]+))'
+)
+_RANGE_RE = re.compile(r"^(?:(?P<low>\d+)?\.\.(?P<high>\d+)?|(?P<op>>=|<=|>|<)?(?P<number>\d+))$")
+
+
+class FilterError(ValueError):
+    """过滤表达式无效"""
+
+
+def _parse_range(value: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    解析数值范围，支持 100..500、100..、..500、>=100、>100、<=500、<500、100
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: 闭区间的下界和上界，None表示不限
+    """
+    match = _RANGE_RE.match(value)
+    if not match:
+        raise FilterError(f"Invalid range: {value}")
+    if match.group("number") is None:
+        low, high = match.group("low"), match.group("high")
+        if low is None and high is None:
+            raise FilterError(f"Invalid range: {value}")
+        return (int(low) if low else None), (int(high) if high else None)
+    number = int(match.group("number"))
+    return {
+        None: (number, number),
+        ">=": (number, None),
+        ">": (number + 1, None),
+        "<=": (None, number),
+        "<": (None, number - 1),
+    }[match.group("op")]
+
+
+def _tokenize(expression: str) -> List[Tuple]:
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        position = match.end()
+        if match.group("paren"):
+            tokens.append((match.group("paren"),))
+        elif match.group("neg"):
+            tokens.append(("NOT",))
+        elif match.group("field"):
+            field = match.group("field").lower()
+            value = match.group("quoted") if match.group("quoted") is not None else match.group("value")
+            if field not in FILTER_FIELDS:
+                raise FilterError(f"Unknown filter field: {field}, expected one of {', '.join(FILTER_FIELDS)}")
+            if field == "stars":
+                tokens.append(("range", field, *_parse_range(value)))
+            else:
+                tokens.append(("term", field, value))
+        else:
+            word = match.group("word")
+            if word.upper() not in ("AND", "OR", "NOT"):
+                raise FilterError(f"Unexpected token: {word}")
+            tokens.append((word.upper(),))
+    return tokens
+
+
+def parse_filter(expression: Optional[str]) -> Optional[Tuple]:
+    """
+    解析过滤表达式
+
+    支持的语法：
+    - category:database、tag:python、language:go，值含空格时加双引号：category:"Web Search"
+    - stars:100..5000、stars:>=100、stars:<50
+    - AND、OR、NOT（或-前缀）和括号，相邻条件之间默认为AND，NOT优先级最高、OR最低
+    例如：category:database (tag:python OR tag:go) -language:java stars:>=100
+
+    Args:
+        expression: 过滤表达式
+
+    Returns:
+        Optional[Tuple]: 语法树（可哈希，可用作缓存键），表达式为空时返回None；节点为
+            ("and", (子节点, ...))、("or", (子节点, ...))、("not", 子节点)、
+            ("term", 字段, 取值)、("range", 字段, 下界, 上界)
+
+    Raises:
+        FilterError: 表达式无效
+    """
+    if not expression or not expression.strip():
+        return None
+    tokens = _tokenize(expression)
+    position = 0
+
+    def peek() -> Optional[str]:
+        return tokens[position][0] if position < len(tokens) else None
+
+    def parse_or() -> Tuple:
+        nonlocal position
+        nodes = [parse_and()]
+        while peek() == "OR":
+            position += 1
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", tuple(nodes))
+
+    def parse_and() -> Tuple:
+        nonlocal position
+        nodes = [parse_unary()]
+        while peek() not in (None, "OR", ")"):
+            if peek() == "AND":
+                position += 1
+            nodes.append(parse_unary())
+        return nodes[0] if len(nodes) == 1 else ("and", tuple(nodes))
+
+    def parse_unary() -> Tuple:
+        nonlocal position
+        token = tokens[position] if position < len(tokens) else None
+        if token is None:
+            raise FilterError("Unexpected end of filter expression")
+        position += 1
+        if token[0] == "NOT":
+            return ("not", parse_unary())
+        if token[0] == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise FilterError("Missing closing parenthesis")
+            position += 1
+            return node
+        if token[0] in ("term", "range"):
+            return token
+        raise FilterError(f"Unexpected {token[0]} in filter expression")
+
+    node = parse_or()
+    if position < len(tokens):
+        raise FilterError(f"Unexpected {tokens[position][0]} in filter expression")
+    return node
+
+
+def filter_clause(node: Optional[Tuple]):
+    """
+    将过滤语法树转换为projects表上的查询条件
+
+    分类和标签条件使用EXISTS子查询，多个标签不会重复连接关联表。
+
+    Args:
+        node: parse_filter返回的语法树
+
+    Returns:
+        可用于where()的条件
+    """
+    if node is None:
+        return true()
+    kind = node[0]
+    if kind == "and":
+        return and_(*(filter_clause(child) for child in node[1]))
+    if kind == "or":
+        return or_(*(filter_clause(child) for child in node[1]))
+    if kind == "not":
+        return not_(filter_clause(node[1]))
+    if kind == "range":
+        _, _, low, high = node
+        conditions = []
+        if low is not None:
+            conditions.append(Project.stars >= low)
+        if high is not None:
+            conditions.append(Project.stars <= high)
+        return and_(*conditions)
+    _, field, value = node
+    if field == "language":
+        # 空语言按空字符串比较，保证NOT条件下的三值逻辑与内存存储一致
+        return func.lower(func.coalesce(Project.language, "")) == value.lower()
+    if field == "category":
+        return exists().where(
+            project_category.c.project_id == Project.id,
+            project_category.c.category_id == select(Category.id).where(Category.name == value).scalar_subquery()
+        )
+    return exists().where(
+        project_tag.c.project_id == Project.id,
+        project_tag.c.tag_id == select(Tag.id).where(Tag.name == value).scalar_subquery()
+    )
+
+
+def label_filter(category: Optional[str] = None, tags: Optional[List[str]] = None) -> Optional[Tuple]:
+    """
+    将单个分类和标签列表转换为过滤语法树
+
+    Args:
+        category: 分类
+        tags: 标签列表，需同时包含
+
+    Returns:
+        Optional[Tuple]: 语法树，没有条件时返回None
+    """
+    nodes = []
+    if category:
+        nodes.append(("term", "category", category))
+    for tag in tags or []:
+        nodes.append(("term", "tag", tag))
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else ("and", tuple(nodes))
+
+
+def combine_filters(*nodes: Optional[Tuple]) -> Optional[Tuple]:
+    """以AND组合多个语法树，忽略空树"""
+    nodes = [node for node in nodes if node is not None]
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else ("and", tuple(nodes))
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模糊匹配索引
+基于三元组（trigram）的拼写纠错和前缀补全，覆盖项目名称、标签和分类
+"""
+
+import heapq
+import re
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .search_backend import _WORD_RE
+
+# 参与编辑距离计算的候选词上限，保证纠错耗时与词表大小无关
+MAX_CANDIDATES = 64
+# 补全时在前缀区间内扫描的条目上限
+MAX_SUGGEST_SCAN = 2000
+# 短于该长度的词不做纠错，避免把正确的缩写改成其他词
+MIN_CORRECTION_LENGTH = 4
+
+SUGGESTION_KINDS = ("project", "category", "tag")
+
+# 查询中的普通词，排除短语内部和前缀查询（file*）
+_QUERY_WORD_RE = re.compile(r'"[^"]*"|(\w+)(\*?)', re.UNICODE)
+
+
+def max_edits(length: int) -> int:
+    """按词长确定允许的最大编辑距离"""
+    if length < MIN_CORRECTION_LENGTH:
+        return 0
+    return 1 if length < 8 else 2
+
+
+def _trigrams(word: str) -> set:
+    padded = f"^{word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    带上限的Damerau-Levenshtein距离（相邻字符交换计为一次编辑）
+
+    Args:
+        a: 字符串
+        b: 字符串
+        limit: 距离上限
+
+    Returns:
+        int: 编辑距离，超过上限时返回limit + 1
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+class FuzzyIndex:
+    """
+    模糊匹配索引
+
+    - 词表：项目名称、标签、分类中的词及其出现的项目数，按三元组建立倒排表，
+      纠错时先按共享三元组数取少量候选，再计算有上限的编辑距离
+    - 补全表：名称、标签、分类全文以及名称中的各个词，按小写排序后二分定位前缀区间
+    索引构建后不再修改，数据变化时整体重建。
+    """
+
+    def __init__(self, words: Dict[str, int], completions: List[Tuple[str, str, str, int]]):
+        """
+        初始化索引
+
+        Args:
+            words: 词到出现项目数的映射
+            completions: 补全条目(小写键, 显示文本, 类型, 权重)，需按小写键排序、同键内按权重降序
+        """
+        self.words = words
+        self.vocabulary = sorted(words)
+        self._trigram_postings: Dict[str, List[int]] = {}
+        for index, word in enumerate(self.vocabulary):
+            for trigram in _trigrams(word):
+                self._trigram_postings.setdefault(trigram, []).append(index)
+        self.completions = completions
+        self._completion_keys = [entry[0] for entry in completions]
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, Sequence[str], Sequence[str], int]]) -> "FuzzyIndex":
+        """
+        由项目条目构建索引
+
+        Args:
+            entries: (名称, 分类列表, 标签列表, star数)
+
+        Returns:
+            FuzzyIndex: 模糊匹配索引
+        """
+        words: Dict[str, int] = {}
+        # (类型, 显示文本) -> [权重, 补全键集合]
+        suggestions: Dict[Tuple[str, str], list] = {}
+
+        def add_suggestion(kind: str, text: str, weight: int, keys: Iterable[str]):
+            entry = suggestions.setdefault((kind, text), [0, set()])
+            entry[0] += weight
+            entry[1].update(keys)
+
+        for name, categories, tags, stars in entries:
+            project_words = set()
+            name_words = _WORD_RE.findall((name or "").lower())
+            project_words.update(name_words)
+            if name:
+                # 项目名称按star数排序，名称中的每个词都可作为补全前缀
+                add_suggestion("project", name, stars or 0, [name.lower(), *name_words])
+            for kind, labels in (("category", categories), ("tag", tags)):
+                for label in labels:
+                    label_words = _WORD_RE.findall(label.lower())
+                    project_words.update(label_words)
+                    # 标签和分类按包含的项目数排序
+                    add_suggestion(kind, label, 1, [label.lower(), *label_words])
+            for word in project_words:
+                words[word] = words.get(word, 0) + 1
+
+        # 同一键下权重高的条目在前，扫描上限内优先看到热门项目
+        completions = sorted(
+            ((key, text, kind, weight) for (kind, text), (weight, keys) in suggestions.items() for key in keys),
+            key=lambda entry: (entry[0], -entry[3], entry[1])
+        )
+        return cls(words, completions)
+
+    def correct_word(self, word: str) -> Optional[str]:
+        """
+        纠正单个词
+
+        Args:
+            word: 小写的查询词
+
+        Returns:
+            Optional[str]: 词表中编辑距离最小（相同时出现项目数最多）的词，没有足够接近的词时返回None
+        """
+        limit = max_edits(len(word))
+        if limit == 0 or word in self.words:
+            return None
+        overlaps: Dict[int, int] = {}
+        for trigram in _trigrams(word):
+            for index in self._trigram_postings.get(trigram, ()):
+                overlaps[index] = overlaps.get(index, 0) + 1
+        candidates = heapq.nlargest(
+            MAX_CANDIDATES, overlaps.items(),
+            key=lambda item: (item[1], self.words[self.vocabulary[item[0]]])
+        )
+        best = None
+        for index, _ in candidates:
+            candidate = self.vocabulary[index]
+            distance = edit_distance(word, candidate, limit)
+            if distance > limit:
+                continue
+            key = (distance, -self.words[candidate], candidate)
+            if best is None or key < best:
+                best = key
+        return best[2] if best else None
+
+    def correct_query(self, query: str, known: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        纠正查询中拼写错误的词，短语和前缀查询保持不变
+
+        Args:
+            query: 用户查询
+            known: 判断词是否已能匹配到文档的函数，返回True的词不做纠正；默认按词表前缀判断
+
+        Returns:
+            str: 纠正后的查询，没有需要纠正的词时与原查询相同
+        """
+        known = known or self.has_prefix
+
+        def replace(match: re.Match) -> str:
+            word, star = match.group(1), match.group(2)
+            if word is None or star:
+                return match.group(0)
+            lowered = word.lower()
+            if known(lowered):
+                return word
+            return self.correct_word(lowered) or word
+
+        return _QUERY_WORD_RE.sub(replace, query or "")
+
+    def has_prefix(self, prefix: str) -> bool:
+        """词表中是否有以prefix开头的词"""
+        index = bisect_left(self.vocabulary, prefix)
+        return index < len(self.vocabulary) and self.vocabulary[index].startswith(prefix)
+
+    def suggest(self, prefix: str, limit: int = 10, kinds: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        前缀补全，前缀没有匹配时返回纠错后的补全
+
+        Args:
+            prefix: 输入的前缀
+            limit: 返回条数
+            kinds: 限定的类型（project/category/tag），默认全部
+
+        Returns:
+            List[Dict]: 补全结果，包含text、type和weight（项目为star数，标签和分类为项目数）
+        """
+        prefix = " ".join((prefix or "").lower().split())
+        if not prefix:
+            return []
+        results = self._complete(prefix, limit, kinds)
+        if not results:
+            words = prefix.split()
+            corrected = self.correct_word(words[-1])
+            if corrected:
+                results = self._complete(" ".join(words[:-1] + [corrected]), limit, kinds)
+        return results
+
+    def _complete(self, prefix: str, limit: int, kinds: Optional[Sequence[str]]) -> List[Dict]:
+        start = bisect_left(self._completion_keys, prefix)
+        seen = {}
+        for key, text, kind, weight in self.completions[start:start + MAX_SUGGEST_SCAN]:
+            if not key.startswith(prefix):
+                break
+            if kinds and kind not in kinds:
+                continue
+            # 完整匹配的名称优先于词匹配
+            rank = (key == prefix, weight)
+            if seen.get((kind, text), (False, -1)) < rank:
+                seen[(kind, text)] = rank
+        top = heapq.nlargest(limit, seen.items(), key=lambda item: (item[1], item[0][1]))
+        return [{"text": text, "type": kind, "weight": weight} for (kind, text), (_, weight) in top]
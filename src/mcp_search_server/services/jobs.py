@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+后台任务
+刷新和导入等写入任务在后台工作协程中依次执行，调用方只拿到任务ID，随后查询进度
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..utils.cache import make_cache_key
+
+# 保留的已结束任务数，超出后淘汰最早结束的任务
+MAX_FINISHED_JOBS = 100
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class Job:
+    """
+    后台任务
+    记录参数、状态、当前阶段和进度，结束后保存结果或错误信息
+    """
+
+    __slots__ = (
+        "id", "kind", "params", "key", "status", "stage", "done", "total",
+        "result", "error", "created_at", "started_at", "finished_at", "_finished"
+    )
+
+    def __init__(self, kind: str, params: Dict, key: str):
+        """
+        初始化任务
+
+        Args:
+            kind: 任务类型，如refresh_projects
+            params: 任务参数
+            key: 去重键，相同键的任务同一时间只有一个在排队或执行
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.key = key
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.done: Optional[int] = None
+        self.total: Optional[int] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._finished = asyncio.Event()
+
+    @property
+    def active(self) -> bool:
+        """是否仍在排队或执行"""
+        return self.status in ("queued", "running")
+
+    def report(self, stage: str, done: Optional[int] = None, total: Optional[int] = None) -> None:
+        """
+        报告进度，由任务函数在执行过程中调用
+
+        Args:
+            stage: 当前阶段
+            done: 当前阶段已完成的数量
+            total: 当前阶段的总数
+        """
+        self.stage, self.done, self.total = stage, done, total
+
+    async def wait(self) -> "Job":
+        """等待任务结束"""
+        await self._finished.wait()
+        return self
+
+    def to_dict(self) -> Dict:
+        """转换为工具返回的字典"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": {"stage": self.stage, "done": self.done, "total": self.total},
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobManager:
+    """
+    后台任务管理器
+
+    - 单个工作协程按提交顺序执行任务，写入任务之间不会互相竞争数据库写锁
+    - 相同类型和参数的任务在排队或执行期间重复提交时，返回已有任务
+    - 定时任务按固定间隔提交，上一次尚未结束时由去重合并
+    任务在同一事件循环中执行，爬取和解析都是异步的，执行期间搜索请求照常处理。
+    """
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        """
+        初始化任务管理器
+
+        Args:
+            max_finished: 保留的已结束任务数
+        """
+        self.max_finished = max_finished
+        self.logger = logging.getLogger("jobs")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, Job] = {}
+        self._runners: Dict[str, Callable[[Job], Awaitable[Dict]]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._schedules: List[asyncio.Task] = []
+
+    def submit(self, kind: str, run: Callable[[Job], Awaitable[Dict]], **params) -> Tuple[Job, bool]:
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型
+            run: 执行任务的协程函数，接收Job用于报告进度，返回结果字典；
+                结果中status为error时任务记为失败
+            **params: 任务参数，与kind一起作为去重键
+
+        Returns:
+            Tuple[Job, bool]: 任务，以及是否合并到了已有任务
+        """
+        key = make_cache_key(kind, **params)
+        existing = self._active.get(key)
+        if existing is not None:
+            return existing, True
+        self.start()
+        job = Job(kind, params, key)
+        self._jobs[job.id] = job
+        self._active[key] = job
+        self._runners[job.id] = run
+        self._queue.put_nowait(job)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """按ID获取任务"""
+        return self._jobs.get(job_id)
+
+    def jobs(self, limit: int = 10) -> List[Job]:
+        """最近提交的任务，新的在前"""
+        return list(reversed(self._jobs.values()))[:limit]
+
+    def schedule(self, kind: str, run: Callable[[Job], Awaitable[Dict]], interval: float,
+                 delay: float = 0, **params) -> None:
+        """
+        按固定间隔提交任务
+
+        Args:
+            kind: 任务类型
+            run: 执行任务的协程函数
+            interval: 间隔（秒）
+            delay: 首次提交前的等待时间（秒）
+            **params: 任务参数
+        """
+        self._schedules.append(asyncio.create_task(self._schedule_loop(kind, run, interval, delay, params)))
+
+    async def _schedule_loop(self, kind: str, run, interval: float, delay: float, params: Dict):
+        await asyncio.sleep(delay)
+        while True:
+            job, merged = self.submit(kind, run, **params)
+            if not merged:
+                self.logger.info(f"Scheduled {kind} job {job.id}")
+            await asyncio.sleep(interval)
+
+    def start(self):
+        """在当前事件循环中启动工作协程"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._work())
+
+    async def stop(self):
+        """停止工作协程和定时任务，正在执行和排队中的任务记为失败"""
+        tasks = self._schedules + ([self._worker] if self._worker is not None else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for job in self._active.values():
+            job.status, job.error = "failed", "cancelled"
+            job.finished_at = datetime.utcnow()
+            job._finished.set()
+        self._active.clear()
+        self._runners.clear()
+        self._schedules = []
+        self._worker = None
+        self._queue = None
+
+    async def _work(self):
+        """工作协程，依次执行队列中的任务"""
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        run = self._runners.pop(job.id)
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            result = await run(job)
+            job.result = result
+            if isinstance(result, dict) and result.get("status") == "error":
+                job.status, job.error = "failed", result.get("message")
+            else:
+                job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status, job.error = "failed", "cancelled"
+            raise
+        except Exception as e:
+            self.logger.error(f"Job {job.kind} {job.id} failed: {e}")
+            job.status, job.error = "failed", str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            self._active.pop(job.key, None)
+            job._finished.set()
+            self._evict()
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
@@ -6,25 +6,120 @@
 处理项目相关的数据库操作
 """
 
-from typing import List, Dict, Optional
+import time
+import threading
+from typing import AsyncIterator, Collection, List, Dict, Optional, Tuple, Union
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from ..models.database import Project, Category, Tag
+from sqlalchemy import LargeBinary, case, cast, delete, func, or_, select, text, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, selectinload
+from ..models.database import Project, Category, Tag, CatalogueState, project_category, project_tag
+from .search_backend import SearchBackend, LikeSearchBackend
+from .ranking import popularity_prior, blend_score
+from .docs import dump_outline, load_outline
+from .facets import DEFAULT_FACET_LIMIT, combine_filters, filter_clause, label_filter, parse_filter
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.cache import CacheBackend, make_cache_key
+
+COUNT_MODES = ("exact", "cached", "none")
+
+# 支持 INSERT ... ON CONFLICT 的数据库方言
+_UPSERT_DIALECTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+# 批量写入时可由project_data提供的项目字段
+_PROJECT_FIELDS = ("name", "description", "repo_url", "readme_content", "stars", "forks", "language", "source")
+# 只在插入新项目时使用的字段，用于从快照恢复时保留原有的id和时间；未提供时由数据库或写入时间决定
+_INSERT_ONLY_FIELDS = ("id", "created_at", "updated_at")
+
+class CountCache:
+    """
+    搜索总数缓存
+    在多个请求之间共享，避免每次翻页都对完整结果集执行count()
+    """
+    
+    def __init__(self, ttl: float = 60.0, max_size: int = 1024):
+        """
+        初始化总数缓存
+        
+        Args:
+            ttl: 缓存有效期（秒）
+            max_size: 最大缓存条目数
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[Tuple, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        
+    def get(self, key: Tuple) -> Optional[int]:
+        """获取未过期的总数"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, total = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return total
+            
+    def set(self, key: Tuple, total: int) -> None:
+        """写入总数，超出容量时淘汰最早写入的条目"""
+        with self._lock:
+            if len(self._entries) >= self.max_size and key not in self._entries:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + self.ttl, total)
+            
+    def clear(self) -> None:
+        """清空缓存，写入数据后调用"""
+        with self._lock:
+            self._entries.clear()
 
 class ProjectService:
-    """项目服务类"""
+    """项目服务类，所有数据库操作均为异步"""
     
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: AsyncSession,
+        search_backend: Optional[SearchBackend] = None,
+        min_score: float = 0.0,
+        count_mode: str = "exact",
+        count_cache: Optional[CountCache] = None,
+        result_cache: Optional[CacheBackend] = None
+    ):
         """
         初始化项目服务
         
         Args:
-            session: 数据库会话
+            session: 异步数据库会话
+            search_backend: 全文检索后端，默认使用不依赖索引的LIKE匹配
+            min_score: 关键词搜索结果的最低得分，低于该得分的结果将被过滤
+            count_mode: 搜索总数的计算方式
+                exact: 每次精确计算
+                cached: 使用count_cache中缓存的总数，过期后重新计算
+                none: 不计算总数（total为None），适合只使用游标遍历的场景
+            count_cache: 总数缓存，count_mode为cached时使用
+            result_cache: 搜索结果缓存，写入数据后自动失效
         """
+        if count_mode not in COUNT_MODES:
+            raise ValueError(f"Unknown count mode: {count_mode}")
         self.session = session
+        self.search_backend = search_backend or LikeSearchBackend()
+        self.min_score = min_score
+        self.count_mode = count_mode
+        self.count_cache = count_cache or CountCache()
+        self.result_cache = result_cache
+        
+    async def _invalidate_caches(self) -> None:
+        """数据写入后使总数缓存和结果缓存失效"""
+        self.count_cache.clear()
+        if self.result_cache is not None:
+            await self.result_cache.invalidate()
         
-    def create_project(self, project_data: Dict) -> Project:
+    async def create_project(self, project_data: Dict) -> Project:
         """
         创建新项目
         
@@ -34,38 +129,609 @@ class ProjectService:
         Returns:
             Project: 创建的项目
         """
+        categories = await self._resolve_labels(Category, project_data.get("categories", []))
+        tags = await self._resolve_labels(Tag, project_data.get("tags", []))
+        
+        # 关联对象在构造时一并传入，避免异步会话中触发懒加载
         project = Project(
             name=project_data["name"],
             description=project_data["description"],
             repo_url=project_data["repo_url"],
             readme_content=project_data.get("readme_content", ""),
+            readme_outline=dump_outline(project_data.get("readme_content")),
             stars=project_data.get("stars", 0),
             forks=project_data.get("forks", 0),
             language=project_data.get("language", ""),
-            last_crawled_at=datetime.utcnow()
+            last_crawled_at=project_data.get("last_crawled_at") or datetime.utcnow(),
+            categories=categories,
+            tags=tags
         )
-        
-        # 处理分类
-        for category_name in project_data.get("categories", []):
-            category = self.session.query(Category).filter_by(name=category_name).first()
-            if not category:
-                category = Category(name=category_name)
-                self.session.add(category)
-            project.categories.append(category)
-            
-        # 处理标签
-        for tag_name in project_data.get("tags", []):
-            tag = self.session.query(Tag).filter_by(name=tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                self.session.add(tag)
-            project.tags.append(tag)
-            
+        project.search_score = popularity_prior(project.stars, project.forks)
         self.session.add(project)
-        self.session.commit()
+            
+        await self.session.commit()
+        await self._invalidate_caches()
         return project
         
-    def update_project(self, project_id: int, project_data: Dict) -> Optional[Project]:
+    async def _resolve_labels(self, model, names: List[str]) -> List:
+        """
+        查找或创建分类/标签
+        
+        Args:
+            model: Category或Tag
+            names: 名称列表
+            
+        Returns:
+            List: 对应的分类/标签对象
+        """
+        labels = []
+        for name in names:
+            label = await self.session.scalar(select(model).filter_by(name=name))
+            if not label:
+                label = model(name=name)
+                self.session.add(label)
+            labels.append(label)
+        return labels
+        
+    async def has_projects(self) -> bool:
+        """
+        数据库中是否已有项目
+        
+        Returns:
+            bool: 至少有一个项目时为True
+        """
+        return (await self.session.scalar(select(Project.id).limit(1))) is not None
+        
+    async def get_data_version(self) -> Tuple[int, Optional[datetime]]:
+        """
+        项目数和最近的更新时间，用于判断快照是否仍与数据库一致
+        
+        Returns:
+            Tuple[int, Optional[datetime]]: 项目数和最大的updated_at，没有项目时为(0, None)
+        """
+        row = (await self.session.execute(select(func.count(Project.id), func.max(Project.updated_at)))).one()
+        return row[0], row[1]
+        
+    async def get_crawl_states(self, repo_urls: List[str], chunk_size: int = 500) -> Dict[str, Optional[datetime]]:
+        """
+        批量获取项目的最近爬取时间
+        
+        Args:
+            repo_urls: 仓库地址列表
+            chunk_size: 每次查询的地址数，避免超出数据库的参数个数限制
+            
+        Returns:
+            Dict[str, Optional[datetime]]: 仓库地址到last_crawled_at的映射，不包含未入库的项目
+        """
+        states = {}
+        for start in range(0, len(repo_urls), chunk_size):
+            rows = await self.session.execute(
+                select(Project.repo_url, Project.last_crawled_at)
+                .where(Project.repo_url.in_(repo_urls[start:start + chunk_size]))
+            )
+            states.update({row.repo_url: row.last_crawled_at for row in rows})
+        return states
+        
+    async def upsert_project(self, project_data: Dict) -> Tuple[Project, bool]:
+        """
+        按repo_url创建或更新项目
+        已存在的项目只更新project_data中提供的字段，分类和标签整体替换
+        
+        Args:
+            project_data: 项目数据，必须包含repo_url
+            
+        Returns:
+            Tuple[Project, bool]: 项目和是否为新建
+        """
+        project = await self.session.scalar(
+            select(Project)
+            .where(Project.repo_url == project_data["repo_url"])
+            .options(selectinload(Project.categories), selectinload(Project.tags))
+        )
+        if project is None:
+            return await self.create_project(project_data), True
+            
+        for key, value in project_data.items():
+            if key == "categories":
+                project.categories = await self._resolve_labels(Category, value)
+            elif key == "tags":
+                project.tags = await self._resolve_labels(Tag, value)
+            elif hasattr(project, key):
+                setattr(project, key, value)
+        if "readme_content" in project_data:
+            project.readme_outline = dump_outline(project.readme_content)
+                
+        now = datetime.utcnow()
+        project.search_score = popularity_prior(project.stars, project.forks)
+        project.last_crawled_at = project_data.get("last_crawled_at") or now
+        project.updated_at = now
+        await self.session.commit()
+        await self._invalidate_caches()
+        return project, False
+        
+    async def upsert_projects(
+        self,
+        projects_data: List[Dict],
+        chunk_size: Optional[int] = 500,
+        replace_labels: Union[bool, Collection[str]] = True,
+        mark_crawled: bool = True
+    ) -> Dict[str, int]:
+        """
+        批量创建或更新项目
+        
+        每个分块内：已存在的项目按主键批量更新，新项目使用
+        INSERT ... ON CONFLICT(repo_url) DO UPDATE 批量写入，分类/标签名称一次性查询并
+        批量插入缺失项，关联关系批量插入，语句数与分块大小无关。
+        已存在的项目只更新project_data中提供的字段，新项目必须提供name；
+        新项目还可以提供id、created_at和updated_at（如从快照恢复），已存在的项目忽略这些字段。
+        不支持ON CONFLICT的数据库退回逐条upsert_project。
+        
+        Args:
+            projects_data: 项目数据列表，每项必须包含repo_url
+            chunk_size: 每次提交的项目数，None表示在单个事务中提交全部数据
+            replace_labels: 为True时用提供的分类/标签替换原有关联，为False时只追加；
+                也可以传入字段名集合（如{"tags"}），只替换其中的字段，其余字段追加
+            mark_crawled: 是否更新last_crawled_at；数据并非来自GitHub抓取时应为False，
+                以免增量刷新跳过这些仓库。项目数据中的last_crawled_at为抓取时间，未提供时使用写入时间
+            
+        Returns:
+            Dict[str, int]: 新建数（new）和更新数（updated）
+        """
+        # 同一repo_url只保留最后一条，ON CONFLICT不允许在一条语句中重复更新同一行
+        deduped = list({data["repo_url"]: data for data in projects_data}.values())
+        stats = {"new": 0, "updated": 0}
+        
+        insert = _UPSERT_DIALECTS.get(self.session.bind.dialect.name)
+        if insert is None:
+            for data in deduped:
+                _, created = await self.upsert_project(data)
+                stats["new" if created else "updated"] += 1
+            return stats
+            
+        if isinstance(replace_labels, bool):
+            replace_labels = {"categories", "tags"} if replace_labels else set()
+        chunk_size = chunk_size or max(len(deduped), 1)
+        for start in range(0, len(deduped), chunk_size):
+            chunk = deduped[start:start + chunk_size]
+            chunk_stats = await self._upsert_chunk(insert, chunk, replace_labels, mark_crawled)
+            stats["new"] += chunk_stats["new"]
+            stats["updated"] += chunk_stats["updated"]
+            await self.session.commit()
+        await self._invalidate_caches()
+        return stats
+        
+    async def _upsert_chunk(
+        self,
+        insert,
+        chunk: List[Dict],
+        replace_labels: Collection[str],
+        mark_crawled: bool = True
+    ) -> Dict[str, int]:
+        """
+        写入一个分块的项目，不提交事务
+        
+        Args:
+            insert: 方言的insert构造函数
+            chunk: 项目数据
+            replace_labels: 替换原有关联的字段（categories、tags）
+            mark_crawled: 是否更新last_crawled_at
+            
+        Returns:
+            Dict[str, int]: 新建数和更新数
+        """
+        repo_urls = [data["repo_url"] for data in chunk]
+        # 已存在项目的id和star/fork数，只更新其中一项时热度先验需要另一项的现值
+        current = {
+            row.repo_url: row for row in (await self.session.execute(
+                select(Project.repo_url, Project.id, Project.stars, Project.forks)
+                .where(Project.repo_url.in_(repo_urls))
+            )).all()
+        }
+        project_ids = {repo_url: row.id for repo_url, row in current.items()}
+        existing = set(project_ids)
+        
+        now = datetime.utcnow()
+        updates, inserts = [], {}
+        for data in chunk:
+            row = {key: data[key] for key in _PROJECT_FIELDS if key in data}
+            if "stars" in row or "forks" in row:
+                previous = current.get(row["repo_url"])
+                row["search_score"] = popularity_prior(
+                    row["stars"] if "stars" in row else previous and previous.stars,
+                    row["forks"] if "forks" in row else previous and previous.forks
+                )
+            if "readme_content" in row:
+                row["readme_outline"] = dump_outline(row["readme_content"])
+            if mark_crawled:
+                row["last_crawled_at"] = data.get("last_crawled_at") or now
+            row["updated_at"] = now
+            if row["repo_url"] in project_ids:
+                row["id"] = project_ids[row["repo_url"]]
+                updates.append(row)
+            else:
+                row.update({key: data[key] for key in _INSERT_ONLY_FIELDS if data.get(key) is not None})
+                row.setdefault("created_at", now)
+                # 按提供的字段分组，保证同一条INSERT中的行具有相同的列
+                inserts.setdefault(tuple(sorted(row)), []).append(row)
+                
+        # 已存在的项目按主键批量更新，只写入提供的字段
+        if updates:
+            await self.session.execute(update(Project), updates)
+            
+        # 新项目批量插入；ON CONFLICT兜底处理与其他写入者的并发插入，不覆盖对方的id和创建时间
+        for columns, rows in inserts.items():
+            statement = insert(Project).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=[Project.repo_url],
+                set_={
+                    column: statement.excluded[column] for column in columns
+                    if column not in ("repo_url", "id", "created_at")
+                }
+            )
+            await self.session.execute(statement)
+        if self.session.bind.dialect.name == "postgresql" and any("id" in columns for columns in inserts):
+            # 显式写入id后同步自增序列，避免之后的插入与这些id冲突
+            await self.session.execute(text(
+                "SELECT setval(pg_get_serial_sequence('projects', 'id'), (SELECT max(id) FROM projects))"
+            ))
+        if inserts:
+            project_ids.update((await self.session.execute(
+                select(Project.repo_url, Project.id)
+                .where(Project.repo_url.in_([url for url in repo_urls if url not in existing]))
+            )).all())
+            
+        await self._upsert_links(
+            insert, chunk, project_ids, "categories", Category, project_category, "category_id",
+            "categories" in replace_labels
+        )
+        await self._upsert_links(insert, chunk, project_ids, "tags", Tag, project_tag, "tag_id", "tags" in replace_labels)
+        
+        # 批量写入绕过了ORM，使会话中缓存的项目对象失效
+        self.session.expire_all()
+        new = len(set(repo_urls) - existing)
+        return {"new": new, "updated": len(repo_urls) - new}
+        
+    async def _upsert_links(
+        self,
+        insert,
+        chunk: List[Dict],
+        project_ids: Dict[str, int],
+        field: str,
+        model,
+        link_table,
+        link_column: str,
+        replace_labels: bool
+    ) -> None:
+        """
+        批量写入分类/标签及其与项目的关联
+        
+        Args:
+            insert: 方言的insert构造函数
+            chunk: 项目数据
+            project_ids: repo_url到项目ID的映射
+            field: project_data中的字段名（categories或tags）
+            model: Category或Tag
+            link_table: 关联表
+            link_column: 关联表中指向分类/标签的列名
+            replace_labels: 是否替换原有关联
+        """
+        labelled = [data for data in chunk if field in data]
+        if not labelled:
+            return
+            
+        names = {name for data in labelled for name in data[field]}
+        label_ids = {}
+        if names:
+            await self.session.execute(
+                insert(model)
+                .values([{"name": name, "created_at": datetime.utcnow()} for name in names])
+                .on_conflict_do_nothing(index_elements=[model.name])
+            )
+            label_ids = dict((await self.session.execute(
+                select(model.name, model.id).where(model.name.in_(names))
+            )).all())
+            
+        if replace_labels:
+            await self.session.execute(
+                delete(link_table).where(
+                    link_table.c.project_id.in_([project_ids[data["repo_url"]] for data in labelled])
+                )
+            )
+        links = {
+            (project_ids[data["repo_url"]], label_ids[name])
+            for data in labelled
+            for name in data[field]
+        }
+        if links:
+            await self.session.execute(
+                insert(link_table)
+                .values([{"project_id": pid, link_column: lid} for pid, lid in links])
+                .on_conflict_do_nothing()
+            )
+        
+    async def get_projects_by_ids(self, project_ids: List[int]) -> List[Dict]:
+        """
+        按id批量获取项目，保持传入的顺序
+        
+        Args:
+            project_ids: 项目id列表
+            
+        Returns:
+            List[Dict]: 项目信息字典，不存在的id被忽略
+        """
+        if not project_ids:
+            return []
+        result = await self.session.execute(
+            select(Project)
+            .where(Project.id.in_(project_ids))
+            .options(
+                defer(Project.readme_content),
+                selectinload(Project.categories),
+                selectinload(Project.tags)
+            )
+        )
+        projects = {project.id: project for project in result.scalars()}
+        return [self._project_to_dict(projects[project_id]) for project_id in project_ids if project_id in projects]
+        
+    async def filter_ids(
+        self,
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        filters: Optional[str] = None
+    ) -> Optional[List[int]]:
+        """
+        满足过滤条件的项目id，用于在其他检索方式中复用过滤
+        
+        Args:
+            category: 分类
+            tags: 标签列表
+            filters: 过滤表达式
+            
+        Returns:
+            Optional[List[int]]: 项目id列表，没有过滤条件时返回None
+            
+        Raises:
+            ValueError: 过滤表达式无效
+        """
+        node = combine_filters(label_filter(category, tags), parse_filter(filters))
+        if node is None:
+            return None
+        return list(await self.session.scalars(select(Project.id).where(filter_clause(node))))
+        
+    async def get_label_entries(self) -> List[Tuple[str, List[str], List[str], int]]:
+        """
+        获取全部项目的名称、分类、标签和star数，用于构建模糊匹配索引
+        
+        Returns:
+            List[Tuple[str, List[str], List[str], int]]: (名称, 分类列表, 标签列表, star数)
+        """
+        result = await self.session.execute(
+            select(Project)
+            .options(
+                defer(Project.readme_content),
+                selectinload(Project.categories),
+                selectinload(Project.tags)
+            )
+        )
+        return [
+            (
+                project.name,
+                [category.name for category in project.categories],
+                [tag.name for tag in project.tags],
+                project.stars or 0
+            )
+            for project in result.scalars()
+        ]
+        
+    async def find_project_readme(self, project: str) -> Optional[Dict]:
+        """
+        按仓库地址或名称查找项目、README大小及写入时生成的章节目录，不读取README内容
+        
+        Args:
+            project: 仓库地址或项目名称，名称重复时取star数最多的项目
+            
+        Returns:
+            Optional[Dict]: id、name、repo_url、updated_at、README的UTF-8字节数size和章节目录sections，
+                找不到时返回None
+        """
+        row = (await self.session.execute(
+            select(
+                Project.id,
+                Project.name,
+                Project.repo_url,
+                Project.updated_at,
+                func.coalesce(func.length(cast(Project.readme_content, LargeBinary)), 0),
+                Project.readme_outline
+            )
+            .where(or_(Project.repo_url == project, Project.name == project))
+            .order_by(case((Project.repo_url == project, 0), else_=1), Project.stars.desc(), Project.id)
+            .limit(1)
+        )).first()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "name": row[1],
+            "repo_url": row[2],
+            "updated_at": row[3].isoformat() if row[3] else None,
+            "size": row[4],
+            "sections": load_outline(row[5])
+        }
+        
+    async def backfill_readme_outlines(self, batch_size: int = 200) -> int:
+        """
+        为尚无章节目录的项目生成目录
+        用于升级前写入的数据库，每批只读取该批项目的README
+        
+        Args:
+            batch_size: 每批处理的项目数
+            
+        Returns:
+            int: 处理的项目数
+        """
+        total, after_id = 0, 0
+        while True:
+            rows = (await self.session.execute(
+                select(Project.id, Project.readme_content)
+                .where(Project.readme_outline.is_(None), Project.id > after_id)
+                .order_by(Project.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            await self.session.execute(update(Project), [
+                {"id": row.id, "readme_outline": dump_outline(row.readme_content)} for row in rows
+            ])
+            total += len(rows)
+            after_id = rows[-1].id
+        await self.session.commit()
+        return total
+        
+    async def read_readme_bytes(self, project_id: int, offset: int, length: int) -> bytes:
+        """
+        在数据库中截取README的字节范围，只有该范围被读入内存
+        
+        Args:
+            project_id: 项目id
+            offset: 起始字节偏移
+            length: 字节数
+            
+        Returns:
+            bytes: README的UTF-8字节[offset, offset + length)
+        """
+        data = await self.session.scalar(
+            select(func.substr(cast(Project.readme_content, LargeBinary), offset + 1, length))
+            .where(Project.id == project_id)
+        )
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return bytes(data or b"")
+        
+    async def iter_projects(
+        self,
+        batch_size: int = 500,
+        after_id: int = 0,
+        include_readme: bool = False
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        按id顺序分批读取全部项目，内存占用只与批大小有关
+        
+        Args:
+            batch_size: 每批项目数
+            after_id: 从id大于该值的项目开始
+            include_readme: 是否包含readme_content
+            
+        Yields:
+            List[Dict]: 一批项目，字段同_project_to_dict，include_readme时另含readme_content
+        """
+        options = [selectinload(Project.categories), selectinload(Project.tags)]
+        if not include_readme:
+            options.append(defer(Project.readme_content))
+        while True:
+            projects = (await self.session.execute(
+                select(Project)
+                .where(Project.id > after_id)
+                .order_by(Project.id)
+                .limit(batch_size)
+                .options(*options)
+            )).scalars().all()
+            if not projects:
+                return
+            batch = []
+            for project in projects:
+                data = self._project_to_dict(project)
+                if include_readme:
+                    data["readme_content"] = project.readme_content or ""
+                batch.append(data)
+            after_id = projects[-1].id
+            # 已导出的对象不再需要，释放会话的标识映射
+            self.session.expunge_all()
+            yield batch
+            if len(projects) < batch_size:
+                return
+                
+    async def get_urls_by_source(
+        self,
+        sources: Optional[List[str]] = None,
+        prefix: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        按来源查询项目地址
+        
+        Args:
+            sources: 来源列表
+            prefix: 来源前缀，与sources二选一
+            
+        Returns:
+            Dict[str, str]: 仓库地址到来源的映射
+        """
+        query = select(Project.repo_url, Project.source)
+        if sources is not None:
+            query = query.where(Project.source.in_(sources))
+        elif prefix is not None:
+            query = query.where(Project.source.startswith(prefix, autoescape=True))
+        else:
+            query = query.where(Project.source.isnot(None))
+        return dict((await self.session.execute(query)).all())
+        
+    async def delete_projects(self, repo_urls: List[str], chunk_size: int = 500) -> int:
+        """
+        批量删除项目及其分类/标签关联
+        
+        Args:
+            repo_urls: 仓库地址列表
+            chunk_size: 每条语句处理的地址数
+            
+        Returns:
+            int: 删除的项目数
+        """
+        deleted = 0
+        for start in range(0, len(repo_urls), chunk_size):
+            ids = select(Project.id).where(Project.repo_url.in_(repo_urls[start:start + chunk_size]))
+            await self.session.execute(delete(project_category).where(project_category.c.project_id.in_(ids)))
+            await self.session.execute(delete(project_tag).where(project_tag.c.project_id.in_(ids)))
+            result = await self.session.execute(
+                delete(Project).where(Project.repo_url.in_(repo_urls[start:start + chunk_size]))
+            )
+            deleted += result.rowcount or 0
+        await self.session.commit()
+        self.session.expire_all()
+        await self._invalidate_caches()
+        return deleted
+        
+    async def get_catalogue_commit(self, repo_url: str) -> Optional[str]:
+        """
+        获取目录仓库最近一次索引的提交
+        
+        Args:
+            repo_url: 目录仓库地址
+            
+        Returns:
+            Optional[str]: 提交哈希，尚未索引时返回None
+        """
+        return (await self.session.execute(
+            select(CatalogueState.commit).where(CatalogueState.repo_url == repo_url)
+        )).scalar_one_or_none()
+        
+    async def set_catalogue_commit(self, repo_url: str, commit: str) -> None:
+        """
+        记录目录仓库已索引到的提交
+        
+        Args:
+            repo_url: 目录仓库地址
+            commit: 提交哈希
+        """
+        state = (await self.session.execute(
+            select(CatalogueState).where(CatalogueState.repo_url == repo_url)
+        )).scalar_one_or_none()
+        if state is None:
+            self.session.add(CatalogueState(repo_url=repo_url, commit=commit, indexed_at=datetime.utcnow()))
+        else:
+            state.commit = commit
+            state.indexed_at = datetime.utcnow()
+        await self.session.commit()
+        
+    async def update_project(self, project_id: int, project_data: Dict) -> Optional[Project]:
         """
         更新项目信息
         
@@ -76,7 +742,7 @@ class ProjectService:
         Returns:
             Optional[Project]: 更新后的项目
         """
-        project = self.session.query(Project).get(project_id)
+        project = await self.session.get(Project, project_id)
         if not project:
             return None
             
@@ -84,81 +750,263 @@ class ProjectService:
         for key, value in project_data.items():
             if hasattr(project, key):
                 setattr(project, key, value)
+        if "readme_content" in project_data:
+            project.readme_outline = dump_outline(project.readme_content)
                 
+        project.search_score = popularity_prior(project.stars, project.forks)
         project.updated_at = datetime.utcnow()
-        self.session.commit()
+        await self.session.commit()
+        await self._invalidate_caches()
         return project
         
-    def search_projects(
+    async def refresh_search_scores(self, batch_size: int = 1000) -> int:
+        """
+        重新计算所有项目的热度先验
+        用于回填历史数据或调整打分规则之后
+        
+        Args:
+            batch_size: 每批处理的项目数
+            
+        Returns:
+            int: 处理的项目数
+        """
+        rows = (await self.session.execute(select(Project.id, Project.stars, Project.forks))).all()
+        for start in range(0, len(rows), batch_size):
+            await self.session.execute(update(Project), [
+                {"id": row.id, "search_score": popularity_prior(row.stars, row.forks)}
+                for row in rows[start:start + batch_size]
+            ])
+        await self.session.commit()
+        await self._invalidate_caches()
+        return len(rows)
+        
+    async def search_projects(
         self,
         query: str,
         page: int = 1,
         size: int = 10,
         category: Optional[str] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[str] = None,
+        facets: bool = False,
+        facet_limit: int = DEFAULT_FACET_LIMIT
     ) -> Dict:
         """
         搜索项目
         
+        支持两种分页方式：页码分页（page）和游标分页（cursor）。
+        游标分页按排序键定位，深翻页的代价与页码无关，且不受并发写入造成的结果偏移影响；
+        提供cursor时忽略page。
+        
         Args:
             query: 搜索关键词
             page: 页码
             size: 每页大小
             category: 分类
             tags: 标签列表
+            cursor: 上一次结果中的next_cursor
+            filters: 过滤表达式，语法见facets.parse_filter，与category、tags同时生效
+            facets: 是否返回完整结果集上的分类、标签和语言分面计数
+            facet_limit: 每个分面返回的取值个数
+            
+        Returns:
+            Dict: 搜索结果，next_cursor为空表示没有更多结果；facets为True时包含facets字段
             
+        Raises:
+            ValueError: 游标或过滤表达式无效
+        """
+        cache_key = None
+        if self.result_cache is not None:
+            # 关键词匹配不区分大小写，规范化后再生成缓存键
+            cache_key = make_cache_key(
+                "search",
+                query=" ".join((query or "").lower().split()),
+                page=None if cursor else page,
+                size=size,
+                category=category,
+                tags=tags or [],
+                cursor=cursor,
+                filters=" ".join((filters or "").split()),
+                facets=facet_limit if facets else 0,
+                min_score=self.min_score,
+                count_mode=self.count_mode
+            )
+            cached = await self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            # 记录查询前的代数，查询期间若有写入则放弃缓存本次结果
+            generation = await self.result_cache.generation()
+                
+        node = combine_filters(label_filter(category, tags), parse_filter(filters))
+        results, filtered_query = await self._search_projects(query, page, size, node, cursor)
+        if facets:
+            results["facets"] = await self._facet_counts(filtered_query, facet_limit)
+        if cache_key is not None:
+            await self.result_cache.set(cache_key, results, generation=generation)
+        return results
+        
+    async def _search_projects(
+        self,
+        query: str,
+        page: int,
+        size: int,
+        node: Optional[Tuple],
+        cursor: Optional[str]
+    ) -> Tuple[Dict, object]:
+        """
+        执行搜索查询，node为合并后的过滤语法树，其余参数同search_projects
+        
         Returns:
-            Dict: 搜索结果
+            Tuple[Dict, object]: 搜索结果，以及过滤后、分页前的查询（用于计算分面）
         """
         # 基础查询
-        base_query = self.session.query(Project)
+        base_query = select(Project)
+        score = None
         
-        # 关键词搜索
+        # 关键词搜索：相关度与预计算的热度先验融合打分
         if query:
-            base_query = base_query.filter(
-                or_(
-                    Project.name.ilike(f"%{query}%"),
-                    Project.description.ilike(f"%{query}%"),
-                    Project.readme_content.ilike(f"%{query}%")
-                )
-            )
+            text_match = self.search_backend.match(query)
+            if text_match is not None:
+                # 相关度除以本次查询的最高相关度（见ranking.normalize_relevance），min_score为相对阈值
+                relevance = text_match.c.relevance
+                ranked = select(
+                    text_match.c.project_id,
+                    func.coalesce(relevance / func.nullif(func.max(relevance).over(), 0.0), 1.0).label("relevance")
+                ).subquery("ranked")
+                score = blend_score(ranked.c.relevance, Project.search_score).label("score")
+                base_query = select(Project, score)\
+                    .join(ranked, ranked.c.project_id == Project.id)
+                if self.min_score > 0:
+                    base_query = base_query.where(score >= self.min_score)
             
-        # 分类过滤
-        if category:
-            base_query = base_query.join(Project.categories).filter(Category.name == category)
-            
-        # 标签过滤
-        if tags:
-            for tag in tags:
-                base_query = base_query.join(Project.tags).filter(Tag.name == tag)
+        # 分类、标签、语言和star范围过滤，均为projects上的条件，不增加连接
+        if node is not None:
+            base_query = base_query.where(filter_clause(node))
                 
         # 计算总数
-        total = base_query.count()
+        total = await self._count(base_query, (query, node, self.min_score))
+        filtered_query = base_query
+        
+        # 排序：关键词搜索按得分，浏览按star数；id作为唯一的次级排序键，保证游标稳定
+        if score is not None:
+            order, sort_key = "score", score
+        else:
+            order, sort_key = "stars", Project.stars
+        base_query = base_query.order_by(sort_key.desc(), Project.id.desc())
         
-        # 分页
-        projects = base_query.order_by(Project.stars.desc())\
-            .offset((page - 1) * size)\
-            .limit(size)\
-            .all()
+        # 分页：提供游标时按键集定位，否则按页码偏移
+        if cursor:
+            last_key, last_id = decode_cursor(cursor, order)
+            base_query = base_query.where(tuple_(sort_key, Project.id) < tuple_(last_key, last_id))
+        else:
+            base_query = base_query.offset((page - 1) * size)
+            
+        # 多取一条用于判断是否还有下一页；分类和标签批量预加载，避免逐行懒加载；
+        # 结果中不包含README，不加载该字段
+        result = await self.session.execute(base_query.options(
+            defer(Project.readme_content),
+            selectinload(Project.categories),
+            selectinload(Project.tags)
+        ).limit(size + 1))
+        rows = result.all() if score is not None else result.scalars().all()
+        has_more = len(rows) > size
+        rows = rows[:size]
+            
+        if score is not None:
+            items = [self._project_to_dict(p, score=s) for p, s in rows]
+        else:
+            items = [self._project_to_dict(p) for p in rows]
+            
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            if score is not None:
+                next_cursor = encode_cursor(order, [last[1], last[0].id])
+            else:
+                next_cursor = encode_cursor(order, [last.stars, last.id])
             
         return {
             "total": total,
             "page": page,
             "size": size,
-            "items": [self._project_to_dict(p) for p in projects]
+            "items": items,
+            "next_cursor": next_cursor
+        }, filtered_query
+        
+    async def _facet_counts(self, filtered_query, limit: int) -> Dict[str, List[Dict]]:
+        """
+        统计结果集中各分类、标签和语言的项目数，每个分面一次分组查询
+        
+        Args:
+            filtered_query: 过滤后、分页前的查询
+            limit: 每个分面返回的取值个数
+            
+        Returns:
+            Dict[str, List[Dict]]: 分面名到[{"value", "count"}]的映射，按数量降序
+        """
+        ids = filtered_query.with_only_columns(Project.id).order_by(None).subquery()
+        facet_queries = {
+            "category": select(Category.name, func.count())
+                .join(project_category, project_category.c.category_id == Category.id)
+                .join(ids, ids.c.id == project_category.c.project_id)
+                .group_by(Category.name),
+            "tag": select(Tag.name, func.count())
+                .join(project_tag, project_tag.c.tag_id == Tag.id)
+                .join(ids, ids.c.id == project_tag.c.project_id)
+                .group_by(Tag.name),
+            "language": select(Project.language, func.count())
+                .join(ids, ids.c.id == Project.id)
+                .where(Project.language.is_not(None), Project.language != "")
+                .group_by(Project.language),
         }
+        facets = {}
+        for field, facet_query in facet_queries.items():
+            rows = await self.session.execute(
+                facet_query.order_by(func.count().desc(), facet_query.selected_columns[0]).limit(limit)
+            )
+            facets[field] = [{"value": value, "count": count} for value, count in rows]
+        return facets
+        
+    async def _count(self, base_query, cache_key: Tuple) -> Optional[int]:
+        """
+        按count_mode计算结果总数
+        
+        Args:
+            base_query: 过滤后的查询
+            cache_key: 缓存键
+            
+        Returns:
+            Optional[int]: 结果总数，count_mode为none时返回None
+        """
+        if self.count_mode == "none":
+            return None
+        if self.count_mode == "cached":
+            total = self.count_cache.get(cache_key)
+            if total is not None:
+                return total
+        # 只统计id，避免在子查询中携带README等大字段
+        total = await self.session.scalar(
+            select(func.count()).select_from(
+                base_query.with_only_columns(Project.id).order_by(None).subquery()
+            )
+        )
+        if self.count_mode == "cached":
+            self.count_cache.set(cache_key, total)
+        return total
         
-    def _project_to_dict(self, project: Project) -> Dict:
+    def _project_to_dict(self, project: Project, score: Optional[float] = None) -> Dict:
         """
         将项目对象转换为字典
         
         Args:
             project: 项目对象
+            score: 搜索得分，仅关键词搜索时提供
             
         Returns:
             Dict: 项目信息字典
         """
-        return {
+        result = {
             "id": project.id,
             "name": project.name,
             "description": project.description,
@@ -170,4 +1018,7 @@ class ProjectService:
             "tags": [t.name for t in project.tags],
             "created_at": project.created_at.isoformat(),
             "updated_at": project.updated_at.isoformat()
-        } 
\ No newline at end of file
+        }
+        if score is not None:
+            result["score"] = round(score, 6)
+        return result 
\ No newline at end of file
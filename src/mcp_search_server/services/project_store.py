@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+项目存储
+面向读取优化的进程内项目存储，搜索和浏览不再访问数据库
+"""
+
+import asyncio
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..models.database import Project
+from ..utils.pagination import encode_cursor, decode_cursor
+from .facets import DEFAULT_FACET_LIMIT, FACET_FIELDS, combine_filters, label_filter, parse_filter
+from .ranking import blend_score, normalize_relevance, popularity_prior
+from .text_index import TextIndex
+
+
+class ProjectRecord:
+    """项目记录，不包含README等大字段"""
+
+    __slots__ = (
+        "id", "name", "description", "repo_url", "language",
+        "created_at", "updated_at", "categories", "tags"
+    )
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        description: Optional[str],
+        repo_url: str,
+        language: Optional[str],
+        created_at: Optional[datetime],
+        updated_at: Optional[datetime],
+        categories: Tuple[str, ...],
+        tags: Tuple[str, ...]
+    ):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.repo_url = repo_url
+        self.language = language
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.categories = categories
+        self.tags = tags
+
+
+def iter_bits(bits: int) -> Iterable[int]:
+    """
+    按升序枚举位图中为1的位
+
+    Args:
+        bits: 位图
+
+    Returns:
+        Iterable[int]: 位编号
+    """
+    binary = bin(bits)[:1:-1]
+    position = binary.find("1")
+    while position != -1:
+        yield position
+        position = binary.find("1", position + 1)
+
+
+# 文档数少于总数1/32的标签保存为文档编号数组（每项4字节），比同样文档数下的位图（每文档1位）更小
+SPARSE_LABEL_RATIO = 32
+
+
+def label_set(docs: Sequence[int], size: int) -> Union[int, Sequence[int]]:
+    """
+    按标签的文档数选择成员集合的表示
+
+    Args:
+        docs: 升序的文档编号
+        size: 文档总数
+
+    Returns:
+        Union[int, Sequence[int]]: 文档较少时为文档编号数组，否则为位图
+    """
+    if len(docs) * SPARSE_LABEL_RATIO < size:
+        # 快照中的文档编号直接引用映射的内存
+        return docs if isinstance(docs, (array, memoryview)) else array("I", docs)
+    return bits_from(docs, size)
+
+
+def bits_from(docs: Iterable[int], size: int) -> int:
+    """
+    由文档编号构建位图
+
+    Args:
+        docs: 文档编号
+        size: 文档总数
+
+    Returns:
+        int: 位图
+    """
+    buffer = bytearray((size + 7) // 8)
+    for doc in docs:
+        buffer[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buffer, "little")
+
+
+async def load_project_records(session: AsyncSession) -> List[Dict]:
+    """
+    从数据库读取全部项目记录，用于构建项目存储和快照
+
+    Args:
+        session: 数据库会话
+
+    Returns:
+        List[Dict]: 项目记录，包含readme_content和search_score
+    """
+    result = await session.execute(
+        select(Project)
+        .options(selectinload(Project.categories), selectinload(Project.tags))
+        .order_by(Project.id)
+    )
+    return [
+        {
+            "id": project.id,
+            "name": project.name,
+            "description": project.description,
+            "repo_url": project.repo_url,
+            "language": project.language,
+            "readme_content": project.readme_content,
+            "stars": project.stars,
+            "forks": project.forks,
+            "search_score": project.search_score,
+            "created_at": project.created_at,
+            "updated_at": project.updated_at,
+            "categories": [category.name for category in project.categories],
+            "tags": [tag.name for tag in project.tags]
+        }
+        for project in result.scalars()
+    ]
+
+
+class ProjectStore:
+    """
+    只读项目存储
+
+    文档编号为记录在存储中的位置：
+    - records保存__slots__记录，不含README；基于快照创建时为按需解码的序列
+    - ids/stars/forks/prior为连续的数值数组
+    - 分类、标签和语言的成员关系按文档数保存：常见的标签为以文档编号为位的整数位图，
+      少见的标签为文档编号数组（见label_set），内存与标签的文档数成正比而不是与总数成正比；
+      过滤表达式在位图上求值，分面计数对位图用bit_count、对数组逐个检查结果集掩码
+    - 关键词检索使用TextIndex倒排索引
+    存储构建后不再修改，数据变化时整体重建并替换。
+    """
+
+    def __init__(
+        self,
+        records: List[ProjectRecord],
+        stars,
+        forks,
+        prior,
+        text_index: TextIndex,
+        order_by_stars=None,
+        ids=None,
+        label_docs: Optional[Dict[str, Dict[str, Iterable[int]]]] = None
+    ):
+        """
+        初始化项目存储
+
+        Args:
+            records: 项目记录，支持按位置访问的序列
+            stars: star数数组
+            forks: fork数数组
+            prior: 热度先验数组
+            text_index: 倒排索引，文档编号与records的位置一致
+            order_by_stars: 预先排好的浏览顺序，不提供时在构建时排序
+            ids: 项目id数组，不提供时从records读取
+            label_docs: 分面字段（category/tag/language）到名称和文档编号列表的映射，
+                不提供时遍历records统计；提供ids和label_docs时构建过程不访问records
+        """
+        self.records = records
+        self.size = len(records)
+        self.ids = ids if ids is not None else array("I", (record.id for record in records))
+        self.doc_by_id = {project_id: doc for doc, project_id in enumerate(self.ids)}
+        self.stars = stars
+        self.forks = forks
+        self.prior = prior
+        self.text_index = text_index
+        self.all_bits = (1 << self.size) - 1
+
+        if label_docs is None:
+            label_docs = {"category": {}, "tag": {}, "language": {}}
+            for doc, record in enumerate(records):
+                for name in record.categories:
+                    label_docs["category"].setdefault(name, []).append(doc)
+                for name in record.tags:
+                    label_docs["tag"].setdefault(name, []).append(doc)
+                if record.language:
+                    label_docs["language"].setdefault(record.language, []).append(doc)
+        self.category_sets = {name: label_set(docs, self.size) for name, docs in label_docs["category"].items()}
+        self.tag_sets = {name: label_set(docs, self.size) for name, docs in label_docs["tag"].items()}
+        self.language_sets = {name: label_set(docs, self.size) for name, docs in label_docs["language"].items()}
+        # 语言过滤不区分大小写
+        self._language_keys: Dict[str, List[str]] = {}
+        for name in self.language_sets:
+            self._language_keys.setdefault(name.lower(), []).append(name)
+        self._facet_sets = {"category": self.category_sets, "tag": self.tag_sets, "language": self.language_sets}
+
+        # 浏览顺序：star数降序，id降序
+        if order_by_stars is None:
+            order_by_stars = array("I", sorted(
+                range(self.size), key=lambda doc: (self.stars[doc], self.ids[doc]), reverse=True
+            ))
+        self.order_by_stars = order_by_stars
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "ProjectStore":
+        """
+        由项目记录构建存储，README只用于建立索引，不保留在存储中
+
+        Args:
+            records: 项目记录，格式同load_project_records
+
+        Returns:
+            ProjectStore: 项目存储
+        """
+        text_index = TextIndex.build(records)
+        return cls(
+            [
+                ProjectRecord(
+                    record["id"],
+                    record["name"],
+                    record.get("description"),
+                    record["repo_url"],
+                    record.get("language"),
+                    record.get("created_at"),
+                    record.get("updated_at"),
+                    tuple(record.get("categories") or ()),
+                    tuple(record.get("tags") or ())
+                )
+                for record in records
+            ],
+            array("i", (record.get("stars") or 0 for record in records)),
+            array("i", (record.get("forks") or 0 for record in records)),
+            array("f", (
+                record["search_score"] if record.get("search_score") is not None
+                else popularity_prior(record.get("stars"), record.get("forks"))
+                for record in records
+            )),
+            text_index
+        )
+
+    @classmethod
+    async def load(cls, session: AsyncSession) -> "ProjectStore":
+        """
+        从数据库加载存储，索引构建在线程中执行
+
+        Args:
+            session: 数据库会话
+
+        Returns:
+            ProjectStore: 项目存储
+        """
+        records = await load_project_records(session)
+        return await asyncio.to_thread(cls.from_records, records)
+
+    def bits_for(self, category: Optional[str] = None, tags: Optional[List[str]] = None) -> int:
+        """
+        计算满足分类和标签条件的文档位图
+
+        Args:
+            category: 分类
+            tags: 标签列表，需同时包含
+
+        Returns:
+            int: 文档位图
+        """
+        return self.evaluate(label_filter(category, tags))
+
+    def filter_ids(
+        self,
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        filters: Optional[str] = None
+    ) -> Optional[List[int]]:
+        """
+        满足过滤条件的项目id，用于在其他检索方式中复用过滤
+
+        Args:
+            category: 分类
+            tags: 标签列表
+            filters: 过滤表达式
+
+        Returns:
+            Optional[List[int]]: 项目id列表，没有过滤条件时返回None
+        """
+        node = combine_filters(label_filter(category, tags), parse_filter(filters))
+        if node is None:
+            return None
+        return [self.ids[doc] for doc in iter_bits(self.evaluate(node))]
+
+    def _stars_bits(self, low: Optional[int], high: Optional[int]) -> int:
+        """star数在闭区间[low, high]内的文档位图，在预排序的浏览顺序上二分定位"""
+        key = lambda doc: -self.stars[doc]
+        start = 0 if high is None else bisect_left(self.order_by_stars, -high, key=key)
+        end = self.size if low is None else bisect_right(self.order_by_stars, -low, key=key)
+        return bits_from(self.order_by_stars[start:end], self.size) if start < end else 0
+
+    def evaluate(self, node: Optional[Tuple]) -> int:
+        """
+        计算过滤语法树对应的文档位图
+
+        Args:
+            node: parse_filter返回的语法树
+
+        Returns:
+            int: 文档位图，语法树为空时为全部文档
+        """
+        if node is None:
+            return self.all_bits
+        kind = node[0]
+        if kind == "and":
+            bits = self.all_bits
+            for child in node[1]:
+                bits &= self.evaluate(child)
+                if not bits:
+                    break
+            return bits
+        if kind == "or":
+            bits = 0
+            for child in node[1]:
+                bits |= self.evaluate(child)
+            return bits
+        if kind == "not":
+            return self.all_bits & ~self.evaluate(node[1])
+        if kind == "range":
+            return self._stars_bits(node[2], node[3])
+        _, field, value = node
+        if field == "language":
+            bits = 0
+            for name in self._language_keys.get(value.lower(), ()):
+                bits |= self._as_bits(self.language_sets[name])
+            return bits
+        return self._as_bits(self._facet_sets[field].get(value, 0))
+
+    def _as_bits(self, members: Union[int, Sequence[int]]) -> int:
+        """将标签的成员集合转换为位图，稀疏标签在查询时临时构建"""
+        return members if isinstance(members, int) else bits_from(members, self.size)
+
+    def facet_counts(self, bits: int, limit: int = DEFAULT_FACET_LIMIT) -> Dict[str, List[Dict]]:
+        """
+        统计结果集中各分类、标签和语言的项目数
+
+        Args:
+            bits: 结果集的文档位图
+            limit: 每个分面返回的取值个数
+
+        Returns:
+            Dict[str, List[Dict]]: 分面名到[{"value", "count"}]的映射，按数量降序
+        """
+        facets = {}
+        mask = bits.to_bytes((self.size + 7) // 8, "little") if bits else b""
+        for field in FACET_FIELDS:
+            counts = []
+            if bits:
+                for name, members in self._facet_sets[field].items():
+                    if isinstance(members, int):
+                        count = (bits & members).bit_count()
+                    else:
+                        count = sum(mask[doc >> 3] >> (doc & 7) & 1 for doc in members)
+                    if count:
+                        counts.append((count, name))
+            top = heapq.nsmallest(limit, counts, key=lambda item: (-item[0], item[1]))
+            facets[field] = [{"value": name, "count": count} for count, name in top]
+        return facets
+
+    def _iter_allowed(self, bits: int) -> Iterable[int]:
+        """按浏览顺序枚举位图中的文档"""
+        mask = bits.to_bytes((self.size + 7) // 8, "little")
+        return (doc for doc in self.order_by_stars if mask[doc >> 3] >> (doc & 7) & 1)
+
+    def to_dict(self, doc: int, score: Optional[float] = None) -> Dict:
+        """
+        转换为结果字典，格式同ProjectService._project_to_dict
+
+        Args:
+            doc: 文档编号
+            score: 搜索得分
+
+        Returns:
+            Dict: 项目信息字典
+        """
+        record = self.records[doc]
+        result = {
+            "id": record.id,
+            "name": record.name,
+            "description": record.description,
+            "repo_url": record.repo_url,
+            "stars": self.stars[doc],
+            "forks": self.forks[doc],
+            "language": record.language,
+            "categories": list(record.categories),
+            "tags": list(record.tags),
+            "created_at": record.created_at.isoformat() if record.created_at else None,
+            "updated_at": record.updated_at.isoformat() if record.updated_at else None
+        }
+        if score is not None:
+            result["score"] = round(score, 6)
+        return result
+
+    def search(
+        self,
+        query: str,
+        page: int = 1,
+        size: int = 10,
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        min_score: float = 0.0,
+        filters: Optional[str] = None,
+        facets: bool = False,
+        facet_limit: int = DEFAULT_FACET_LIMIT,
+        memo: Optional[Dict] = None
+    ) -> Dict:
+        """
+        搜索项目，参数和返回格式同ProjectService.search_projects
+
+        memo为多个查询之间共享的中间结果（词的倒排表合并结果和过滤位图），
+        批量搜索时传入同一个字典即可复用。
+
+        Raises:
+            ValueError: 游标或过滤表达式无效
+        """
+        node = combine_filters(label_filter(category, tags), parse_filter(filters))
+        filtered = node is not None
+        bits = memo.get(("filter", node)) if memo is not None else None
+        if bits is None:
+            bits = self.evaluate(node)
+            if memo is not None:
+                memo[("filter", node)] = bits
+        matched = self.text_index.match(query, memo) if query else None
+
+        if matched is None:
+            # 浏览：预排序的star顺序已是最终顺序，总数由位图计数得到，
+            # 只需扫描到当前页为止
+            order = "stars"
+            total = bits.bit_count()
+            if cursor:
+                last_key = tuple(decode_cursor(cursor, order))
+                if filtered:
+                    docs = self._iter_allowed(bits)
+                    skipped = (doc for doc in docs if (self.stars[doc], self.ids[doc]) < last_key)
+                else:
+                    start = bisect_right(
+                        self.order_by_stars, (-last_key[0], -last_key[1]),
+                        key=lambda doc: (-self.stars[doc], -self.ids[doc])
+                    )
+                    skipped = iter(self.order_by_stars[start:])
+            else:
+                skipped = islice(self._iter_allowed(bits) if filtered else iter(self.order_by_stars),
+                                 (page - 1) * size, None)
+            page_docs = list(islice(skipped, size + 1))
+            has_more = len(page_docs) > size
+            window = [(doc, None) for doc in page_docs[:size]]
+            last_key = [self.stars[window[-1][0]], self.ids[window[-1][0]]] if window else None
+        else:
+            # 关键词：融合得分后用堆选出前k个，无需对全部匹配排序
+            order = "score"
+            prior, ids = self.prior, self.ids
+            # 相关度按全部文本匹配中的最高值归一化（过滤前），与数据库路径一致
+            top = max(matched.values(), default=0.0)
+            if filtered:
+                mask = bits.to_bytes((self.size + 7) // 8, "little")
+                matched = {doc: relevance for doc, relevance in matched.items() if mask[doc >> 3] >> (doc & 7) & 1}
+            candidates = [
+                (blend_score(normalize_relevance(relevance, top), prior[doc]), ids[doc], doc)
+                for doc, relevance in matched.items()
+            ]
+            if min_score > 0:
+                candidates = [candidate for candidate in candidates if candidate[0] >= min_score]
+            total = len(candidates)
+            if facets:
+                bits = bits_from((doc for _, _, doc in candidates), self.size)
+            if cursor:
+                last_key = tuple(decode_cursor(cursor, order))
+                candidates = [candidate for candidate in candidates if candidate[:2] < last_key]
+                start = 0
+            else:
+                start = (page - 1) * size
+            top = heapq.nlargest(start + size + 1, candidates)
+            has_more = len(top) > start + size
+            window = [(doc, score) for score, _, doc in top[start:start + size]]
+            last_key = [window[-1][1], self.ids[window[-1][0]]] if window else None
+
+        results = {
+            "total": total,
+            "page": page,
+            "size": size,
+            "items": [self.to_dict(doc, score) for doc, score in window],
+            "next_cursor": encode_cursor(order, last_key) if has_more and last_key else None
+        }
+        if facets:
+            results["facets"] = self.facet_counts(bits, facet_limit)
+        return results
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索排序
+定义相关度与热度的融合打分规则
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+# 字段权重：名称 > 描述 > README
+FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 10.0,
+    "description": 4.0,
+    "readme_content": 1.0,
+}
+
+# 最终得分 = 相关度 * RELEVANCE_WEIGHT + 热度先验 * POPULARITY_WEIGHT
+RELEVANCE_WEIGHT = 0.7
+POPULARITY_WEIGHT = 0.3
+
+# stars + 2 * forks 达到该值时热度先验饱和为1
+POPULARITY_SATURATION = 10000
+
+
+def popularity_prior(stars: Optional[int], forks: Optional[int]) -> float:
+    """
+    计算项目的热度先验（静态信号），取值范围 [0, 1]
+
+    在写入项目时预先计算并保存到 Project.search_score，查询时无需重复计算。
+
+    Args:
+        stars: star数
+        forks: fork数
+
+    Returns:
+        float: 热度先验
+    """
+    signal = max(stars or 0, 0) + 2 * max(forks or 0, 0)
+    return min(1.0, math.log1p(signal) / math.log1p(POPULARITY_SATURATION))
+
+
+def normalize_relevance(raw, top):
+    """
+    将原始相关度（如BM25）除以本次查询的最高相关度，得到 [0, 1] 内的相对相关度
+
+    BM25的IDF对几乎每个文档都包含的词（如"mcp"）接近0，原始相关度没有固定的量纲，
+    按查询内最高值归一化后，最佳匹配的相关度总是1，min_score因此是相对阈值。
+
+    Args:
+        raw: 原始相关度
+        top: 本次查询所有匹配中的最高原始相关度
+
+    Returns:
+        float: 相对相关度，top不大于0时为1
+    """
+    return raw / top if top > 0 else 1.0
+
+
+def blend_score(relevance, prior):
+    """
+    融合相对相关度与热度先验
+
+    同时适用于Python数值和SQL表达式。
+
+    Args:
+        relevance: normalize_relevance得到的相对相关度
+        prior: 热度先验
+
+    Returns:
+        最终得分，取值范围 [0, 1]
+    """
+    return RELEVANCE_WEIGHT * relevance + POPULARITY_WEIGHT * prior
+
+
+# 倒数排名融合的平滑常数
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """
+    倒数排名融合（RRF），合并多个排序列表
+
+    只使用名次，不要求各列表的得分可比，适合融合关键词得分和向量相似度。
+
+    Args:
+        rankings: 多个按相关度降序排列的项目id列表
+        k: 平滑常数，越大排名靠后的结果影响越大
+
+    Returns:
+        List[Tuple[int, float]]: (项目id, 融合得分)，按得分降序，得分相同时id大的在前
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, project_id in enumerate(ranking, start=1):
+            scores[project_id] = scores.get(project_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+推荐服务
+定时物化推荐池、新增统计和热门列表，使推荐和统计资源的读取不再访问数据库
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, selectinload
+
+from ..models.database import Project
+
+DAILY_PICK_SIZE = 5
+TRENDING_SIZE = 10
+TRENDING_DAYS = 7
+
+# 推荐列表不包含README，分类和标签随每批结果一次性加载
+_LIST_OPTIONS = (
+    defer(Project.readme_content),
+    selectinload(Project.categories),
+    selectinload(Project.tags),
+)
+
+
+class RecommendationSnapshot:
+    """
+    推荐快照
+    保存一次物化的结果以及预先渲染的Markdown
+    """
+
+    __slots__ = (
+        "generated_at", "total_projects", "today_new", "week_new",
+        "pool", "daily", "trending", "recommendations_markdown", "stats_markdown"
+    )
+
+    def __init__(
+        self,
+        generated_at: datetime,
+        total_projects: int,
+        today_new: int,
+        week_new: int,
+        pool: List[Dict],
+        daily: List[Dict],
+        trending: List[Dict]
+    ):
+        """
+        初始化推荐快照
+
+        Args:
+            generated_at: 生成时间
+            total_projects: 项目总数
+            today_new: 今日新增项目数
+            week_new: 本周新增项目数
+            pool: 推荐池
+            daily: 今日推荐项目
+            trending: 热门项目
+        """
+        self.generated_at = generated_at
+        self.total_projects = total_projects
+        self.today_new = today_new
+        self.week_new = week_new
+        self.pool = pool
+        self.daily = daily
+        self.trending = trending
+        self.recommendations_markdown = self._render_recommendations()
+        self.stats_markdown = self._render_stats()
+
+    def _render_recommendations(self) -> str:
+        """生成Markdown格式的推荐列表"""
+        markdown = "# 今日推荐MCP项目\n\n"
+        for project in self.daily:
+            markdown += f"## {project['name']}\n"
+            markdown += f"{project['description']}\n\n"
+            markdown += f"- Stars: {project['stars']}\n"
+            markdown += f"- Language: {project['language']}\n"
+            markdown += f"- URL: {project['repo_url']}\n\n"
+        return markdown
+
+    def _render_stats(self) -> str:
+        """生成Markdown格式的统计信息"""
+        hottest = self.trending[0]["name"] if self.trending else "暂无"
+        return (
+            "# MCP项目统计\n\n"
+            f"- 总项目数: {self.total_projects}\n"
+            f"- 今日新增: {self.today_new}\n"
+            f"- 本周新增: {self.week_new}\n"
+            f"- 本周热门: {hottest}\n"
+            f"- 更新时间: {self.generated_at.isoformat()}\n"
+        )
+
+
+class RecommendationScheduler:
+    """
+    推荐调度器
+    每隔update_interval秒重新物化一次推荐快照，也可以通过run_once手动触发
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        update_interval: float = 86400,
+        pool_size: int = 50,
+        min_stars: int = 10
+    ):
+        """
+        初始化推荐调度器
+
+        Args:
+            session_factory: 返回异步数据库会话上下文管理器的可调用对象
+            update_interval: 更新间隔（秒）
+            pool_size: 推荐池大小
+            min_stars: 进入推荐池的最低star数
+        """
+        self.session_factory = session_factory
+        self.update_interval = update_interval
+        self.pool_size = pool_size
+        self.min_stars = min_stars
+        self.logger = logging.getLogger("recommendation")
+        self.snapshot: Optional[RecommendationSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def get_snapshot(self) -> RecommendationSnapshot:
+        """
+        获取当前快照，尚未生成时立即生成一次
+
+        Returns:
+            RecommendationSnapshot: 推荐快照
+        """
+        if self.snapshot is None:
+            return await self.run_once()
+        return self.snapshot
+
+    async def run_once(self, now: Optional[datetime] = None) -> RecommendationSnapshot:
+        """
+        立即物化一次推荐快照
+
+        Args:
+            now: 当前时间（UTC），默认为调用时刻，测试时可指定
+
+        Returns:
+            RecommendationSnapshot: 新的推荐快照
+        """
+        now = now or datetime.utcnow()
+        async with self._lock:
+            async with self.session_factory() as session:
+                snapshot = await self._build(session, now)
+            self.snapshot = snapshot
+            self.logger.info(
+                f"Recommendation snapshot updated: {snapshot.total_projects} projects, "
+                f"{len(snapshot.pool)} in pool"
+            )
+            return snapshot
+
+    async def _build(self, session: AsyncSession, now: datetime) -> RecommendationSnapshot:
+        """
+        查询数据库生成推荐快照
+
+        Args:
+            session: 数据库会话
+            now: 当前时间（UTC）
+
+        Returns:
+            RecommendationSnapshot: 推荐快照
+        """
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = now - timedelta(days=TRENDING_DAYS)
+
+        # 一次查询得到总数和新增数
+        counts = (await session.execute(
+            select(
+                func.count(Project.id),
+                func.count(Project.id).filter(Project.created_at >= today_start),
+                func.count(Project.id).filter(Project.created_at >= week_start)
+            )
+        )).one()
+
+        pool_rows = (await session.execute(
+            select(Project)
+            .where(Project.stars >= self.min_stars)
+            .order_by(Project.search_score.desc(), Project.stars.desc(), Project.id.desc())
+            .limit(self.pool_size)
+            .options(*_LIST_OPTIONS)
+        )).scalars().all()
+        pool = [self._project_to_dict(project) for project in pool_rows]
+
+        # 热门：最近有更新的项目中star最多的
+        trending_rows = (await session.execute(
+            select(Project)
+            .where(Project.updated_at >= week_start)
+            .order_by(Project.stars.desc(), Project.id.desc())
+            .limit(TRENDING_SIZE)
+            .options(*_LIST_OPTIONS)
+        )).scalars().all()
+        trending = [self._project_to_dict(project) for project in trending_rows] or pool[:TRENDING_SIZE]
+
+        return RecommendationSnapshot(
+            generated_at=now,
+            total_projects=counts[0],
+            today_new=counts[1],
+            week_new=counts[2],
+            pool=pool,
+            daily=self._daily_pick(pool, now),
+            trending=trending
+        )
+
+    @staticmethod
+    def _daily_pick(pool: List[Dict], now: datetime) -> List[Dict]:
+        """
+        从推荐池中按日期轮换选出今日推荐，同一天内结果稳定
+
+        Args:
+            pool: 推荐池
+            now: 当前时间
+
+        Returns:
+            List[Dict]: 今日推荐项目
+        """
+        if len(pool) <= DAILY_PICK_SIZE:
+            return list(pool)
+        offset = (now.toordinal() * DAILY_PICK_SIZE) % len(pool)
+        return [pool[(offset + i) % len(pool)] for i in range(DAILY_PICK_SIZE)]
+
+    @staticmethod
+    def _project_to_dict(project: Project) -> Dict:
+        """转换为推荐列表中的项目，字段与搜索结果（ProjectService._project_to_dict）一致"""
+        return {
+            "id": project.id,
+            "name": project.name,
+            "description": project.description,
+            "repo_url": project.repo_url,
+            "stars": project.stars,
+            "forks": project.forks,
+            "language": project.language,
+            "categories": [c.name for c in project.categories],
+            "tags": [t.name for t in project.tags],
+            "created_at": project.created_at.isoformat() if project.created_at else None,
+            "updated_at": project.updated_at.isoformat() if project.updated_at else None
+        }
+
+    async def _run(self):
+        """后台循环，定期更新快照"""
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.logger.error(f"Failed to update recommendations: {e}")
+            await asyncio.sleep(self.update_interval)
+
+    def start(self):
+        """在当前事件循环中启动后台任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止后台任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+全文检索后端
+为项目搜索提供可插拔的全文索引实现
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type
+from sqlalchemy import Float, Integer, case, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from ..models.database import Project
+from .ranking import FIELD_WEIGHTS
+
+# 查询词法：双引号短语、或普通词（末尾可带*表示前缀）
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def parse_query(query: str) -> List[Dict]:
+    """
+    解析用户查询
+
+    支持的语法：
+    - "model context": 短语查询
+    - file*: 显式前缀查询
+    - file: 普通词，按前缀匹配（与原先子串搜索的体验保持接近）
+
+    Args:
+        query: 用户输入的查询字符串
+
+    Returns:
+        List[Dict]: 查询项列表，每项包含 type(phrase/prefix) 和 terms
+    """
+    clauses = []
+    for match in _QUERY_TOKEN_RE.finditer(query or ""):
+        phrase, word = match.groups()
+        if phrase is not None:
+            terms = _WORD_RE.findall(phrase.lower())
+            if terms:
+                clauses.append({"type": "phrase", "terms": terms})
+            continue
+        for term in _WORD_RE.findall(word.lower()):
+            clauses.append({"type": "prefix", "terms": [term]})
+    return clauses
+
+
+class SearchBackend(ABC):
+    """
+    全文检索后端基类
+
+    后端负责维护索引结构，并把用户查询转换为可与 projects 表连接的子查询，
+    子查询必须包含 project_id 列和非负的 relevance 列（越大越相关）。
+    """
+
+    name = "base"
+
+    async def setup(self, engine: AsyncEngine) -> None:
+        """
+        创建并同步索引结构
+
+        Args:
+            engine: 异步数据库engine
+        """
+
+    @abstractmethod
+    def match(self, query: str):
+        """
+        构造匹配子查询
+
+        Args:
+            query: 用户查询
+
+        Returns:
+            包含 project_id、relevance 列的子查询；查询中没有可检索的词时返回 None
+        """
+
+
+class LikeSearchBackend(SearchBackend):
+    """
+    基于 LIKE 的兜底后端
+    不依赖任何索引，适用于不支持全文索引的数据库；相关度为命中字段的权重之和
+    """
+
+    name = "like"
+
+    def match(self, query: str):
+        query = (query or "").strip()
+        if not query:
+            return None
+        pattern = f"%{query}%"
+        relevance = sum(
+            case((getattr(Project, field).ilike(pattern), weight), else_=0.0)
+            for field, weight in FIELD_WEIGHTS.items()
+        )
+        return select(
+            Project.id.label("project_id"),
+            relevance.label("relevance")
+        ).where(relevance > literal(0.0)).subquery("text_match")
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    SQLite FTS5 后端
+
+    使用 external content 模式的 FTS5 虚拟表对 name/description/readme_content
+    建立倒排索引，并通过触发器与 projects 表保持同步，索引本身不重复存储正文。
+    相关度使用带字段权重的 BM25。
+    """
+
+    name = "fts5"
+    table_name = "projects_fts"
+
+    _DDL = [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+            name, description, readme_content,
+            content='projects', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3 4'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+            INSERT INTO projects_fts(rowid, name, description, readme_content)
+            VALUES (new.id, new.name, new.description, new.readme_content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+            INSERT INTO projects_fts(projects_fts, rowid, name, description, readme_content)
+            VALUES ('delete', old.id, old.name, old.description, old.readme_content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS projects_fts_au
+        AFTER UPDATE OF name, description, readme_content ON projects BEGIN
+            INSERT INTO projects_fts(projects_fts, rowid, name, description, readme_content)
+            VALUES ('delete', old.id, old.name, old.description, old.readme_content);
+            INSERT INTO projects_fts(rowid, name, description, readme_content)
+            VALUES (new.id, new.name, new.description, new.readme_content);
+        END
+        """,
+    ]
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None):
+        """
+        初始化FTS5后端
+
+        Args:
+            field_weights: 各字段的BM25权重，默认使用 ranking.FIELD_WEIGHTS
+        """
+        weights = {**FIELD_WEIGHTS, **(field_weights or {})}
+        # bm25() 的权重参数需按虚拟表的列顺序给出
+        self._bm25_weights = ", ".join(
+            str(float(weights[column])) for column in ("name", "description", "readme_content")
+        )
+        self._fallback = LikeSearchBackend()
+
+    async def setup(self, engine: AsyncEngine) -> None:
+        async with engine.begin() as conn:
+            exists = (await conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": self.table_name}
+            )).first()
+            for statement in self._DDL:
+                await conn.exec_driver_sql(statement)
+            if not exists:
+                # 新建索引时，为已有数据补建倒排索引
+                await conn.exec_driver_sql(
+                    f"INSERT INTO {self.table_name}({self.table_name}) VALUES ('rebuild')"
+                )
+
+    @staticmethod
+    def build_match_expression(query: str) -> str:
+        """
+        将用户查询转换为 FTS5 MATCH 表达式
+
+        所有词都以双引号包裹，避免用户输入中的 FTS5 运算符引发语法错误。
+
+        Args:
+            query: 用户查询
+
+        Returns:
+            str: FTS5 MATCH 表达式，没有可检索的词时返回空字符串
+        """
+        parts = []
+        for clause in parse_query(query):
+            # 引号内的多个词在 FTS5 中即为短语
+            quoted = '"' + " ".join(clause["terms"]) + '"'
+            parts.append(quoted if clause["type"] == "phrase" else f"{quoted}*")
+        return " AND ".join(parts)
+
+    def match(self, query: str):
+        expression = self.build_match_expression(query)
+        if not expression:
+            # 纯符号查询无法分词，退回子串匹配
+            return self._fallback.match(query)
+        # bm25() 越小越相关，取反得到非负的相关度
+        return text(
+            f"SELECT rowid AS project_id, "
+            f"-bm25({self.table_name}, {self._bm25_weights}) AS relevance "
+            f"FROM {self.table_name} WHERE {self.table_name} MATCH :fts_query"
+        ).bindparams(fts_query=expression).columns(
+            project_id=Integer, relevance=Float
+        ).subquery("text_match")
+
+
+_BACKENDS: Dict[str, Type[SearchBackend]] = {
+    LikeSearchBackend.name: LikeSearchBackend,
+    SQLiteFTSBackend.name: SQLiteFTSBackend,
+}
+
+
+def register_search_backend(backend_cls: Type[SearchBackend]) -> Type[SearchBackend]:
+    """
+    注册自定义检索后端，可作为类装饰器使用
+
+    Args:
+        backend_cls: 后端类
+
+    Returns:
+        Type[SearchBackend]: 原样返回后端类
+    """
+    _BACKENDS[backend_cls.name] = backend_cls
+    return backend_cls
+
+
+def create_search_backend(engine: AsyncEngine, name: Optional[str] = None) -> SearchBackend:
+    """
+    创建检索后端
+
+    Args:
+        engine: 异步数据库engine
+        name: 后端名称，为空或 auto 时根据数据库类型自动选择
+
+    Returns:
+        SearchBackend: 检索后端实例
+    """
+    if not name or name == "auto":
+        name = SQLiteFTSBackend.name if engine.dialect.name == "sqlite" else LikeSearchBackend.name
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown search backend: {name}")
+    return _BACKENDS[name]()
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+语义检索
+TF-IDF + 截断SVD（LSA）的轻量向量化和IVF近似最近邻索引，
+向量保存为NumPy矩阵，按内容哈希增量更新；依赖可选的numpy包
+"""
+
+import hashlib
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .ranking import FIELD_WEIGHTS
+from .search_backend import _WORD_RE
+
+# 训练LSA模型时最多使用的文档数，控制全量重训的耗时
+MAX_FIT_DOCUMENTS = 20000
+# 少于该数量的向量直接暴力检索，不建IVF
+MIN_IVF_SIZE = 2048
+# 文档数增长到训练时的该倍数后重新训练模型
+REFIT_GROWTH = 2.0
+# 稀疏矩阵乘法每块处理的非零元数，限制临时内存
+_NNZ_CHUNK = 1 << 20
+
+INDEX_FILE = "index.npz"
+
+# 搜索模式：关键词、语义、两者融合
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("semantic search requires the 'numpy' package, install mcp-search-server[semantic]") from e
+    return numpy
+
+
+def content_hash(record: Dict) -> str:
+    """项目文本的哈希，文本不变时复用已有向量"""
+    digest = hashlib.sha1()
+    for field in FIELD_WEIGHTS:
+        digest.update((record.get(field) or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _term_weights(record: Dict) -> Dict[str, float]:
+    """按字段加权的词频"""
+    weights: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for term in _WORD_RE.findall((record.get(field) or "").lower()):
+            weights[term] = weights.get(term, 0.0) + weight
+    return weights
+
+
+def _csr_matmul(indptr, indices, data, matrix):
+    """
+    稀疏矩阵（CSR三元组）乘稠密矩阵，分块计算
+
+    Args:
+        indptr: 行指针
+        indices: 列号
+        data: 非零值
+        matrix: 稠密矩阵，行数等于稀疏矩阵的列数
+
+    Returns:
+        稠密结果矩阵
+    """
+    np = _numpy()
+    rows = len(indptr) - 1
+    result = np.zeros((rows, matrix.shape[1]), dtype=np.float32)
+    start_row = 0
+    while start_row < rows:
+        # 每块包含尽量多的行，但非零元不超过_NNZ_CHUNK（单行超出时独占一块）
+        end_row = int(np.searchsorted(indptr, indptr[start_row] + _NNZ_CHUNK, side="right")) - 1
+        end_row = min(max(end_row, start_row + 1), rows)
+        lo, hi = indptr[start_row], indptr[end_row]
+        if hi > lo:
+            products = data[lo:hi, None] * matrix[indices[lo:hi]]
+            row_ptr = indptr[start_row:end_row] - lo
+            nonempty = np.flatnonzero(np.diff(indptr[start_row:end_row + 1]))
+            result[start_row + nonempty] = np.add.reduceat(products, row_ptr[nonempty], axis=0)
+        start_row = end_row
+    return result
+
+
+class LsaVectorizer:
+    """
+    LSA向量化器
+
+    文档表示为按字段加权、次线性缩放的TF-IDF，再投影到随机化SVD得到的低维主题空间并归一化。
+    新文档直接用已训练的投影矩阵折叠进来，无需重新训练。
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], idf, components, fitted_documents: int):
+        """
+        初始化向量化器
+
+        Args:
+            vocabulary: 词到列号的映射
+            idf: 每列的idf
+            components: 词到主题空间的投影矩阵（词数 × 维度）
+            fitted_documents: 训练时的文档数
+        """
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.components = components
+        self.fitted_documents = fitted_documents
+
+    @property
+    def dimensions(self) -> int:
+        return self.components.shape[1]
+
+    @classmethod
+    def fit(
+        cls,
+        records: Sequence[Dict],
+        dimensions: int = 128,
+        vocabulary_size: int = 20000,
+        seed: int = 0
+    ) -> "LsaVectorizer":
+        """
+        训练向量化器，文档数超过MAX_FIT_DOCUMENTS时均匀抽样
+
+        Args:
+            records: 项目记录，使用FIELD_WEIGHTS中的字段
+            dimensions: 向量维度
+            vocabulary_size: 词表大小，按文档频率选取
+            seed: 随机种子
+
+        Returns:
+            LsaVectorizer: 向量化器
+        """
+        np = _numpy()
+        step = max(1, math.ceil(len(records) / MAX_FIT_DOCUMENTS))
+        sample = [_term_weights(record) for record in records[::step]]
+        document_frequency: Dict[str, int] = {}
+        for weights in sample:
+            for term in weights:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        # 只出现在一个文档中的词对主题没有贡献
+        terms = sorted(
+            (term for term, count in document_frequency.items() if count > 1 or len(sample) < 3),
+            key=lambda term: (-document_frequency[term], term)
+        )[:vocabulary_size]
+        vocabulary = {term: index for index, term in enumerate(terms)}
+        idf = np.array(
+            [math.log((1 + len(sample)) / (1 + document_frequency[term])) + 1 for term in terms],
+            dtype=np.float32
+        )
+        vectorizer = cls(vocabulary, idf, np.zeros((len(terms), 0), dtype=np.float32), len(records))
+        indptr, indices, data = vectorizer._tfidf(sample)
+        rank = max(1, min(dimensions, len(terms), len(sample)))
+        vectorizer.components = cls._randomized_svd(indptr, indices, data, len(terms), rank, seed)
+        return vectorizer
+
+    @staticmethod
+    def _randomized_svd(indptr, indices, data, columns: int, rank: int, seed: int, oversample: int = 10, iterations: int = 2):
+        """
+        随机化SVD（Halko等），返回右奇异向量矩阵（列数 × rank）
+
+        只使用稀疏矩阵与稠密矩阵的乘法，转置通过按列重排非零元得到。
+        """
+        np = _numpy()
+        order = np.argsort(indices, kind="stable")
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        t_indptr = np.concatenate(([0], np.cumsum(np.bincount(indices, minlength=columns))))
+        t_indices, t_data = rows[order], data[order]
+
+        random = np.random.default_rng(seed)
+        width = min(rank + oversample, columns)
+        sketch = _csr_matmul(indptr, indices, data, random.standard_normal((columns, width)).astype(np.float32))
+        for _ in range(iterations):
+            basis, _ = np.linalg.qr(sketch)
+            basis, _ = np.linalg.qr(_csr_matmul(t_indptr, t_indices, t_data, basis))
+            sketch = _csr_matmul(indptr, indices, data, basis)
+        basis, _ = np.linalg.qr(sketch)
+        # B = Q^T A，小矩阵SVD后取前rank个右奇异向量
+        projected = _csr_matmul(t_indptr, t_indices, t_data, basis).T
+        _, _, vt = np.linalg.svd(projected, full_matrices=False)
+        return np.ascontiguousarray(vt[:rank].T, dtype=np.float32)
+
+    def _tfidf(self, documents: Iterable[Dict[str, float]]):
+        """将词频字典转换为行归一化的TF-IDF稀疏矩阵（CSR三元组）"""
+        np = _numpy()
+        indptr, indices, data = [0], [], []
+        for weights in documents:
+            row = [(self.vocabulary[term], math.log1p(weight)) for term, weight in weights.items() if term in self.vocabulary]
+            row.sort()
+            indices.extend(column for column, _ in row)
+            data.extend(value for _, value in row)
+            indptr.append(len(indices))
+        indptr = np.array(indptr, dtype=np.int64)
+        indices = np.array(indices, dtype=np.int64)
+        data = np.array(data, dtype=np.float32)
+        if len(indices):
+            data *= self.idf[indices]
+            norms = np.sqrt(np.add.reduceat(data ** 2, indptr[:-1][np.diff(indptr) > 0]))
+            data /= np.repeat(norms, np.diff(indptr)[np.diff(indptr) > 0])
+        return indptr, indices, data
+
+    def transform(self, records: Sequence[Dict]):
+        """
+        计算文档向量
+
+        Args:
+            records: 项目记录
+
+        Returns:
+            归一化的向量矩阵（文档数 × 维度），没有已知词的文档为零向量
+        """
+        return self.transform_weights([_term_weights(record) for record in records])
+
+    def transform_weights(self, documents: Sequence[Dict[str, float]]):
+        """由词频字典计算归一化的文档向量"""
+        np = _numpy()
+        vectors = _csr_matmul(*self._tfidf(documents), self.components)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class IvfIndex:
+    """
+    倒排文件（IVF）近似最近邻索引
+
+    用球面k-means把向量划分到若干簇，查询时只扫描与查询最接近的nprobe个簇。
+    """
+
+    def __init__(self, centroids):
+        """
+        初始化索引
+
+        Args:
+            centroids: 簇中心矩阵（簇数 × 维度）
+        """
+        self.centroids = centroids
+        self.order = None
+        self.offsets = None
+
+    @classmethod
+    def train(cls, vectors, iterations: int = 10, seed: int = 0) -> "IvfIndex":
+        """
+        训练簇中心，簇数取向量数的平方根（上限1024）
+
+        Args:
+            vectors: 归一化的向量矩阵
+            iterations: k-means迭代次数
+            seed: 随机种子
+
+        Returns:
+            IvfIndex: 未分配向量的索引
+        """
+        np = _numpy()
+        count = len(vectors)
+        clusters = max(1, min(1024, int(math.sqrt(count))))
+        random = np.random.default_rng(seed)
+        centroids = vectors[random.choice(count, clusters, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = cls(centroids).assign(vectors)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # 空簇保留原中心
+            centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1.0), centroids)
+        return cls(centroids.astype(np.float32))
+
+    def assign(self, vectors, chunk_size: int = 8192):
+        """计算每个向量所属的簇"""
+        np = _numpy()
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            assignment[start:start + chunk_size] = np.argmax(vectors[start:start + chunk_size] @ self.centroids.T, axis=1)
+        return assignment
+
+    def add(self, vectors) -> None:
+        """
+        将全部向量分配到簇并建立倒排表
+
+        Args:
+            vectors: 归一化的向量矩阵
+        """
+        np = _numpy()
+        assignment = self.assign(vectors)
+        self.order = np.argsort(assignment, kind="stable")
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=len(self.centroids)))))
+
+    def candidates(self, query, nprobe: int):
+        """与查询最接近的nprobe个簇中的全部向量行号"""
+        np = _numpy()
+        nprobe = min(nprobe, len(self.centroids))
+        nearest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in nearest])
+
+
+class SemanticIndex:
+    """
+    语义索引
+
+    保存每个项目的向量、项目id和内容哈希；update只为新增或文本变化的项目计算向量，
+    文档数增长到训练时的REFIT_GROWTH倍后重新训练模型并重算全部向量。
+    """
+
+    def __init__(self, dimensions: int = 128, vocabulary_size: int = 20000, nprobe: int = 8, batch_size: int = 1024):
+        """
+        初始化语义索引
+
+        Args:
+            dimensions: 向量维度
+            vocabulary_size: 词表大小
+            nprobe: 查询时扫描的簇数
+            batch_size: 每批计算向量的文档数
+
+        Raises:
+            ImportError: 未安装numpy
+        """
+        np = _numpy()
+        self.dimensions = dimensions
+        self.vocabulary_size = vocabulary_size
+        self.nprobe = nprobe
+        self.batch_size = batch_size
+        self.vectorizer: Optional[LsaVectorizer] = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hashes: List[str] = []
+        self.vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self.ivf: Optional[IvfIndex] = None
+        self._ivf_size = 0
+        self.logger = logging.getLogger("semantic_index")
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def _embed(self, records: Sequence[Dict]):
+        np = _numpy()
+        batches = [
+            self.vectorizer.transform(records[start:start + self.batch_size])
+            for start in range(0, len(records), self.batch_size)
+        ]
+        return np.vstack(batches) if batches else np.zeros((0, self.vectorizer.dimensions), dtype=np.float32)
+
+    def update(self, records: Sequence[Dict]) -> Dict:
+        """
+        按项目记录更新索引，记录中不存在的项目被移除
+
+        只替换而不原地修改已有数组，可以在浅拷贝上更新后整体替换正在使用的索引。
+
+        Args:
+            records: 全部项目记录，需包含id和FIELD_WEIGHTS中的字段
+
+        Returns:
+            Dict: 更新统计，包含embedded、reused、removed、refit
+        """
+        np = _numpy()
+        hashes = [content_hash(record) for record in records]
+        refit = (
+            self.vectorizer is None
+            or len(records) > self.vectorizer.fitted_documents * REFIT_GROWTH
+        )
+        if refit and records:
+            self.vectorizer = LsaVectorizer.fit(records, self.dimensions, self.vocabulary_size)
+            previous = {}
+        else:
+            previous = {(int(project_id), digest): row for row, (project_id, digest) in enumerate(zip(self.ids, self.hashes))}
+
+        reuse_rows, reuse_positions, changed = [], [], []
+        for position, (record, digest) in enumerate(zip(records, hashes)):
+            row = previous.get((record["id"], digest))
+            if row is None:
+                changed.append(position)
+            else:
+                reuse_rows.append(row)
+                reuse_positions.append(position)
+
+        dimensions = self.vectorizer.dimensions if self.vectorizer else self.dimensions
+        vectors = np.zeros((len(records), dimensions), dtype=np.float32)
+        if reuse_rows:
+            vectors[reuse_positions] = self.vectors[reuse_rows]
+        if changed:
+            vectors[changed] = self._embed([records[position] for position in changed])
+
+        removed = self.size - len(reuse_rows)
+        self.ids = np.array([record["id"] for record in records], dtype=np.int64)
+        self.hashes = hashes
+        self.vectors = vectors
+        # 簇中心在重新训练模型或规模翻倍时重新训练，否则只重新分配
+        if len(records) < MIN_IVF_SIZE:
+            self.ivf, self._ivf_size = None, 0
+        elif refit or self.ivf is None or len(records) > self._ivf_size * REFIT_GROWTH:
+            self.ivf, self._ivf_size = IvfIndex.train(vectors), len(records)
+        else:
+            self.ivf = IvfIndex(self.ivf.centroids)
+        if self.ivf is not None:
+            self.ivf.add(vectors)
+        return {"embedded": len(changed), "reused": len(reuse_rows), "removed": removed, "refit": refit}
+
+    def search(self, query: str, limit: int = 100, allowed_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """
+        检索与查询语义最接近的项目
+
+        Args:
+            query: 查询文本
+            limit: 返回条数
+            allowed_ids: 允许返回的项目id，None表示不限制
+
+        Returns:
+            List[Tuple[int, float]]: (项目id, 余弦相似度)，按相似度降序
+        """
+        np = _numpy()
+        if self.vectorizer is None or self.size == 0:
+            return []
+        vector = self.vectorizer.transform_weights([_term_weights({"name": query})])[0]
+        if not vector.any():
+            return []
+        rows = self.ivf.candidates(vector, self.nprobe) if self.ivf is not None else np.arange(self.size)
+        if allowed_ids is not None:
+            allowed = np.fromiter(allowed_ids, dtype=np.int64)
+            rows = rows[np.isin(self.ids[rows], allowed)]
+        if len(rows) == 0:
+            return []
+        scores = self.vectors[rows] @ vector
+        if len(rows) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.lexsort((-self.ids[rows[top]], -scores[top]))]
+        return [(int(self.ids[rows[i]]), float(scores[i])) for i in top if scores[i] > 0]
+
+    def save(self, path: str) -> None:
+        """
+        保存索引，先写入临时文件再原子替换
+
+        Args:
+            path: 索引目录
+        """
+        np = _numpy()
+        if self.vectorizer is None:
+            return
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self.vectorizer.vocabulary, key=self.vectorizer.vocabulary.get)
+        arrays = {
+            "terms": np.array(terms, dtype=str),
+            "idf": self.vectorizer.idf,
+            "components": self.vectorizer.components,
+            "fitted_documents": np.array(self.vectorizer.fitted_documents),
+            "ids": self.ids,
+            "hashes": np.array(self.hashes, dtype="S40"),
+            "vectors": self.vectors,
+        }
+        if self.ivf is not None:
+            arrays["centroids"] = self.ivf.centroids
+            arrays["ivf_size"] = np.array(self._ivf_size)
+        tmp_path = directory / (INDEX_FILE + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, directory / INDEX_FILE)
+
+    def load(self, path: str) -> bool:
+        """
+        加载已保存的索引
+
+        Args:
+            path: 索引目录
+
+        Returns:
+            bool: 是否加载成功，文件不存在或维度与配置不一致时返回False
+        """
+        np = _numpy()
+        index_path = Path(path) / INDEX_FILE
+        if not index_path.is_file():
+            return False
+        with np.load(index_path, allow_pickle=False) as arrays:
+            components = arrays["components"]
+            if components.shape[1] > self.dimensions:
+                self.logger.warning(f"Ignoring semantic index {index_path} built with {components.shape[1]} dimensions")
+                return False
+            terms = arrays["terms"].tolist()
+            self.vectorizer = LsaVectorizer(
+                {term: index for index, term in enumerate(terms)},
+                arrays["idf"],
+                components,
+                int(arrays["fitted_documents"])
+            )
+            self.ids = arrays["ids"]
+            self.hashes = [digest.decode("ascii") for digest in arrays["hashes"].tolist()]
+            self.vectors = arrays["vectors"]
+            if "centroids" in arrays:
+                self.ivf = IvfIndex(arrays["centroids"])
+                self._ivf_size = int(arrays["ivf_size"])
+                self.ivf.add(self.vectors)
+        return True
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索快照
+将项目表、倒排索引和预计算得分写入一个可内存映射的只读文件，
+服务启动时直接映射即可检索，多个工作进程共享同一份页缓存
+"""
+
+import asyncio
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .fuzzy_index import FuzzyIndex
+from .project_store import ProjectRecord, ProjectStore, load_project_records
+from .ranking import popularity_prior
+from .text_index import TextIndex, SECTION_NAMES as TEXT_INDEX_SECTIONS
+
+SNAPSHOT_MAGIC = b"MCPSNAP\x00"
+SNAPSHOT_VERSION = 2
+# 各数据段按8字节对齐，便于直接cast为数值数组
+_ALIGNMENT = 8
+
+_STRING_FIELDS = ("name", "description", "repo_url", "language", "readme_content")
+_EPOCH = datetime(1970, 1, 1)
+_LABEL_CATEGORY = 0
+_LABEL_TAG = 1
+_LABEL_LANGUAGE = 2
+_FACET_FIELDS = {_LABEL_CATEGORY: "category", _LABEL_TAG: "tag", _LABEL_LANGUAGE: "language"}
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    return (value - _EPOCH).total_seconds() if value else 0.0
+
+
+def _datetime(value: float) -> Optional[datetime]:
+    return _EPOCH + timedelta(seconds=value) if value else None
+
+
+def data_version(projects: int, updated_at: Optional[datetime]) -> List:
+    """
+    由项目数和最近的更新时间生成数据版本
+
+    Args:
+        projects: 项目数
+        updated_at: 最大的updated_at
+
+    Returns:
+        List: 可JSON序列化的数据版本
+    """
+    return [projects, _timestamp(updated_at)]
+
+
+def _pack_strings(values: List[str]) -> Tuple[array, bytes]:
+    """将字符串列表编码为偏移数组和连续的UTF-8数据"""
+    offsets = array("Q", [0])
+    chunks = []
+    position = 0
+    for value in values:
+        encoded = (value or "").encode("utf-8")
+        chunks.append(encoded)
+        position += len(encoded)
+        offsets.append(position)
+    return offsets, b"".join(chunks)
+
+
+def write_snapshot(records: List[Dict], path: str) -> Dict:
+    """
+    由项目记录构建快照文件
+
+    文件先写入临时路径再原子替换，已映射旧快照的进程不受影响。
+
+    Args:
+        records: 项目记录，字段同ProjectService._project_to_dict，另含readme_content和search_score
+        path: 快照文件路径
+
+    Returns:
+        Dict: 快照元信息
+    """
+    count = len(records)
+    sections: Dict[str, object] = {}
+
+    # 项目列
+    sections["ids"] = array("I", (record["id"] for record in records))
+    sections["stars"] = array("i", (record.get("stars") or 0 for record in records))
+    sections["forks"] = array("i", (record.get("forks") or 0 for record in records))
+    sections["prior"] = array("f", (
+        record["search_score"] if record.get("search_score") is not None
+        else popularity_prior(record.get("stars"), record.get("forks"))
+        for record in records
+    ))
+    sections["created_at"] = array("d", (_timestamp(record.get("created_at")) for record in records))
+    sections["updated_at"] = array("d", (_timestamp(record.get("updated_at")) for record in records))
+    for field in _STRING_FIELDS:
+        offsets, data = _pack_strings([record.get(field) for record in records])
+        sections[f"{field}.offsets"] = offsets
+        sections[f"{field}.data"] = data
+
+    # 分类和标签：名称表 + 按项目分组的标签编号（CSR格式）；
+    # 名称表中还包含语言，与分类、标签一起按标签分组保存文档编号，加载存储时直接得到分面成员
+    label_ids: Dict[Tuple[int, str], int] = {}
+    label_members: List[array] = []
+    label_ptr = array("I", [0])
+    label_refs = array("I")
+
+    def label_id(kind: int, name: str) -> int:
+        if (kind, name) not in label_ids:
+            label_ids[kind, name] = len(label_ids)
+            label_members.append(array("I"))
+        return label_ids[kind, name]
+
+    for doc, record in enumerate(records):
+        for kind, field in ((_LABEL_CATEGORY, "categories"), (_LABEL_TAG, "tags")):
+            for name in record.get(field) or []:
+                label = label_id(kind, name)
+                label_refs.append(label)
+                label_members[label].append(doc)
+        if record.get("language"):
+            label_members[label_id(_LABEL_LANGUAGE, record["language"])].append(doc)
+        label_ptr.append(len(label_refs))
+    labels = sorted(label_ids, key=label_ids.get)
+    offsets, data = _pack_strings([name for _, name in labels])
+    sections["labels.offsets"] = offsets
+    sections["labels.data"] = data
+    sections["labels.kind"] = array("B", (kind for kind, _ in labels))
+    sections["labels.ptr"] = label_ptr
+    sections["labels.refs"] = label_refs
+    members_ptr = array("I", [0])
+    members = array("I")
+    for docs in label_members:
+        members.extend(docs)
+        members_ptr.append(len(members))
+    sections["labels.members.ptr"] = members_ptr
+    sections["labels.members"] = members
+
+    # 模糊匹配索引的词表和补全表，启动时不需要逐个解码项目重建
+    fuzzy_index = FuzzyIndex.build(
+        (record["name"], record.get("categories") or (), record.get("tags") or (), record.get("stars") or 0)
+        for record in records
+    )
+    sections["fuzzy"] = json.dumps(
+        {"words": fuzzy_index.words, "completions": fuzzy_index.completions}, ensure_ascii=False
+    ).encode("utf-8")
+
+    # 倒排索引
+    text_index = TextIndex.build(records)
+    sections.update(text_index.sections())
+
+    # 浏览顺序：star数降序，id降序
+    sections["order.stars"] = array("I", sorted(
+        range(count), key=lambda doc: (sections["stars"][doc], sections["ids"][doc]), reverse=True
+    ))
+
+    # 布局：魔数 | 版本 | 目录长度 | JSON目录 | 对齐的数据段
+    latest = max((record["updated_at"] for record in records if record.get("updated_at")), default=None)
+    payloads = {name: (value.tobytes() if isinstance(value, array) else value) for name, value in sections.items()}
+    directory = {
+        "byteorder": sys.byteorder,
+        "built_at": datetime.utcnow().isoformat(),
+        "projects": count,
+        "terms": text_index.term_count,
+        "labels": len(labels),
+        # 写入快照时的数据版本，启动时与数据库比较，不一致说明快照已过期
+        "data_version": data_version(count, latest),
+        "sections": {}
+    }
+    relative = {}
+    offset = 0
+    for name, payload in payloads.items():
+        relative[name] = offset
+        offset += len(payload) + (-len(payload) % _ALIGNMENT)
+    # 数据段偏移依赖目录自身的长度，反复计算直到目录长度稳定
+    header_length = 0
+    while True:
+        directory["sections"] = {
+            name: [header_length + relative[name], len(payload),
+                   sections[name].typecode if isinstance(sections[name], array) else "B"]
+            for name, payload in payloads.items()
+        }
+        encoded = json.dumps(directory).encode("utf-8")
+        needed = len(SNAPSHOT_MAGIC) + 8 + len(encoded)
+        needed += -needed % _ALIGNMENT
+        if needed <= header_length:
+            break
+        header_length = needed
+    padding = header_length - len(SNAPSHOT_MAGIC) - 8 - len(encoded)
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(SNAPSHOT_VERSION.to_bytes(4, "little"))
+        f.write(len(encoded).to_bytes(4, "little"))
+        f.write(encoded)
+        f.write(b"\x00" * padding)
+        for payload in payloads.values():
+            f.write(payload)
+            f.write(b"\x00" * (-len(payload) % _ALIGNMENT))
+    os.replace(tmp_path, target)
+    return directory
+
+
+class SearchSnapshot:
+    """
+    只读搜索快照
+
+    所有数据段都是映射文件上的memoryview，打开快照只需解析目录，
+    与项目数量无关；检索通过to_store得到的项目存储进行，项目记录在访问时才解码。
+    """
+
+    def __init__(self, path: str):
+        """
+        映射快照文件
+
+        Args:
+            path: 快照文件路径
+
+        Raises:
+            ValueError: 文件格式或版本不匹配
+        """
+        self.path = str(path)
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a search snapshot: {path}")
+        position = len(SNAPSHOT_MAGIC)
+        version = int.from_bytes(view[position:position + 4], "little")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}")
+        directory_length = int.from_bytes(view[position + 4:position + 8], "little")
+        self.directory = json.loads(bytes(view[position + 8:position + 8 + directory_length]))
+        if self.directory["byteorder"] != sys.byteorder:
+            raise ValueError(f"Snapshot byte order {self.directory['byteorder']} does not match this machine")
+
+        self._sections = {}
+        for name, (offset, length, typecode) in self.directory["sections"].items():
+            section = view[offset:offset + length]
+            self._sections[name] = section.cast(typecode) if typecode != "B" else section
+        self.size = self.directory["projects"]
+        self.ids = self._sections["ids"]
+        self.stars = self._sections["stars"]
+        self.forks = self._sections["forks"]
+        self.prior = self._sections["prior"]
+        self.text_index = TextIndex(*(self._sections[name] for name in TEXT_INDEX_SECTIONS))
+
+    @classmethod
+    def open(cls, path: str) -> Optional["SearchSnapshot"]:
+        """
+        打开快照，文件不存在时返回None
+
+        Args:
+            path: 快照文件路径
+
+        Returns:
+            Optional[SearchSnapshot]: 快照
+        """
+        if not path or not Path(path).is_file():
+            return None
+        return cls(path)
+
+    def _bytes(self, field: str, index: int) -> bytes:
+        offsets = self._sections[f"{field}.offsets"]
+        return bytes(self._sections[f"{field}.data"][offsets[index]:offsets[index + 1]])
+
+    def _string(self, field: str, index: int) -> str:
+        return self._bytes(field, index).decode("utf-8")
+
+    def _labels(self, doc: int) -> Tuple[List[str], List[str]]:
+        ptr, refs, kinds = self._sections["labels.ptr"], self._sections["labels.refs"], self._sections["labels.kind"]
+        categories, tags = [], []
+        for label in refs[ptr[doc]:ptr[doc + 1]]:
+            (categories if kinds[label] == _LABEL_CATEGORY else tags).append(self._string("labels", label))
+        return categories, tags
+
+    def matches(self, projects: int, updated_at: Optional[datetime]) -> bool:
+        """
+        快照是否与数据库中的数据一致
+
+        Args:
+            projects: 数据库中的项目数
+            updated_at: 数据库中最大的updated_at
+
+        Returns:
+            bool: 数据版本相同时为True；时间以浮点秒保存，从快照恢复的时间允许微秒级误差
+        """
+        stored = self.directory.get("data_version")
+        if stored is None:
+            return False
+        current = data_version(projects, updated_at)
+        return stored[0] == current[0] and abs(stored[1] - current[1]) < 1e-3
+
+    def record(self, doc: int) -> ProjectRecord:
+        """
+        解码单个项目记录（不含README）
+
+        Args:
+            doc: 文档编号
+
+        Returns:
+            ProjectRecord: 项目记录
+        """
+        categories, tags = self._labels(doc)
+        return ProjectRecord(
+            self.ids[doc],
+            self._string("name", doc),
+            self._string("description", doc),
+            self._string("repo_url", doc),
+            self._string("language", doc) or None,
+            _datetime(self._sections["created_at"][doc]),
+            _datetime(self._sections["updated_at"][doc]),
+            tuple(categories),
+            tuple(tags)
+        )
+
+    def label_docs(self) -> Dict[str, Dict[str, memoryview]]:
+        """
+        读取分类、标签和语言的成员文档
+
+        Returns:
+            Dict[str, Dict[str, memoryview]]: 分面字段到名称和文档编号的映射，文档编号直接引用映射的内存
+        """
+        kinds, ptr, members = self._sections["labels.kind"], self._sections["labels.members.ptr"], self._sections["labels.members"]
+        label_docs: Dict[str, Dict[str, memoryview]] = {field: {} for field in _FACET_FIELDS.values()}
+        for label in range(len(kinds)):
+            label_docs[_FACET_FIELDS[kinds[label]]][self._string("labels", label)] = members[ptr[label]:ptr[label + 1]]
+        return label_docs
+
+    def fuzzy_index(self) -> FuzzyIndex:
+        """
+        由快照中保存的词表和补全表创建模糊匹配索引
+
+        Returns:
+            FuzzyIndex: 模糊匹配索引
+        """
+        data = json.loads(bytes(self._sections["fuzzy"]))
+        return FuzzyIndex(data["words"], data["completions"])
+
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        逐个解码全部项目，用于从快照恢复数据库
+
+        Yields:
+            Dict: 可直接用于ProjectService.upsert_projects的项目数据，包含原有的id、created_at和updated_at，
+                使恢复后数据库中的id与快照和项目存储一致
+        """
+        for doc in range(self.size):
+            categories, tags = self._labels(doc)
+            yield {
+                "id": self.ids[doc],
+                "created_at": _datetime(self._sections["created_at"][doc]),
+                "updated_at": _datetime(self._sections["updated_at"][doc]),
+                "name": self._string("name", doc),
+                "description": self._string("description", doc),
+                "repo_url": self._string("repo_url", doc),
+                "readme_content": self._string("readme_content", doc),
+                "language": self._string("language", doc) or None,
+                "stars": self.stars[doc],
+                "forks": self.forks[doc],
+                "categories": categories,
+                "tags": tags
+            }
+
+    def to_store(self) -> ProjectStore:
+        """
+        基于快照创建项目存储
+
+        数值列和倒排索引直接引用映射的内存，不复制；分面位图由快照中按标签分组的文档编号构建，
+        项目记录只在结果需要时逐个解码，创建存储不随项目数解码字符串。
+
+        Returns:
+            ProjectStore: 项目存储
+        """
+        return ProjectStore(
+            SnapshotRecords(self), self.stars, self.forks, self.prior, self.text_index,
+            order_by_stars=self._sections["order.stars"],
+            ids=self.ids,
+            label_docs=self.label_docs()
+        )
+
+
+class SnapshotRecords(Sequence):
+    """快照中的项目记录序列，按位置访问时才解码"""
+
+    def __init__(self, snapshot: SearchSnapshot):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.size
+
+    def __getitem__(self, doc: int) -> ProjectRecord:
+        if not 0 <= doc < self._snapshot.size:
+            raise IndexError(doc)
+        return self._snapshot.record(doc)
+
+
+async def build_snapshot(session: AsyncSession, path: str) -> Dict:
+    """
+    从数据库构建快照文件
+
+    Args:
+        session: 数据库会话
+        path: 快照文件路径
+
+    Returns:
+        Dict: 快照元信息，另含构建耗时build_seconds
+    """
+    started = time.perf_counter()
+    records = await load_project_records(session)
+    directory = await asyncio.to_thread(write_snapshot, records, path)
+    return {
+        "path": str(path),
+        "projects": directory["projects"],
+        "terms": directory["terms"],
+        "build_seconds": round(time.perf_counter() - started, 3)
+    }
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+倒排索引
+按字段加权的BM25倒排表，数据保存在连续数组中，可直接映射自快照文件
+"""
+
+import math
+from array import array
+from typing import Dict, List, Optional
+
+from .ranking import FIELD_WEIGHTS
+from .search_backend import parse_query, _WORD_RE
+
+# BM25参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 索引各数据段的名称，与快照文件中的段名一致
+SECTION_NAMES = ("terms.offsets", "terms.data", "terms.idf", "postings.ptr", "postings.doc", "postings.weight")
+
+
+class TextIndex:
+    """
+    BM25倒排索引
+
+    词项按UTF-8字节序排序，支持二分查找精确词和前缀；
+    每条倒排记录保存文档编号和预先计算好的BM25词频部分，查询时只需乘以idf。
+    各数组既可以是array，也可以是映射文件上的memoryview。
+    """
+
+    def __init__(self, term_offsets, term_data, idf, ptr, docs, weights):
+        """
+        初始化倒排索引
+
+        Args:
+            term_offsets: 词项在term_data中的偏移（长度为词项数+1）
+            term_data: 连续存放的UTF-8词项
+            idf: 每个词项的idf
+            ptr: 每个词项的倒排表在docs/weights中的起始位置（长度为词项数+1）
+            docs: 倒排表中的文档编号
+            weights: 倒排表中的BM25词频部分
+        """
+        self.term_offsets = term_offsets
+        self.term_data = term_data
+        self.idf = idf
+        self.ptr = ptr
+        self.docs = docs
+        self.weights = weights
+        self.term_count = len(idf)
+
+    @classmethod
+    def build(cls, records: List[Dict]) -> "TextIndex":
+        """
+        由项目记录构建索引，文档编号为记录在列表中的位置
+
+        Args:
+            records: 项目记录，使用FIELD_WEIGHTS中的字段
+
+        Returns:
+            TextIndex: 倒排索引
+        """
+        count = len(records)
+        term_freqs: Dict[str, Dict[int, float]] = {}
+        lengths = []
+        for doc, record in enumerate(records):
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in _WORD_RE.findall((record.get(field) or "").lower()):
+                    postings = term_freqs.setdefault(term, {})
+                    postings[doc] = postings.get(doc, 0.0) + weight
+                    length += weight
+            lengths.append(length)
+        average_length = (sum(lengths) / count) if count else 1.0
+
+        encoded_terms = sorted(term.encode("utf-8") for term in term_freqs)
+        term_offsets = array("Q", [0])
+        idf = array("f")
+        ptr = array("I", [0])
+        docs = array("I")
+        weights = array("f")
+        for encoded in encoded_terms:
+            postings = term_freqs[encoded.decode("utf-8")]
+            term_offsets.append(term_offsets[-1] + len(encoded))
+            idf.append(math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)))
+            for doc in sorted(postings):
+                tf = postings[doc]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc] / (average_length or 1.0))
+                docs.append(doc)
+                weights.append(tf * (BM25_K1 + 1) / (tf + norm))
+            ptr.append(len(docs))
+        return cls(term_offsets, b"".join(encoded_terms), idf, ptr, docs, weights)
+
+    def sections(self) -> Dict[str, object]:
+        """
+        索引数据段，用于写入快照
+
+        Returns:
+            Dict[str, object]: 段名到数组或字节串的映射
+        """
+        return dict(zip(SECTION_NAMES, (
+            self.term_offsets, self.term_data, self.idf, self.ptr, self.docs, self.weights
+        )))
+
+    def term(self, index: int) -> bytes:
+        """获取编号为index的词项（UTF-8编码）"""
+        return bytes(self.term_data[self.term_offsets[index]:self.term_offsets[index + 1]])
+
+    def term_range(self, prefix: bytes, exact: bool = False) -> range:
+        """
+        二分查找以prefix开头（exact为True时等于prefix）的词项编号区间
+
+        Args:
+            prefix: UTF-8编码的前缀
+            exact: 是否精确匹配
+
+        Returns:
+            range: 词项编号区间
+        """
+        def lower_bound(key: bytes) -> int:
+            lo, hi = 0, self.term_count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.term(mid) < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+
+        start = lower_bound(prefix)
+        if exact:
+            found = start < self.term_count and self.term(start) == prefix
+            return range(start, start + 1) if found else range(start, start)
+        # UTF-8编码中不会出现0xff，prefix + 0xff是所有以prefix开头的词项的上界
+        return range(start, lower_bound(prefix + b"\xff"))
+
+    def match_terms(self, terms: range) -> Dict[int, float]:
+        """
+        合并多个词项的倒排表，同一文档取最高分
+
+        Args:
+            terms: 词项编号区间
+
+        Returns:
+            Dict[int, float]: 文档编号到相关度的映射
+        """
+        if len(terms) == 1:
+            term = terms[0]
+            term_idf = self.idf[term]
+            start, end = self.ptr[term], self.ptr[term + 1]
+            return dict(zip(self.docs[start:end].tolist(), [term_idf * w for w in self.weights[start:end].tolist()]))
+        scores: Dict[int, float] = {}
+        for term in terms:
+            term_idf = self.idf[term]
+            start, end = self.ptr[term], self.ptr[term + 1]
+            for doc, weight in zip(self.docs[start:end].tolist(), self.weights[start:end].tolist()):
+                score = term_idf * weight
+                if score > scores.get(doc, 0.0):
+                    scores[doc] = score
+        return scores
+
+    def match(self, query: str, memo: Optional[Dict] = None) -> Optional[Dict[int, float]]:
+        """
+        计算查询的匹配文档及相关度
+
+        所有查询项之间为AND关系；短语查询要求包含短语中的每个词（不校验词序）。
+
+        Args:
+            query: 用户查询
+            memo: 在多个查询之间共享的倒排表合并结果，批量搜索时避免重复查找相同的词
+
+        Returns:
+            Optional[Dict[int, float]]: 文档编号到原始相关度的映射，查询中没有可检索的词时返回None
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return None
+        matched: Optional[Dict[int, float]] = None
+        for clause in clauses:
+            exact = clause["type"] == "phrase"
+            for term in clause["terms"]:
+                key = ("terms", term, exact)
+                scores = memo.get(key) if memo is not None else None
+                if scores is None:
+                    scores = self.match_terms(self.term_range(term.encode("utf-8"), exact))
+                    if memo is not None:
+                        memo[key] = scores
+                if matched is None:
+                    matched = scores
+                else:
+                    matched = {doc: score + scores[doc] for doc, score in matched.items() if doc in scores}
+                if not matched:
+                    return {}
+        return matched
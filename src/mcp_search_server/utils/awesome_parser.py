@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Awesome列表解析
+将awesome-xxx形式的分类Markdown列表解析为项目条目，章节标题作为分类
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# 与数据库字段长度保持一致
+MAX_NAME_LENGTH = 100
+MAX_DESCRIPTION_LENGTH = 1000
+MAX_URL_LENGTH = 200
+MAX_CATEGORY_LENGTH = 50
+
+# 不包含项目条目的常见章节
+SKIPPED_SECTIONS = {
+    "contents", "table of contents", "toc", "contributing", "contribute", "license",
+    "contributors", "acknowledgements", "related", "resources", "目录", "贡献", "许可证"
+}
+
+_HEADING = re.compile(r"^ {0,3}(#{2,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$")
+_ENTRY = re.compile(
+    r"^[ \t]*[-*+][ \t]+"              # 列表项标记
+    r"(?:[^\[\n]{0,16}?)"               # 链接前的emoji或图标
+    r"\[(?P<name>[^\]]+)\]"             # 项目名称
+    r"\((?P<url>https?://[^)\s]+)[^)]*\)"
+    r"(?P<rest>.*)$"
+)
+# 描述前的图例符号（如语言、部署方式的emoji）和分隔符
+_DESCRIPTION_PREFIX = re.compile(r"^[^\w]*?[\-–—:|](?:\s+|$)")
+_INLINE_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_INLINE_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_INLINE_MARKUP = re.compile(r"<[^>]+>|`|\*\*|__")
+_NON_WORD_EDGES = re.compile(r"^[^\w]+|[^\w)\]]+$")
+
+
+def _clean_text(text: str) -> str:
+    """去除行内标记、徽章图片和多余空白"""
+    text = _INLINE_IMAGE.sub("", text)
+    text = _INLINE_LINK.sub(r"\1", text)
+    text = _INLINE_MARKUP.sub("", text)
+    return " ".join(text.split())
+
+
+def _clean_heading(text: str) -> str:
+    """标题去除标记以及首尾的emoji、符号"""
+    return _NON_WORD_EDGES.sub("", _clean_text(text))
+
+
+def normalize_repo_url(url: str) -> Optional[str]:
+    """
+    规范化项目地址，去除锚点、末尾斜杠和.git后缀
+
+    Args:
+        url: 原始地址
+
+    Returns:
+        Optional[str]: 规范化后的地址，超出长度限制时返回None
+    """
+    url = url.split("#", 1)[0].rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-4]
+    url = url.replace("://www.github.com/", "://github.com/").replace("http://github.com/", "https://github.com/")
+    if len(url) > MAX_URL_LENGTH:
+        return None
+    return url
+
+
+def parse_awesome_list(content: str, extra_categories: Optional[List[str]] = None) -> List[Dict]:
+    """
+    单遍解析awesome列表
+
+    二级及以下标题构成分类路径，列表项中的第一个链接作为项目地址，链接之后的文字作为描述。
+    同一项目出现在多个章节时合并分类。
+
+    Args:
+        content: 列表的Markdown内容
+        extra_categories: 附加到每个项目的分类，例如awesome-mcp
+
+    Returns:
+        List[Dict]: 项目数据，包含name、description、repo_url、categories，可直接用于upsert_projects
+    """
+    extra_categories = list(extra_categories or [])
+    # 标题级别 -> 标题文字，表示当前所在的章节路径
+    section_path: Dict[int, str] = {}
+    skipping = False
+    entries: Dict[str, Dict] = {}
+    in_fence = False
+
+    for line in (content or "").splitlines():
+        stripped = line.lstrip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_fence = not in_fence
+            continue
+        if in_fence or not stripped:
+            continue
+
+        if stripped[0] == "#":
+            heading = _HEADING.match(line)
+            if heading:
+                level = len(heading.group(1))
+                for deeper in [key for key in section_path if key >= level]:
+                    del section_path[deeper]
+                text = _clean_heading(heading.group(2))
+                if level == 2:
+                    skipping = text.lower() in SKIPPED_SECTIONS
+                if text:
+                    section_path[level] = text[:MAX_CATEGORY_LENGTH]
+            continue
+
+        if skipping or not section_path or stripped[0] not in "-*+":
+            continue
+        entry = _ENTRY.match(line)
+        if not entry:
+            continue
+        repo_url = normalize_repo_url(entry.group("url"))
+        if repo_url is None:
+            continue
+
+        categories = [section_path[level] for level in sorted(section_path)]
+        existing = entries.get(repo_url)
+        if existing is not None:
+            for category in categories:
+                if category not in existing["categories"]:
+                    existing["categories"].append(category)
+            continue
+
+        name = _clean_text(entry.group("name"))[:MAX_NAME_LENGTH]
+        description = _DESCRIPTION_PREFIX.sub("", _clean_text(entry.group("rest")))[:MAX_DESCRIPTION_LENGTH]
+        entries[repo_url] = {
+            "name": name or repo_url.rsplit("/", 1)[-1],
+            "description": description,
+            "repo_url": repo_url,
+            "categories": categories + extra_categories
+        }
+    return list(entries.values())
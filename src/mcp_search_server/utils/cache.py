@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+查询结果缓存
+提供可插拔的缓存后端（内存LRU、redis兼容），支持TTL过期和写入后整体失效
+"""
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def make_cache_key(namespace: str, **params) -> str:
+    """
+    根据参数生成缓存键
+
+    字符串参数去除首尾空白，列表参数排序，保证语义相同的查询命中同一个键；
+    大小写等与业务相关的规范化由调用方完成。
+
+    Args:
+        namespace: 键的命名空间
+        **params: 查询参数
+
+    Returns:
+        str: 缓存键
+    """
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, (list, tuple, set)):
+            value = sorted(value)
+        normalized[name] = value
+    digest = hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class CacheBackend(ABC):
+    """
+    缓存后端基类
+
+    失效采用代数（generation）机制：invalidate只递增代数，旧代数下的条目
+    不再被读取并随TTL或LRU淘汰，因此失效操作的代价与缓存大小无关。
+    调用方可在查询前记录代数并在写入时传入，查询期间发生的失效会使这次写入作废，
+    避免把失效前读到的旧数据写进缓存。
+    """
+
+    def __init__(self, ttl: float = 3600):
+        """
+        初始化缓存后端
+
+        Args:
+            ttl: 默认过期时间（秒）
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """读取缓存，不存在或已过期时返回None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> None:
+        """写入缓存，generation与当前代数不一致时不写入"""
+
+    @abstractmethod
+    async def generation(self) -> int:
+        """获取当前代数"""
+
+    @abstractmethod
+    async def invalidate(self) -> None:
+        """使所有已缓存的结果失效，数据写入后调用"""
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict[str, Any]: 命中数、未命中数、命中率和失效次数
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+class MemoryCache(CacheBackend):
+    """进程内LRU缓存，条目数超过上限时淘汰最近最少使用的条目"""
+
+    def __init__(self, max_size: int = 1000, ttl: float = 3600):
+        """
+        初始化内存缓存
+
+        Args:
+            max_size: 最大条目数
+            ttl: 默认过期时间（秒）
+        """
+        super().__init__(ttl)
+        self.max_size = max_size
+        self.evictions = 0
+        self._generation = 0
+        # key -> (代数, 过期时间, 值)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self._generation or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self._generation:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (self._generation, expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def invalidate(self) -> None:
+        self._generation += 1
+        self.invalidations += 1
+        # 内存中旧代数的条目不会再被命中，直接清理以释放内存
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({"type": "memory", "size": len(self._entries), "evictions": self.evictions})
+        return stats
+
+
+class RedisCache(CacheBackend):
+    """
+    redis兼容缓存
+    client需提供异步的get/set/incr方法（如redis.asyncio.Redis），值以JSON存储
+    """
+
+    def __init__(self, client, ttl: float = 3600, prefix: str = "mcp_search"):
+        """
+        初始化redis缓存
+
+        Args:
+            client: 异步redis客户端
+            ttl: 默认过期时间（秒）
+            prefix: 键前缀，多个服务共用同一redis时用于隔离
+        """
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+        self._generation_key = f"{prefix}:generation"
+
+    async def generation(self) -> int:
+        generation = await self.client.get(self._generation_key)
+        return int(generation or 0)
+
+    async def _full_key(self, key: str, generation: Optional[int] = None) -> str:
+        if generation is None:
+            generation = await self.generation()
+        return f"{self.prefix}:{generation}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(await self._full_key(key))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> None:
+        # 使用旧代数写入的键不会再被读取，随TTL过期
+        await self.client.set(
+            await self._full_key(key, generation),
+            json.dumps(value, ensure_ascii=False, default=str),
+            ex=max(int(self.ttl if ttl is None else ttl), 1)
+        )
+
+    async def invalidate(self) -> None:
+        await self.client.incr(self._generation_key)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["type"] = "redis"
+        return stats
+
+
+def create_cache(config: Dict) -> CacheBackend:
+    """
+    按配置创建缓存后端
+
+    Args:
+        config: cache配置段，包含type、max_size、ttl，redis类型还需提供url
+
+    Returns:
+        CacheBackend: 缓存后端
+    """
+    cache_type = config.get("type", "memory")
+    ttl = config.get("ttl", 3600)
+    if cache_type == "memory":
+        return MemoryCache(max_size=config.get("max_size", 1000), ttl=ttl)
+    if cache_type == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("cache.type 'redis' requires the 'redis' package, install mcp-search-server[redis]") from e
+        client = redis.from_url(config.get("url", "redis://localhost:6379/0"))
+        return RedisCache(client, ttl=ttl, prefix=config.get("prefix", "mcp_search"))
+    raise ValueError(f"Unknown cache type: {cache_type}")
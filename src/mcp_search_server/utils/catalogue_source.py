@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+目录仓库数据源
+维护分类Markdown目录仓库的本地镜像，通过git diff找出两次索引之间变更的文件
+"""
+
+import asyncio
+import fnmatch
+import logging
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+from .awesome_parser import parse_awesome_list
+
+
+class GitError(RuntimeError):
+    """
+    git命令执行失败
+
+    Attributes:
+        returncode: git的退出状态
+    """
+
+    def __init__(self, message: str, returncode: Optional[int] = None):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+class CatalogueChanges:
+    """
+    目录仓库在两个提交之间的变更
+
+    Attributes:
+        base: 上次索引的提交，全量索引时为None
+        head: 本次索引的提交
+        changed: 新增或修改的文件路径到内容的映射
+        deleted: 删除（或被重命名）的文件路径
+    """
+
+    __slots__ = ("base", "head", "changed", "deleted")
+
+    def __init__(self, base: Optional[str], head: str, changed: Dict[str, str], deleted: List[str]):
+        self.base = base
+        self.head = head
+        self.changed = changed
+        self.deleted = deleted
+
+    @property
+    def full(self) -> bool:
+        """是否为全量索引"""
+        return self.base is None
+
+
+class CatalogueSource:
+    """
+    目录仓库数据源
+
+    使用裸仓库镜像保存目录仓库，每次同步只拉取增量对象；
+    文件内容直接从git对象库读取，不需要检出工作区。
+    """
+
+    def __init__(
+        self,
+        repo_url: str,
+        mirror_dir: str = "data/catalogue.git",
+        branch: str = "main",
+        pattern: str = "*.md"
+    ):
+        """
+        初始化目录仓库数据源
+
+        Args:
+            repo_url: 目录仓库地址，可以是远程地址或本地仓库路径
+            mirror_dir: 本地裸仓库镜像目录
+            branch: 索引的分支
+            pattern: 需要解析的文件匹配模式
+        """
+        self.repo_url = repo_url
+        self.mirror_dir = Path(mirror_dir)
+        self.branch = branch
+        self.pattern = pattern
+        self.logger = logging.getLogger("catalogue_source")
+
+    async def _git(self, *args: str, cwd: Optional[Path] = None) -> str:
+        """
+        执行git命令
+
+        Args:
+            *args: git参数
+            cwd: 工作目录，默认为镜像目录
+
+        Returns:
+            str: 标准输出
+
+        Raises:
+            GitError: 命令返回非零状态
+        """
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=str(cwd or self.mirror_dir),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise GitError(
+                f"git {' '.join(args)} failed: {stderr.decode('utf-8', errors='replace').strip()}",
+                process.returncode
+            )
+        return stdout.decode("utf-8", errors="replace")
+
+    async def sync(self) -> str:
+        """
+        克隆或更新本地镜像
+
+        Returns:
+            str: 分支最新提交的哈希
+        """
+        if not (self.mirror_dir / "HEAD").exists():
+            self.mirror_dir.parent.mkdir(parents=True, exist_ok=True)
+            self.logger.info(f"Cloning catalogue {self.repo_url} into {self.mirror_dir}")
+            await self._git("clone", "--bare", "--quiet", self.repo_url, str(self.mirror_dir), cwd=self.mirror_dir.parent)
+        else:
+            await self._git("fetch", "--quiet", "--prune", "origin", f"+refs/heads/{self.branch}:refs/heads/{self.branch}")
+        return (await self._git("rev-parse", f"refs/heads/{self.branch}")).strip()
+
+    def _matches(self, path: str) -> bool:
+        return fnmatch.fnmatch(PurePosixPath(path).name, self.pattern)
+
+    async def _read_files(self, commit: str, paths: List[str]) -> Dict[str, str]:
+        """
+        读取指定提交中的文件内容，所有文件通过一次cat-file --batch读取
+
+        Args:
+            commit: 提交哈希
+            paths: 文件路径列表
+
+        Returns:
+            Dict[str, str]: 文件路径到内容的映射
+        """
+        if not paths:
+            return {}
+        process = await asyncio.create_subprocess_exec(
+            "git", "cat-file", "--batch",
+            cwd=str(self.mirror_dir),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        request = "".join(f"{commit}:{path}\n" for path in paths).encode("utf-8")
+        stdout, stderr = await process.communicate(request)
+        if process.returncode != 0:
+            raise GitError(
+                f"git cat-file failed: {stderr.decode('utf-8', errors='replace').strip()}",
+                process.returncode
+            )
+
+        contents = {}
+        offset = 0
+        for path in paths:
+            header_end = stdout.index(b"\n", offset)
+            header = stdout[offset:header_end].split()
+            offset = header_end + 1
+            if header[-1] == b"missing":
+                continue
+            size = int(header[2])
+            contents[path] = stdout[offset:offset + size].decode("utf-8", errors="replace")
+            # 内容后跟一个换行符
+            offset += size + 1
+        return contents
+
+    async def changes_since(self, base: Optional[str], head: str) -> CatalogueChanges:
+        """
+        计算两个提交之间的变更并读取变更文件的内容
+
+        Args:
+            base: 上次索引的提交，None或镜像中已不存在时返回全量文件
+            head: 本次索引的提交
+
+        Returns:
+            CatalogueChanges: 变更集合
+        """
+        if base is not None:
+            try:
+                await self._git("cat-file", "-e", f"{base}^{{commit}}")
+            except GitError:
+                # 上游被强制推送后旧提交可能已不存在，退回全量索引
+                self.logger.warning(f"Catalogue commit {base} not found, reindexing from scratch")
+                base = None
+
+        changed: List[str] = []
+        deleted: List[str] = []
+        if base is None:
+            output = await self._git("ls-tree", "-r", "--name-only", "-z", head)
+            changed = [path for path in output.split("\0") if path and self._matches(path)]
+        elif base != head:
+            output = await self._git("diff", "--name-status", "-z", "--no-renames", base, head)
+            fields = output.split("\0")
+            for status, path in zip(fields[0::2], fields[1::2]):
+                if not path or not self._matches(path):
+                    continue
+                if status.startswith("D"):
+                    deleted.append(path)
+                else:
+                    changed.append(path)
+
+        return CatalogueChanges(base, head, await self._read_files(head, changed), deleted)
+
+    async def referenced_urls(self, commit: str, urls: List[str]) -> Dict[str, str]:
+        """
+        查找仍在指定提交的目录文件中列出的项目地址，以及列出它们的文件
+
+        先用git grep找出提到这些地址的文件，再用parse_awesome_list解析这些文件，
+        按规范化后的项目地址精确比较；只做子串匹配会把https://github.com/a/bc
+        误认为仍在引用已删除的https://github.com/a/b。
+
+        Args:
+            commit: 提交哈希
+            urls: 待检查的地址（规范化后的项目地址）
+
+        Returns:
+            Dict[str, str]: 仍被引用的地址到列出它的文件路径（多个文件时取路径最小者）
+
+        Raises:
+            GitError: git grep执行失败（没有匹配除外）
+        """
+        if not urls:
+            return {}
+        args = ["grep", "--no-color", "-F", "-i", "-l"]
+        for url in urls:
+            args += ["-e", url]
+        args += [commit, "--", self.pattern, f"**/{self.pattern}"]
+        try:
+            output = await self._git(*args)
+        except GitError as e:
+            # git grep没有匹配时返回1，其他状态为真正的错误
+            if e.returncode == 1:
+                return {}
+            raise
+        # 输出为"<commit>:<path>"
+        paths = sorted({line.split(":", 1)[1] for line in output.splitlines() if ":" in line})
+        contents = await self._read_files(commit, paths)
+        wanted = set(urls)
+
+        def match() -> Dict[str, str]:
+            referenced: Dict[str, str] = {}
+            for path, content in contents.items():
+                for entry in parse_awesome_list(content):
+                    if entry["repo_url"] in wanted:
+                        referenced.setdefault(entry["repo_url"], path)
+            return referenced
+
+        return await asyncio.to_thread(match)
@@ -10,37 +10,144 @@ import aiohttp
 import asyncio
 import logging
 import base64
-from typing import Dict, List, Optional, Union
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime
-import re
-from bs4 import BeautifulSoup
+from .http_cache import HTTPCache
+from .metrics import MetricsRegistry
+from .readme_parser import parse_readme
 
+def parse_github_datetime(value: Optional[str]) -> Optional[datetime]:
+    """
+    解析GitHub API返回的时间字符串（如2024-01-01T00:00:00Z）
+    
+    Args:
+        value: 时间字符串
+        
+    Returns:
+        Optional[datetime]: 不带时区的UTC时间，无法解析时返回None
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+    except ValueError:
+        return None
+        
+def repo_changed_since(item: Dict, last_crawled_at: Optional[datetime]) -> bool:
+    """
+    判断搜索结果中的仓库在上次爬取之后是否有变更
+    
+    Args:
+        item: 搜索结果中的仓库条目
+        last_crawled_at: 上次爬取时间，未爬取过为None
+        
+    Returns:
+        bool: 需要重新抓取时返回True
+    """
+    if last_crawled_at is None:
+        return True
+    timestamps = [
+        parse_github_datetime(item.get("pushed_at")),
+        parse_github_datetime(item.get("updated_at"))
+    ]
+    timestamps = [t for t in timestamps if t is not None]
+    # 缺少时间信息时保守地认为有变更
+    return not timestamps or max(timestamps) > last_crawled_at
+
+# 所有MCP项目共有的主题，不作为标签
+GENERIC_TOPICS = frozenset({
+    "mcp", "mcp-server", "mcp-servers", "mcp-project", "model-context-protocol", "modelcontextprotocol"
+})
+
+def topic_tags(item: Dict) -> List[str]:
+    """
+    由仓库的GitHub主题（topics）得到项目标签，去掉所有MCP项目共有的通用主题
+    
+    Args:
+        item: 搜索结果中的仓库条目
+        
+    Returns:
+        List[str]: 标签名称
+    """
+    return [topic for topic in item.get("topics") or [] if topic not in GENERIC_TOPICS]
+    
+class GitHubRequestError(Exception):
+    """GitHub API返回非200响应（包括重试后仍被限流）"""
+    
+    def __init__(self, url: str, status: int):
+        super().__init__(f"GitHub request failed with status {status}: {url}")
+        self.url = url
+        self.status = status
+        
 class GitHubCrawler:
     """
     GitHub爬虫类
     负责从GitHub获取项目信息
     """
     
-    def __init__(self, token: str, api_base_url: str = "https://api.github.com"):
+    # GitHub搜索API最多返回1000条结果
+    SEARCH_RESULT_LIMIT = 1000
+    
+    def __init__(
+        self,
+        token: str,
+        api_base_url: str = "https://api.github.com",
+        concurrency: int = 8,
+        rate_limit_delay: float = 60,
+        max_retries: int = 3,
+        cache: Optional[HTTPCache] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
         """
         初始化GitHub爬虫
         
         Args:
             token: GitHub API Token
             api_base_url: GitHub API基础URL
+            concurrency: 同时进行的最大请求数
+            rate_limit_delay: 触发限流但响应未给出Retry-After/X-RateLimit-Reset时的退避时间（秒）
+            max_retries: 触发限流后的最大重试次数
+            cache: HTTP响应缓存，提供时使用ETag/Last-Modified发送条件请求
+            metrics: 指标注册表，提供时按接口记录请求数、延迟、缓存命中和剩余配额
         """
         self.token = token
         self.api_base_url = api_base_url
         self.headers = {
-            "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        if token:
+            self.headers["Authorization"] = f"token {token}"
+        self.concurrency = concurrency
+        self.rate_limit_delay = rate_limit_delay
+        self.max_retries = max_retries
+        self.cache = cache
         self.logger = logging.getLogger("github_crawler")
         self.session = None
+        self._semaphore = None
+        # 最近一次响应给出的限流状态
+        self._rate_remaining: Optional[int] = None
+        self._rate_reset: Optional[float] = None
+        self._pause_until = 0.0
+        self.metrics = metrics
+        if metrics is not None:
+            self._request_count = metrics.counter(
+                "github_requests_total", "GitHub API requests by endpoint and status", ("endpoint", "status")
+            )
+            self._request_latency = metrics.histogram(
+                "github_request_duration_seconds", "GitHub API request latency", ("endpoint",)
+            )
+            self._cache_lookups = metrics.counter(
+                "github_cache_lookups_total", "GitHub response cache lookups (revalidated, miss)", ("result",)
+            )
+            self._rate_remaining_gauge = metrics.gauge(
+                "github_rate_limit_remaining", "Requests left in the current GitHub rate limit window"
+            )
         
     async def __aenter__(self):
         """异步上下文管理器入口"""
         self.session = aiohttp.ClientSession(headers=self.headers)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -48,6 +155,130 @@ class GitHubCrawler:
         if self.session:
             await self.session.close()
             
+    def _update_rate_limit(self, headers) -> None:
+        """
+        根据响应头更新限流状态
+        
+        Args:
+            headers: 响应头
+        """
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None and remaining.isdigit():
+            self._rate_remaining = int(remaining)
+            if self.metrics is not None:
+                self._rate_remaining_gauge.set(self._rate_remaining)
+        if reset is not None and reset.isdigit():
+            self._rate_reset = float(reset)
+            
+    def _retry_delay(self, response: aiohttp.ClientResponse) -> Optional[float]:
+        """
+        判断响应是否为限流，并计算需要等待的时间
+        
+        Args:
+            response: HTTP响应
+            
+        Returns:
+            Optional[float]: 需要等待的秒数，不是限流响应时返回None
+        """
+        if response.status not in (403, 429):
+            return None
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        if response.headers.get("X-RateLimit-Remaining") == "0" and self._rate_reset:
+            return max(self._rate_reset - time.time(), 0) + 1
+        if response.status == 429:
+            return float(self.rate_limit_delay)
+        # 普通的403（如无权限）不重试
+        return None
+        
+    async def _throttle(self) -> None:
+        """在配额耗尽或被要求退避时等待"""
+        now = time.time()
+        wait = self._pause_until - now
+        if self._rate_remaining == 0 and self._rate_reset and self._rate_reset > now:
+            wait = max(wait, self._rate_reset - now + 1)
+        if wait > 0:
+            self.logger.warning(f"GitHub rate limit reached, waiting {wait:.0f}s")
+            await asyncio.sleep(wait)
+            
+    def _endpoint(self, url: str) -> str:
+        """
+        将请求地址归类为接口名，作为指标标签（不含仓库名，避免标签取值过多）
+        
+        Args:
+            url: 请求地址
+            
+        Returns:
+            str: search、readme、repo或other
+        """
+        path = url[len(self.api_base_url):] if url.startswith(self.api_base_url) else url
+        if path.startswith("/search/"):
+            return "search"
+        if path.startswith("/repos/"):
+            return "readme" if path.rstrip("/").endswith("/readme") else "repo"
+        return "other"
+        
+    async def _get_json(self, url: str, params: Optional[Dict] = None) -> Tuple[int, Optional[Union[Dict, List]]]:
+        """
+        发送GET请求并解析JSON
+        受并发上限约束，并根据GitHub的限流响应头自适应退避重试。
+        启用缓存时，已缓存的地址总是发送条件请求，304时使用缓存内容
+        （GitHub的304响应不消耗API配额），不会在不访问网络的情况下返回可能过期的数据。
+        缓存文件的读写在线程中执行，不阻塞事件循环。
+        
+        Args:
+            url: 请求地址
+            params: 查询参数
+            
+        Returns:
+            Tuple[int, Optional[Union[Dict, List]]]: 状态码和JSON数据（非200时为None）
+        """
+        cache_key, cached = None, None
+        headers = {}
+        if self.cache:
+            cache_key = self.cache.make_key(url, params)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if self.metrics is not None:
+                self._cache_lookups.inc("revalidated" if cached else "miss")
+            if cached:
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
+                    
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                await self._throttle()
+                start = time.perf_counter()
+                async with self.session.get(url, params=params, headers=headers) as response:
+                    self._update_rate_limit(response.headers)
+                    if self.metrics is not None:
+                        endpoint = self._endpoint(url)
+                        self._request_latency.observe(time.perf_counter() - start, endpoint)
+                        self._request_count.inc(endpoint, response.status)
+                    if response.status == 304 and cached:
+                        await asyncio.to_thread(self.cache.touch, cache_key, cached)
+                        return 200, cached["body"]
+                    if response.status == 200:
+                        data = await response.json()
+                        if self.cache:
+                            await asyncio.to_thread(
+                                self.cache.put,
+                                cache_key,
+                                data,
+                                etag=response.headers.get("ETag"),
+                                last_modified=response.headers.get("Last-Modified")
+                            )
+                        return response.status, data
+                    delay = self._retry_delay(response)
+                    if delay is None or attempt == self.max_retries:
+                        return response.status, None
+                    self._pause_until = max(self._pause_until, time.time() + delay)
+            self.logger.warning(f"Rate limited on {url}, retrying in {delay:.0f}s")
+        return response.status, None
+        
     async def get_repo_info(self, owner: str, repo: str) -> Dict:
         """
         获取仓库基本信息
@@ -57,15 +288,14 @@ class GitHubCrawler:
             repo: 仓库名称
             
         Returns:
-            Dict: 仓库信息
+            Dict: 仓库信息，请求失败时为空字典
         """
         url = f"{self.api_base_url}/repos/{owner}/{repo}"
-        async with self.session.get(url) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                self.logger.error(f"Failed to get repo info: {response.status}")
-                return {}
+        status, data = await self._get_json(url)
+        if status == 200:
+            return data
+        self.logger.error(f"Failed to get repo info: {status}")
+        return {}
                 
     async def get_readme(self, owner: str, repo: str) -> str:
         """
@@ -76,17 +306,31 @@ class GitHubCrawler:
             repo: 仓库名称
             
         Returns:
-            str: README内容
+            str: README内容，请求失败时为空字符串
         """
         url = f"{self.api_base_url}/repos/{owner}/{repo}/readme"
-        async with self.session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                content = data.get("content", "")
-                if content:
-                    return base64.b64decode(content).decode('utf-8')
-            self.logger.error(f"Failed to get readme: {response.status}")
-            return ""
+        status, data = await self._get_json(url)
+        if status == 200:
+            return self._decode_readme(data)
+        self.logger.error(f"Failed to get readme: {status}")
+        return ""
+        
+    @staticmethod
+    def _decode_readme(data: Dict) -> str:
+        """解码readme接口返回的base64内容"""
+        content = data.get("content", "")
+        return base64.b64decode(content).decode('utf-8', errors='replace') if content else ""
+        
+    @staticmethod
+    def _repo_stats(info: Dict) -> Dict:
+        """从仓库信息中提取统计字段"""
+        return {
+            "stars": info.get("stargazers_count", 0),
+            "forks": info.get("forks_count", 0),
+            "updated_at": info.get("updated_at", ""),
+            "created_at": info.get("created_at", ""),
+            "language": info.get("language", "")
+        }
             
     async def search_repos(self, query: str, page: int = 1, per_page: int = 30) -> Dict:
         """
@@ -108,56 +352,129 @@ class GitHubCrawler:
             "sort": "stars",
             "order": "desc"
         }
-        async with self.session.get(url, params=params) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                self.logger.error(f"Failed to search repos: {response.status}")
-                return {"total_count": 0, "items": []}
-                
-    def parse_readme_content(self, content: str) -> Dict:
+        status, data = await self._get_json(url, params=params)
+        if status == 200:
+            return data
+        self.logger.error(f"Failed to search repos: {status}")
+        return {"total_count": 0, "items": []}
+        
+    async def search_all_repos(self, query: str, per_page: int = 100, max_pages: Optional[int] = None) -> List[Dict]:
         """
-        解析README内容，提取项目信息
+        获取搜索结果的所有分页
+        先请求第一页得到总数，再并发请求其余分页
         
         Args:
-            content: README内容
+            query: 搜索关键词
+            per_page: 每页数量（GitHub上限为100）
+            max_pages: 最多请求的页数，None表示不限制（仍受搜索API 1000条结果的上限约束）
             
         Returns:
-            Dict: 解析后的项目信息
+            List[Dict]: 去重后的仓库列表
         """
-        soup = BeautifulSoup(content, 'html.parser')
+        first = await self.search_repos(query, page=1, per_page=per_page)
+        total = min(first.get("total_count", 0), self.SEARCH_RESULT_LIMIT)
+        pages = -(-total // per_page)
+        if max_pages is not None:
+            pages = min(pages, max_pages)
+            
+        results = [first]
+        if pages > 1:
+            results += await asyncio.gather(*(
+                self.search_repos(query, page=page, per_page=per_page)
+                for page in range(2, pages + 1)
+            ))
+            
+        items = {}
+        for result in results:
+            for item in result.get("items", []):
+                items.setdefault(item["full_name"], item)
+        return list(items.values())
         
-        # 提取标题
-        title = soup.find('h1')
-        title = title.text.strip() if title else ""
+    async def fetch_repo_details(self, item: Dict) -> Dict:
+        """
+        并发获取单个仓库的README和统计信息
         
-        # 提取描述
-        description = ""
-        for p in soup.find_all('p'):
-            if len(p.text.strip()) > 30:  # 假设较长的段落是描述
-                description = p.text.strip()
-                break
-                
-        # 提取分类和标签
-        categories = []
-        tags = []
-        for h2 in soup.find_all('h2'):
-            categories.append(h2.text.strip())
-            
-        # 提取链接
-        links = []
-        for a in soup.find_all('a', href=True):
-            if 'github.com' in a['href']:
-                links.append(a['href'])
-                
+        Args:
+            item: 搜索结果中的仓库条目
+            
+        Returns:
+            Dict: 包含item、readme、stats和fetched_at的字典；fetched_at为发出请求的时间，
+                返回的数据都来自本次请求（200或经304重新验证的缓存）
+            
+        Raises:
+            GitHubRequestError: 仓库信息请求失败，或README请求失败（404除外，表示仓库没有README）
+        """
+        owner, repo = item["full_name"].split("/")
+        info_url = f"{self.api_base_url}/repos/{owner}/{repo}"
+        readme_url = f"{info_url}/readme"
+        fetched_at = datetime.utcnow()
+        (info_status, info), (readme_status, readme) = await asyncio.gather(
+            self._get_json(info_url),
+            self._get_json(readme_url)
+        )
+        if info_status != 200:
+            raise GitHubRequestError(info_url, info_status)
+        if readme_status not in (200, 404):
+            raise GitHubRequestError(readme_url, readme_status)
         return {
-            "title": title,
-            "description": description,
-            "categories": categories,
-            "tags": tags,
-            "related_links": links
+            "item": item,
+            "readme": self._decode_readme(readme) if readme_status == 200 else "",
+            "stats": self._repo_stats(info),
+            "fetched_at": fetched_at
         }
         
+    async def crawl_repos(
+        self,
+        items: List[Dict],
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Dict]:
+        """
+        并发获取一批仓库的详细信息
+        并发度由concurrency限制，单个仓库失败不影响其他仓库；
+        非200响应（包括重试后仍被限流）与异常一样计为失败，不出现在结果中
+        
+        Args:
+            items: 搜索结果中的仓库条目列表
+            progress: 每个仓库完成（含失败）后以(已完成数, 总数)调用
+            
+        Returns:
+            List[Dict]: 成功获取的仓库详情，格式同fetch_repo_details
+        """
+        completed = 0
+        
+        async def fetch(item: Dict) -> Dict:
+            nonlocal completed
+            try:
+                return await self.fetch_repo_details(item)
+            finally:
+                completed += 1
+                if progress is not None:
+                    progress(completed, len(items))
+                    
+        results = await asyncio.gather(
+            *(fetch(item) for item in items),
+            return_exceptions=True
+        )
+        details = []
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to crawl {item.get('full_name')}: {result}")
+                continue
+            details.append(result)
+        return details
+                
+    def parse_readme_content(self, content: str) -> Dict:
+        """
+        解析README内容，提取项目信息
+        
+        Args:
+            content: README内容
+            
+        Returns:
+            Dict: 解析后的项目信息，字段见parse_readme
+        """
+        return parse_readme(content)
+        
     async def get_repo_stats(self, owner: str, repo: str) -> Dict:
         """
         获取仓库统计信息
@@ -169,11 +486,4 @@ class GitHubCrawler:
         Returns:
             Dict: 统计信息
         """
-        info = await self.get_repo_info(owner, repo)
-        return {
-            "stars": info.get("stargazers_count", 0),
-            "forks": info.get("forks_count", 0),
-            "updated_at": info.get("updated_at", ""),
-            "created_at": info.get("created_at", ""),
-            "language": info.get("language", "")
-        } 
\ No newline at end of file
+        return self._repo_stats(await self.get_repo_info(owner, repo))
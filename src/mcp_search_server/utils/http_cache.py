@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP响应磁盘缓存
+保存响应体及ETag/Last-Modified，用于发送条件请求
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class HTTPCache:
+    """
+    HTTP响应磁盘缓存
+
+    每个URL对应缓存目录下的一个JSON文件，保存响应体和校验信息（ETag/Last-Modified）。
+    缓存不按时间判断新鲜度，调用方每次都用校验信息发送条件请求，收到304后续期。
+    缓存总大小超过上限时按最近最少使用的顺序淘汰。
+    """
+
+    def __init__(self, cache_dir: str = "data/http_cache", max_bytes: int = 256 * 1024 * 1024):
+        """
+        初始化HTTP缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存文件总大小上限（字节）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger("http_cache")
+        self._lock = threading.Lock()
+        # key -> 文件大小，按最近访问顺序排列
+        self._index: Optional[OrderedDict] = None
+        self._total_bytes = 0
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """
+        根据URL和查询参数生成缓存键
+
+        Args:
+            url: 请求地址
+            params: 查询参数
+
+        Returns:
+            str: 缓存键
+        """
+        raw = url
+        if params:
+            raw += "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> OrderedDict:
+        """首次使用时扫描缓存目录，按修改时间建立LRU索引"""
+        if self._index is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        读取缓存条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Dict]: 包含body、etag、last_modified、stored_at的条目，不存在时返回None
+        """
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+            index.move_to_end(key)
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._discard(key)
+            return None
+
+    def put(self, key: str, body, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        写入缓存条目，并在超出容量时淘汰旧条目
+
+        Args:
+            key: 缓存键
+            body: 响应体（可JSON序列化）
+            etag: ETag响应头
+            last_modified: Last-Modified响应头
+        """
+        data = json.dumps({
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "body": body
+        }, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data) - index.pop(key, 0)
+            index[key] = len(data)
+            self._evict()
+
+    def touch(self, key: str, entry: Dict) -> None:
+        """
+        条件请求返回304后续期条目
+
+        Args:
+            key: 缓存键
+            entry: get返回的条目
+        """
+        self.put(key, entry["body"], entry.get("etag"), entry.get("last_modified"))
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            index = self._load_index()
+            self._total_bytes -= index.pop(key, 0)
+            self._path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        """淘汰最近最少使用的条目直到总大小不超过上限，调用方需持有锁"""
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            index = self._load_index()
+            for key in list(index):
+                self._path(key).unlink(missing_ok=True)
+            index.clear()
+            self._total_bytes = 0
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+运行指标
+进程内的计数器、仪表和延迟直方图，可导出为JSON快照或Prometheus文本格式
+"""
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+# 延迟直方图的默认桶上界（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# Prometheus文本格式中标签值需要转义的字符
+_LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    """按Prometheus文本格式输出标签"""
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value.translate(_LABEL_ESCAPES)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    """指标基类，每组标签值对应一个样本"""
+
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(label) for label in labels)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Sequence[Tuple[str, str]] = ()) -> str:
+        return _format_labels(list(zip(self.labelnames, key)) + list(extra))
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """按标签值累加"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self) -> List[Dict]:
+        return [{"labels": self._label_dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {value}" for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """可增可减的仪表，如进行中的请求数"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    延迟直方图
+
+    每组标签值保存各桶计数、总和、次数和最大值，分位数按桶内线性插值估算。
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """记录一次观测值（秒）"""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [各桶计数（最后一个为+Inf）, 总和, 次数, 最大值]
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+            if value > entry[3]:
+                entry[3] = value
+
+    def quantile(self, q: float, *labels: str) -> Optional[float]:
+        """估算分位数，没有观测值时返回None"""
+        entry = self._values.get(self._key(labels))
+        return self._quantile(entry, q) if entry else None
+
+    def _quantile(self, entry: list, q: float) -> float:
+        counts, _, total, maximum = entry
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else maximum
+                return min(lower + (upper - lower) * (rank - seen) / count, maximum)
+            seen += count
+        return maximum
+
+    def snapshot(self) -> List[Dict]:
+        samples = []
+        for key, entry in sorted(self._values.items()):
+            _, total, count, maximum = entry
+            samples.append({
+                "labels": self._label_dict(key),
+                "count": count,
+                "sum": round(total, 6),
+                "mean_ms": round(total / count * 1000, 3),
+                "p50_ms": round(self._quantile(entry, 0.50) * 1000, 3),
+                "p95_ms": round(self._quantile(entry, 0.95) * 1000, 3),
+                "p99_ms": round(self._quantile(entry, 0.99) * 1000, 3),
+                "max_ms": round(maximum * 1000, 3),
+            })
+        return samples
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count, _) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    除直接记录的指标外，还可以注册采集函数，在导出时读取其他组件自身维护的统计
+    （如结果缓存的命中率）。
+    """
+
+    def __init__(self, prefix: str = "mcp_search"):
+        """
+        初始化注册表
+
+        Args:
+            prefix: 指标名前缀
+        """
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, float, Dict[str, str]]]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        name = f"{self.prefix}_{name}"
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return metric
+
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        """获取或创建计数器"""
+        return self._get_or_create(Counter, name, description, labelnames)
+
+    def gauge(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """获取或创建仪表"""
+        return self._get_or_create(Gauge, name, description, labelnames)
+
+    def histogram(self, name: str, description: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """获取或创建直方图"""
+        return self._get_or_create(Histogram, name, description, labelnames, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, float, Dict[str, str]]]]) -> None:
+        """
+        注册采集函数
+
+        Args:
+            collector: 返回(指标名, 说明, 值, 标签)的函数，值按仪表导出，导出时调用
+        """
+        self._collectors.append(collector)
+
+    def _collected(self) -> Dict[str, Tuple[str, List[Tuple[Dict[str, str], float]]]]:
+        collected: Dict[str, Tuple[str, List]] = {}
+        for collector in self._collectors:
+            for name, description, value, labels in collector():
+                collected.setdefault(f"{self.prefix}_{name}", (description, []))[1].append((labels, value))
+        return collected
+
+    def snapshot(self) -> Dict:
+        """
+        导出JSON快照
+
+        Returns:
+            Dict: 指标名到样本列表的映射，直方图样本包含次数、均值和估算的分位数（毫秒）
+        """
+        result = {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+        for name, (_, samples) in sorted(self._collected().items()):
+            result[name] = [{"labels": labels, "value": value} for labels, value in samples]
+        return result
+
+    def render_prometheus(self) -> str:
+        """
+        导出Prometheus文本格式（0.0.4）
+
+        Returns:
+            str: 指标文本
+        """
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.description}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        for name, (description, samples) in sorted(self._collected().items()):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(sorted(labels.items()))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def instrument(self, kind: str, name: str, fn: Callable) -> Callable:
+        """
+        为MCP工具或资源函数记录延迟、调用次数和进行中的调用数
+
+        包装函数保留原函数的签名和文档，FastMCP据此生成参数schema。
+
+        Args:
+            kind: tool或resource
+            name: 工具名或资源URI
+            fn: 同步或异步函数
+
+        Returns:
+            Callable: 包装后的函数
+        """
+        latency = self.histogram("request_duration_seconds", "MCP tool and resource latency", ("kind", "name"))
+        calls = self.counter("requests_total", "MCP tool and resource calls", ("kind", "name", "status"))
+        in_flight = self.gauge("requests_in_flight", "MCP tool and resource calls in progress", ("kind", "name"))
+
+        def finish(start: float, status: str) -> None:
+            latency.observe(time.perf_counter() - start, kind, name)
+            calls.inc(kind, name, status)
+            in_flight.dec(kind, name)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                in_flight.inc(kind, name)
+                start = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException:
+                    finish(start, "error")
+                    raise
+                finish(start, "ok")
+                return result
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                in_flight.inc(kind, name)
+                start = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException:
+                    finish(start, "error")
+                    raise
+                finish(start, "ok")
+                return result
+        return wrapper
+
+
+def _statement_kind(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+def instrument_engine(engine, registry: MetricsRegistry) -> None:
+    """
+    统计engine上执行的SQL语句数和耗时，按语句类型（SELECT/INSERT/UPDATE/DELETE）分组
+
+    Args:
+        engine: 数据库engine，异步engine会使用其底层的同步engine
+        registry: 指标注册表
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    statements = registry.counter("db_statements_total", "SQL statements executed", ("operation",))
+    latency = registry.histogram("db_statement_duration_seconds", "SQL statement latency", ("operation",))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("metrics_start")
+        if not starts:
+            return
+        operation = _statement_kind(statement)
+        statements.inc(operation)
+        latency.observe(time.perf_counter() - starts.pop(), operation)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("metrics_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
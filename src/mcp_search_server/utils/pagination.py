@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+游标分页
+将排序键编码为不透明的游标字符串，用于键集（keyset）分页
+"""
+
+import base64
+import json
+from typing import Dict, List, Tuple
+
+# 各排序方式的排序键类型：得分（JSON中整数得分没有小数点）、star数、导出位置，均以项目id为最后一个键
+CURSOR_KEY_TYPES: Dict[str, Tuple[Tuple[type, ...], ...]] = {
+    "score": ((int, float), (int,)),
+    "stars": ((int,), (int,)),
+    "export": ((int,),)
+}
+
+
+def encode_cursor(order: str, keys: List) -> str:
+    """
+    编码游标
+
+    Args:
+        order: 排序方式标识，用于校验游标与查询是否匹配
+        keys: 最后一条记录的排序键
+
+    Returns:
+        str: 不透明的游标字符串
+    """
+    payload = json.dumps({"o": order, "k": keys}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: str) -> List:
+    """
+    解码游标
+
+    Args:
+        cursor: 游标字符串
+        order: 当前查询的排序方式标识
+
+    Returns:
+        List: 排序键
+
+    Raises:
+        ValueError: 游标格式错误、与当前排序方式不匹配，或排序键的个数和类型不符合CURSOR_KEY_TYPES
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        keys = payload["k"]
+        cursor_order = payload["o"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if cursor_order != order or not isinstance(keys, list):
+        raise ValueError(f"Cursor does not match the current query order: {cursor}")
+    types = CURSOR_KEY_TYPES.get(order)
+    if types is not None and (len(keys) != len(types) or not all(
+        isinstance(key, allowed) and not isinstance(key, bool) for key, allowed in zip(keys, types)
+    )):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return keys
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+采样分析器
+在后台线程中定期采样目标线程（通常是事件循环线程）的调用栈，运行期间可随时开启和关闭
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+# 单个调用栈保留的最大帧数，超出部分从根部截断
+MAX_STACK_DEPTH = 64
+# 最多记录的不同调用栈数，超出后新调用栈只计入总样本数
+MAX_STACKS = 10000
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+class SamplingProfiler:
+    """
+    采样分析器
+
+    按固定间隔读取目标线程的当前帧，统计每个调用栈和每个函数（栈顶）出现的次数。
+    开销只与采样频率有关，不会像cProfile那样拖慢每次函数调用，适合在线上短时间开启。
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stacks: Counter = Counter()
+        self.samples = 0
+        self.interval = 0.01
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        """是否正在采样"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01, duration: Optional[float] = None,
+              thread_id: Optional[int] = None) -> None:
+        """
+        开始采样，清空上一次的结果；已在运行时不做任何事
+
+        Args:
+            interval: 采样间隔（秒）
+            duration: 自动停止前的采样时长（秒），None表示直到调用stop
+            thread_id: 目标线程，默认为调用start的线程
+        """
+        if self.running:
+            return
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+        self.interval = interval
+        self.started_at, self.stopped_at = time.time(), None
+        self._stop.clear()
+        target = thread_id or threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run, args=(target, interval, duration), name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止采样，保留已采集的结果"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+
+    def _run(self, target: int, interval: float, duration: Optional[float]) -> None:
+        deadline = time.monotonic() + duration if duration else None
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            key = tuple(reversed(stack))
+            with self._lock:
+                self.samples += 1
+                if key in self._stacks or len(self._stacks) < MAX_STACKS:
+                    self._stacks[key] += 1
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        self.stopped_at = time.time()
+
+    def report(self, limit: int = 20) -> Dict:
+        """
+        汇总采样结果
+
+        Args:
+            limit: 返回的函数和调用栈条数
+
+        Returns:
+            Dict: 运行状态、样本数，以及按样本数排序的栈顶函数（self）、
+                出现在栈中的函数（total）和完整调用栈
+        """
+        with self._lock:
+            stacks = list(self._stacks.items())
+            samples = self.samples
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in stacks:
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+
+        def ranked(counter: Counter) -> List[Dict]:
+            return [
+                {"function": label, "samples": count, "ratio": round(count / samples, 4)}
+                for label, count in counter.most_common(limit)
+            ]
+
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": samples,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "self": ranked(own) if samples else [],
+            "total": ranked(total) if samples else [],
+            "stacks": [
+                {"stack": ";".join(stack), "samples": count}
+                for stack, count in sorted(stacks, key=lambda item: -item[1])[:limit]
+            ],
+        }
+
+    def collapsed(self) -> str:
+        """
+        以折叠栈格式导出全部调用栈，可直接用于flamegraph.pl或speedscope
+
+        Returns:
+            str: 每行一个调用栈和样本数
+        """
+        with self._lock:
+            stacks = list(self._stacks.items())
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks)
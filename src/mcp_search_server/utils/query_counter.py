@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQL语句计数
+统计一段代码执行期间发往数据库的语句数，用于发现N+1查询
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List, Union
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """SQL语句计数器"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        """已执行的语句数"""
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine: Union[Engine, AsyncEngine]) -> Iterator[QueryCounter]:
+    """
+    统计上下文内在指定engine上执行的SQL语句
+
+    Args:
+        engine: 数据库engine，异步engine会使用其底层的同步engine
+
+    Yields:
+        QueryCounter: 计数器
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._on_execute)
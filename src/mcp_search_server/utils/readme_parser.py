@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+README解析
+单遍扫描Markdown（可混合HTML），提取标题、描述、链接、安装命令和徽章
+"""
+
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+# 描述段落的最小长度，较短的段落通常是口号或导航
+MIN_DESCRIPTION_LENGTH = 30
+# 少于该数量的README直接在当前进程解析，避免进程池启动开销
+PROCESS_POOL_MIN_BATCH = 64
+
+_ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})[ \t]*([\w+#.-]*)")
+_HTML_HEADING = re.compile(r"<h([1-6])\b[^>]*>(.*?)</h\1\s*>", re.IGNORECASE | re.DOTALL)
+_HTML_PARAGRAPH = re.compile(r"<p\b[^>]*>(.*?)</p\s*>", re.IGNORECASE | re.DOTALL)
+_LIST_ITEM = re.compile(r"^ {0,3}(?:[-*+]|\d+[.)])[ \t]+")
+_THEMATIC_BREAK = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+
+# [![alt](image)](link) 形式的徽章
+_LINKED_IMAGE = re.compile(r"\[!\[([^\]]*)\]\(\s*<?([^)\s>]+)>?[^)]*\)\]\(\s*<?([^)\s>]+)>?[^)]*\)")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(\s*<?([^)\s>]+)>?[^)]*\)")
+_LINK = re.compile(r"(?<!!)\[([^\]]*)\]\(\s*<?([^)\s>]+)>?[^)]*\)")
+_AUTOLINK = re.compile(r"<(https?://[^>\s]+)>")
+_HTML_HREF = re.compile(r"<a\b[^>]*?\bhref\s*=\s*[\"']([^\"']+)[\"']", re.IGNORECASE)
+_HTML_IMG = re.compile(r"<img\b[^>]*?\bsrc\s*=\s*[\"']([^\"']+)[\"'][^>]*>", re.IGNORECASE)
+_HTML_TAG = re.compile(r"<[^>]+>")
+_EMPHASIS = re.compile(r"(\*\*|__|\*|_|~~|`)(.+?)\1")
+_WHITESPACE = re.compile(r"\s+")
+_INLINE_MARKUP = frozenset("[<*_~`")
+
+_BADGE_HOSTS = ("shields.io", "badge.fury.io", "badgen.net", "/badge.svg", "/badge/", "codecov.io", "travis-ci.")
+_SHELL_LANGUAGES = {"", "bash", "sh", "shell", "console", "zsh", "powershell", "ps1", "cmd", "bat"}
+_INSTALL_HEADINGS = ("install", "setup", "getting started", "quick start", "quickstart", "usage", "安装", "快速开始")
+_INSTALL_COMMAND = re.compile(
+    r"^\s*(?:\$\s*)?(?:sudo\s+)?"
+    r"(?:pip3?|pipx|uv|uvx|poetry|conda|npm|npx|pnpm|yarn|bun|cargo|go|brew|apt(?:-get)?|"
+    r"docker|git\s+clone|smithery|mcp)\s"
+)
+
+
+def _clean_inline(text: str) -> str:
+    """去除行内Markdown和HTML标记，保留可读文本"""
+    if not _INLINE_MARKUP.intersection(text):
+        return " ".join(text.split())
+    text = _LINKED_IMAGE.sub("", text)
+    text = _IMAGE.sub(r"\1", text)
+    text = _LINK.sub(r"\1", text)
+    text = _AUTOLINK.sub(r"\1", text)
+    text = _HTML_TAG.sub("", text)
+    text = _EMPHASIS.sub(r"\2", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _is_badge(image_url: str) -> bool:
+    return any(host in image_url for host in _BADGE_HOSTS)
+
+
+class _ReadmeScanner:
+    """单遍扫描状态机"""
+
+    def __init__(self):
+        self.title = ""
+        self.description = ""
+        self.headings: List[Dict] = []
+        self.links: List[str] = []
+        self.badges: List[Dict] = []
+        self.install_commands: List[str] = []
+        self._seen_links = set()
+        self._paragraph: List[str] = []
+        self._html_block: List[str] = []
+        self._fence: Optional[str] = None
+        self._fence_language = ""
+        self._fence_lines: List[str] = []
+        self._section = ""
+
+    def scan(self, content: str) -> "_ReadmeScanner":
+        for line in content.splitlines():
+            if self._fence is not None:
+                if line.lstrip().startswith(self._fence):
+                    self._close_fence()
+                else:
+                    self._fence_lines.append(line)
+                continue
+            if self._html_block:
+                self._html_block.append(line)
+                if self._html_block_closed():
+                    self._flush_html_block()
+                continue
+            self._scan_line(line)
+        if self._fence is not None:
+            self._close_fence()
+        self._flush_html_block()
+        self._flush_paragraph()
+        return self
+
+    def _scan_line(self, line: str):
+        stripped = line.strip()
+        if not stripped:
+            self._flush_paragraph()
+            return
+
+        # 按首字符分派，大多数行只需一次字符比较即可确定类型
+        first = stripped[0]
+        if first in "`~":
+            fence = _FENCE.match(line)
+            if fence:
+                self._flush_paragraph()
+                self._fence = fence.group(1)
+                self._fence_language = fence.group(2).lower()
+                self._fence_lines = []
+                return
+
+        elif first == "#":
+            heading = _ATX_HEADING.match(line)
+            if heading:
+                self._flush_paragraph()
+                self._add_heading(len(heading.group(1)), heading.group(2) or "")
+                return
+
+        elif first in "=-*_":
+            # setext标题：段落下一行的===或---
+            if len(self._paragraph) == 1 and _SETEXT_UNDERLINE.match(line):
+                text = self._paragraph.pop()
+                self._add_heading(1 if first == "=" else 2, text)
+                return
+            if _THEMATIC_BREAK.match(line):
+                self._flush_paragraph()
+                return
+
+        self._collect_links(line)
+
+        if first == "<" and not _AUTOLINK.match(stripped):
+            self._flush_paragraph()
+            self._html_block = [line]
+            return
+
+        if first in "|>" or ((first in "-*+" or first.isdigit()) and _LIST_ITEM.match(line)):
+            # 列表、表格和引用不作为描述候选
+            self._flush_paragraph()
+            return
+
+        self._paragraph.append(stripped)
+
+    def _html_block_closed(self) -> bool:
+        """与CommonMark一致，HTML块在空行处结束"""
+        return not self._html_block[-1].strip()
+
+    def _flush_html_block(self):
+        if not self._html_block:
+            return
+        block = "\n".join(self._html_block)
+        self._html_block = []
+        for line in block.splitlines()[1:]:
+            self._collect_links(line)
+        for match in _HTML_HEADING.finditer(block):
+            self._add_heading(int(match.group(1)), match.group(2))
+        for match in _HTML_PARAGRAPH.finditer(block):
+            self._offer_description(match.group(1))
+
+    def _add_heading(self, level: int, raw: str):
+        self._collect_links(raw)
+        text = _clean_inline(raw)
+        if not text:
+            return
+        self.headings.append({"level": level, "text": text})
+        if level == 1 and not self.title:
+            self.title = text
+        self._section = text.lower()
+
+    def _flush_paragraph(self):
+        if self._paragraph:
+            self._offer_description(" ".join(self._paragraph))
+            self._paragraph = []
+
+    def _offer_description(self, raw: str):
+        if self.description:
+            return
+        text = _clean_inline(raw)
+        if len(text) > MIN_DESCRIPTION_LENGTH:
+            self.description = text
+
+    def _add_link(self, url: str):
+        if url not in self._seen_links and not url.startswith("#"):
+            self._seen_links.add(url)
+            self.links.append(url)
+
+    def _collect_links(self, line: str):
+        # 快速路径：没有链接语法的行跳过所有正则
+        if "](" not in line and "<" not in line:
+            return
+        for match in _LINKED_IMAGE.finditer(line):
+            alt, image, target = match.groups()
+            if _is_badge(image):
+                self.badges.append({"alt": alt, "image": image, "link": target})
+            self._add_link(target)
+        remainder = _LINKED_IMAGE.sub("", line)
+        for match in _IMAGE.finditer(remainder):
+            if _is_badge(match.group(2)):
+                self.badges.append({"alt": match.group(1), "image": match.group(2), "link": None})
+        for match in _LINK.finditer(remainder):
+            self._add_link(match.group(2))
+        for match in _AUTOLINK.finditer(remainder):
+            self._add_link(match.group(1))
+        if "<" in remainder:
+            for match in _HTML_HREF.finditer(remainder):
+                self._add_link(match.group(1))
+            for match in _HTML_IMG.finditer(remainder):
+                if _is_badge(match.group(1)):
+                    alt = re.search(r"\balt\s*=\s*[\"']([^\"']*)[\"']", match.group(0))
+                    self.badges.append({"alt": alt.group(1) if alt else "", "image": match.group(1), "link": None})
+
+    def _close_fence(self):
+        language = self._fence_language
+        lines = self._fence_lines
+        self._fence = None
+        self._fence_lines = []
+        if language not in _SHELL_LANGUAGES:
+            return
+        in_install_section = any(word in self._section for word in _INSTALL_HEADINGS)
+        for line in lines:
+            if _INSTALL_COMMAND.match(line) or (in_install_section and line.strip().startswith("$ ")):
+                command = line.strip()
+                if command.startswith("$ "):
+                    command = command[2:]
+                if command not in self.install_commands:
+                    self.install_commands.append(command)
+
+
+def parse_readme(content: str) -> Dict:
+    """
+    解析README内容，提取项目信息
+
+    Args:
+        content: README内容（Markdown，可包含HTML）
+
+    Returns:
+        Dict: 包含title、description、categories、tags、related_links、
+            headings、links、install_commands、badges的解析结果；
+            README的章节标题多为Installation、License等通用内容，不作为项目分类，
+            categories和tags始终为空列表，保留这两个字段以兼容原有调用方
+    """
+    scanner = _ReadmeScanner().scan(content or "")
+    return {
+        "title": scanner.title,
+        "description": scanner.description,
+        "categories": [],
+        "tags": [],
+        "related_links": [link for link in scanner.links if "github.com" in link],
+        "headings": scanner.headings,
+        "links": scanner.links,
+        "install_commands": scanner.install_commands,
+        "badges": scanner.badges
+    }
+
+
+def parse_readmes(contents: List[str], max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    批量解析README，数量较多时使用进程池并行解析
+
+    服务器在工作线程中调用本函数，fork出的子进程会继承其他线程持有的锁，
+    因此进程池固定使用spawn方式启动子进程。
+
+    Args:
+        contents: README内容列表
+        max_workers: 进程数，默认为CPU核数；为1时在当前进程解析
+
+    Returns:
+        List[Dict]: 与输入顺序一致的解析结果
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1 or len(contents) < PROCESS_POOL_MIN_BATCH:
+        return [parse_readme(content) for content in contents]
+    chunksize = max(1, len(contents) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return list(executor.map(parse_readme, contents, chunksize=chunksize))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试夹具
+"""
+
+import logging
+
+import pytest
+
+from mcp_search_server.core.server import MCPSearchServer
+
+from .helpers import FakeGitHubAPI
+
+
+@pytest.fixture
+async def make_server(tmp_path):
+    """
+    创建使用临时数据库和临时缓存目录的服务器，测试结束后关闭
+
+    返回的函数接收按配置段覆盖的配置，例如make_server(search={"store": False})
+    """
+    servers = []
+    logging.getLogger("mcp-search-server").setLevel(logging.ERROR)
+
+    def factory(**overrides) -> MCPSearchServer:
+        config = {
+            "database": {"url": f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"},
+            "github": {"token": "test", "cache_dir": str(tmp_path / "http_cache")},
+            "snapshot": {"path": None},
+            "semantic": {"path": str(tmp_path / "semantic")},
+        }
+        for section, values in overrides.items():
+            config[section] = {**config.get(section, {}), **values}
+        server = MCPSearchServer(config=config)
+        servers.append(server)
+        return server
+
+    yield factory
+    for server in servers:
+        await server.stop()
+
+
+@pytest.fixture
+async def github_api():
+    """本地运行的GitHub API替身"""
+    api = FakeGitHubAPI()
+    await api.start()
+    yield api
+    await api.stop()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试辅助函数
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+def make_project(index: int, **fields) -> Dict:
+    """
+    生成可直接写入ProjectService.upsert_projects的项目数据
+
+    Args:
+        index: 项目编号，决定名称和仓库地址
+        **fields: 覆盖的字段
+
+    Returns:
+        Dict: 项目数据
+    """
+    project = {
+        "name": f"project-{index}",
+        "description": f"MCP server number {index}",
+        "repo_url": f"https://github.com/owner/project-{index}",
+        "readme_content": f"# project-{index}\n\nAn MCP server.\n",
+        "stars": index,
+        "forks": 0,
+        "language": "Python",
+        "categories": ["tools"],
+        "tags": ["mcp"],
+    }
+    project.update(fields)
+    return project
+
+
+async def seed(server, projects: List[Dict]) -> None:
+    """写入项目并更新服务器的派生结构（项目存储、模糊索引等）"""
+    async with server._session() as session:
+        await server._project_service(session).upsert_projects(projects)
+    await server._after_write()
+
+
+class FakeGitHubAPI:
+    """
+    最小的GitHub API替身，提供搜索、仓库信息和README接口
+
+    responses中按路径指定的状态码会替代正常响应，用于模拟失败和限流；
+    正常响应带有ETag，If-None-Match匹配时返回304。
+    """
+
+    def __init__(self):
+        self.repos: Dict[str, Dict] = {}
+        self.responses: Dict[str, Tuple[int, Dict[str, str]]] = {}
+        self.requests: List[Tuple[str, int]] = []
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.url = ""
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_repo(self, full_name: str, readme: Optional[str] = "# Readme\n", **info) -> None:
+        """
+        添加仓库
+
+        Args:
+            full_name: owner/name
+            readme: README内容，None表示仓库没有README（返回404）
+            **info: 覆盖的仓库字段，如stargazers_count、pushed_at
+        """
+        owner, name = full_name.split("/")
+        self.repos[full_name] = {
+            "full_name": full_name,
+            "name": name,
+            "html_url": f"https://github.com/{full_name}",
+            "description": f"{name} description",
+            "stargazers_count": 10,
+            "forks_count": 1,
+            "language": "Python",
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-02T00:00:00Z",
+            "pushed_at": "2024-01-02T00:00:00Z",
+            "readme": readme,
+            **info,
+        }
+
+    def fail(self, path: str, status: int, headers: Optional[Dict[str, str]] = None) -> None:
+        """让指定路径返回status，headers为附加的响应头（如Retry-After）"""
+        self.responses[path] = (status, headers or {})
+
+    def count(self, path: str, status: Optional[int] = None) -> int:
+        """路径被请求的次数，可按响应状态码筛选"""
+        return sum(1 for seen, code in self.requests if seen == path and (status is None or code == status))
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/search/repositories", self._search)
+        app.router.add_get("/repos/{owner}/{name}", self._repo)
+        app.router.add_get("/repos/{owner}/{name}/readme", self._readme)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _respond(self, request: web.Request, body: Optional[Dict]) -> web.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            status, headers = self.responses.get(request.path, (200 if body is not None else 404, {}))
+            if status != 200:
+                self.requests.append((request.path, status))
+                return web.json_response({"message": "error"}, status=status, headers=headers)
+            payload = json.dumps(body, sort_keys=True)
+            etag = '"' + hashlib.sha1(payload.encode("utf-8")).hexdigest() + '"'
+            if request.headers.get("If-None-Match") == etag:
+                self.requests.append((request.path, 304))
+                return web.Response(status=304, headers={"ETag": etag})
+            self.requests.append((request.path, 200))
+            return web.Response(text=payload, content_type="application/json", headers={"ETag": etag})
+        finally:
+            self.in_flight -= 1
+
+    async def _search(self, request: web.Request) -> web.Response:
+        items = [
+            {key: value for key, value in repo.items() if key != "readme"}
+            for repo in sorted(self.repos.values(), key=lambda repo: -repo["stargazers_count"])
+        ]
+        return await self._respond(request, {"total_count": len(items), "items": items})
+
+    async def _repo(self, request: web.Request) -> web.Response:
+        repo = self.repos.get(f"{request.match_info['owner']}/{request.match_info['name']}")
+        body = {key: value for key, value in repo.items() if key != "readme"} if repo else None
+        return await self._respond(request, body)
+
+    async def _readme(self, request: web.Request) -> web.Response:
+        repo = self.repos.get(f"{request.match_info['owner']}/{request.match_info['name']}")
+        body = None
+        if repo and repo["readme"] is not None:
+            body = {"content": base64.b64encode(repo["readme"].encode("utf-8")).decode("ascii")}
+        return await self._respond(request, body)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Awesome列表解析测试
+"""
+
+import pytest
+
+from mcp_search_server.utils.awesome_parser import MAX_URL_LENGTH, normalize_repo_url, parse_awesome_list
+
+AWESOME_LIST = """# Awesome MCP Servers
+
+- [Not in a section](https://github.com/a/ignored) - before the first category
+
+## Contents
+
+- [Databases](#databases)
+
+## 🗄️ Databases
+
+- 🐍 ☁️ [Postgres MCP](https://github.com/a/postgres.git) - Query **Postgres** with `SQL`.
+* [sqlite](https://www.github.com/a/sqlite/) 🏠 — ![badge](https://img.shields.io/x) Local [SQLite](https://sqlite.org) files
+
+### Vector stores
+
+- [qdrant](https://github.com/a/qdrant#readme): vectors
+
+```markdown
+- [Fenced](https://github.com/a/fenced) - inside a code block
+```
+
+## Browser Automation ##
+
+- [Postgres MCP](https://github.com/a/postgres) - listed twice
+- Plain text item without a link
+
+## Contributing
+
+- [Guide](https://github.com/a/guide) - not a project
+"""
+
+
+def by_url(entries):
+    return {entry["repo_url"]: entry for entry in entries}
+
+
+def test_sections_become_category_paths():
+    entries = by_url(parse_awesome_list(AWESOME_LIST, extra_categories=["awesome-mcp"]))
+    assert set(entries) == {
+        "https://github.com/a/postgres", "https://github.com/a/sqlite", "https://github.com/a/qdrant"
+    }
+    assert entries["https://github.com/a/qdrant"]["categories"] == ["Databases", "Vector stores", "awesome-mcp"]
+    # 重复出现的项目合并分类，保留首次出现时的名称和描述
+    postgres = entries["https://github.com/a/postgres"]
+    assert postgres["categories"] == ["Databases", "awesome-mcp", "Browser Automation"]
+    assert (postgres["name"], postgres["description"]) == ("Postgres MCP", "Query Postgres with SQL.")
+
+
+def test_descriptions_drop_markup_and_legend_symbols():
+    entries = by_url(parse_awesome_list(AWESOME_LIST))
+    assert entries["https://github.com/a/sqlite"]["description"] == "Local SQLite files"
+    assert entries["https://github.com/a/qdrant"]["description"] == "vectors"
+
+
+@pytest.mark.parametrize("section", ["Contents", "Table of Contents", "License", "目录"])
+def test_skipped_sections(section):
+    assert parse_awesome_list(f"## {section}\n\n- [x](https://github.com/a/x) - y\n") == []
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://github.com/a/b", "https://github.com/a/b"),
+    ("https://github.com/a/b/", "https://github.com/a/b"),
+    ("https://github.com/a/b.git", "https://github.com/a/b"),
+    ("http://www.github.com/a/b#readme", "https://github.com/a/b"),
+    ("https://gitlab.com/a/b/", "https://gitlab.com/a/b"),
+])
+def test_normalize_repo_url(url, expected):
+    assert normalize_repo_url(url) == expected
+
+
+def test_overlong_urls_are_skipped():
+    url = "https://github.com/a/" + "b" * MAX_URL_LENGTH
+    assert normalize_repo_url(url) is None
+    assert parse_awesome_list(f"## Tools\n\n- [b]({url}) - too long\n") == []
+
+
+def test_empty_content():
+    assert parse_awesome_list("") == []
+    assert parse_awesome_list(None) == []
+
+
+async def test_ingest_reports_progress_after_each_source(make_server, tmp_path):
+    for index in range(2):
+        (tmp_path / f"list{index}.md").write_text(AWESOME_LIST, encoding="utf-8")
+    sources = [str(tmp_path / "list0.md"), str(tmp_path / "missing.md"), str(tmp_path / "list1.md")]
+    reports = []
+    server = make_server()
+    result = await server.ingest_awesome_lists(
+        sources, progress=lambda stage, done=None, total=None: reports.append((stage, done, total))
+    )
+    assert (result["status"], result["failed_sources"]) == ("partial", [sources[1]])
+    assert [report for report in reports if report[0] == "loading"] == [
+        ("loading", done, 3) for done in range(4)
+    ]
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量搜索测试
+"""
+
+import pytest
+
+from mcp_search_server.utils.query_counter import count_queries
+
+from .helpers import make_project, seed
+
+SPECS = [
+    {"query": "mcp", "size": 3},
+    {"query": "", "filters": "stars:>=4"},
+    {"query": "project", "page": 2, "size": 2, "fuzzy": False},
+]
+
+
+@pytest.mark.parametrize("store", [False, True])
+async def test_batch_results_match_single_searches(make_server, store):
+    server = make_server(search={"store": store, "min_score": 0.0})
+    await seed(server, [make_project(index) for index in range(1, 8)])
+    results = await server.search_batch(SPECS)
+    assert results == [await server._search(**spec) for spec in SPECS]
+
+
+async def test_duplicate_queries_run_once_in_one_session(make_server):
+    # 关闭结果缓存，使两次批量搜索都实际查询数据库
+    server = make_server(search={"store": False, "min_score": 0.0}, cache={"max_size": 0})
+    await seed(server, [make_project(index) for index in range(1, 8)])
+    with count_queries(server.read_engine) as single:
+        await server.search_batch([SPECS[0]])
+    with count_queries(server.read_engine) as repeated:
+        results = await server.search_batch([SPECS[0], dict(SPECS[0]), {**SPECS[0], "page": 1}])
+    assert repeated.count == single.count
+    assert results[0] == results[1] == results[2]
+
+
+async def test_invalid_queries_only_fail_themselves(make_server):
+    server = make_server(search={"min_score": 0.0})
+    await seed(server, [make_project(index) for index in range(1, 4)])
+    results = await server.search_batch([
+        {"query": "mcp"},
+        {"query": "mcp", "filters": "owner:me"},
+        {"query": 42},
+        {"query": "mcp", "sort": "stars"},
+    ])
+    assert results[0]["total"] == 3
+    assert "owner" in results[1]["error"]
+    assert "error" in results[2] and "error" in results[3]
+
+
+async def test_batch_size_is_limited(make_server):
+    server = make_server(search={"max_batch_size": 2})
+    with pytest.raises(ValueError):
+        await server.search_batch([{"query": "a"}, {"query": "b"}, {"query": "c"}])
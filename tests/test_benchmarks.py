@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试工具测试：合成目录、GitHub API模拟和结果汇总
+"""
+
+import json
+
+import pytest
+
+from catalogue import generate_catalogue, generate_project, main as catalogue_main, query_workload
+from fake_github import FakeGitHub
+from run import PROJECT_FIELDS, compare, summarize
+
+from mcp_search_server.utils.github_crawler import GitHubCrawler
+
+from .helpers import seed
+
+
+def test_projects_are_deterministic_and_randomly_accessible():
+    catalogue = list(generate_catalogue(20, seed=3, readme_size=512))
+    assert catalogue == list(generate_catalogue(20, seed=3, readme_size=512))
+    assert catalogue[7] == generate_project(7, seed=3, readme_size=512)
+    assert catalogue != list(generate_catalogue(20, seed=4, readme_size=512))
+    assert len({project["repo_url"] for project in catalogue}) == 20
+    assert all(project["stars"] >= 0 and 0 <= project["forks"] <= project["stars"] for project in catalogue)
+    assert all(project["readme_content"] == "" for project in generate_catalogue(5, readme_size=0))
+
+
+def test_query_workload_is_deterministic():
+    queries = query_workload(50, seed=1)
+    assert len(queries) == 50 and queries == query_workload(50, seed=1)
+    assert any(query.startswith('"') for query in queries)
+    assert any(query.endswith("*") for query in queries)
+
+
+def test_catalogue_cli_writes_ndjson(tmp_path):
+    output = tmp_path / "catalogue.ndjson"
+    catalogue_main(["--projects", "3", "--readme-size", "0", "--output", str(output)])
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["repo_url"] for line in lines] == [
+        project["repo_url"] for project in generate_catalogue(3, readme_size=0)
+    ]
+
+
+async def test_generated_projects_can_be_ingested_and_found(make_server):
+    server = make_server(search={"min_score": 0.0})
+    projects = [{field: project[field] for field in PROJECT_FIELDS} for project in generate_catalogue(30, readme_size=256)]
+    await seed(server, projects)
+    target = projects[0]
+    results = await server._search(f'"{target["name"]}"', size=5, fuzzy=False)
+    assert results["items"][0]["repo_url"] == target["repo_url"]
+
+
+def test_summarize_reports_percentiles_in_milliseconds():
+    summary = summarize([0.001 * value for value in range(1, 101)])
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == pytest.approx(51.0)
+    assert summary["p99_ms"] == pytest.approx(100.0)
+    assert (summary["min_ms"], summary["max_ms"]) == (pytest.approx(1.0), pytest.approx(100.0))
+    assert summary["mean_ms"] == pytest.approx(50.5)
+
+
+def test_compare_lists_shared_timing_metrics():
+    lines = compare(
+        {"results": {"search": {"p50_ms": 2.0, "count": 10}, "new": {"p50_ms": 1.0}}},
+        {"results": {"search": {"p50_ms": 4.0, "count": 10}}},
+    )
+    assert len(lines) == 1
+    assert lines[0].startswith("search.p50_ms") and lines[0].endswith("0.50x")
+
+
+async def test_fake_github_serves_the_catalogue_by_stars():
+    fake = FakeGitHub(projects=120, readme_size=128)
+    url = await fake.start()
+    try:
+        async with GitHubCrawler("test", api_base_url=url) as crawler:
+            items = await crawler.search_all_repos("topic:mcp")
+            details = await crawler.crawl_repos(items[:3])
+    finally:
+        await fake.stop()
+    assert len(items) == 120
+    stars = [item["stargazers_count"] for item in items]
+    assert stars == sorted(stars, reverse=True)
+    first = next(project for project in generate_catalogue(120, readme_size=128) if project["name"] == items[0]["name"])
+    detail = next(detail for detail in details if detail["item"]["name"] == first["name"])
+    assert detail["readme"] == first["readme_content"]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量写入测试
+"""
+
+from sqlalchemy import select
+
+from mcp_search_server.models.database import Project
+from mcp_search_server.services.ranking import popularity_prior
+from mcp_search_server.utils.query_counter import count_queries
+
+from .helpers import make_project
+
+
+async def upsert(server, projects, **options):
+    await server.setup()
+    async with server._session() as session:
+        return await server._project_service(session).upsert_projects(projects, **options)
+
+
+async def stored(server, repo_url):
+    async with server._read_session() as session:
+        project = (await server._project_service(session).search_projects("", size=100))["items"]
+    return next(item for item in project if item["repo_url"] == repo_url)
+
+
+async def test_new_and_updated_counts_and_partial_updates(make_server):
+    server = make_server(search={"store": False})
+    assert await upsert(server, [make_project(index, forks=40) for index in range(1, 4)]) == {"new": 3, "updated": 0}
+    url = make_project(1)["repo_url"]
+    stats = await upsert(server, [
+        {"repo_url": url, "stars": 500},
+        {"repo_url": url, "stars": 700},
+        make_project(4),
+    ])
+    assert stats == {"new": 1, "updated": 1}
+    project = await stored(server, url)
+    # 未提供的字段保持不变，同一地址重复出现时以最后一条为准
+    assert (project["name"], project["stars"], project["categories"]) == ("project-1", 700, ["tools"])
+    async with server._read_session() as session:
+        score = await session.scalar(select(Project.search_score).where(Project.repo_url == url))
+    # 只更新star数时，热度先验使用已保存的fork数
+    assert score == popularity_prior(700, 40)
+
+
+async def test_labels_are_replaced_or_appended(make_server):
+    server = make_server(search={"store": False})
+    url = make_project(1)["repo_url"]
+    await upsert(server, [make_project(1, categories=["a"], tags=["x"])])
+    await upsert(server, [{"repo_url": url, "categories": ["b"]}], replace_labels=False)
+    assert sorted((await stored(server, url))["categories"]) == ["a", "b"]
+    await upsert(server, [{"repo_url": url, "categories": ["c"], "tags": []}])
+    project = await stored(server, url)
+    assert (project["categories"], project["tags"]) == (["c"], [])
+
+
+async def test_statement_count_does_not_grow_with_batch_size(make_server):
+    server = make_server(search={"store": False})
+    await server.setup()
+    counts = []
+    for first, size in ((1, 5), (100, 50)):
+        batch = [make_project(index, categories=[f"c{index}"], tags=["mcp"]) for index in range(first, first + size)]
+        with count_queries(server.engine) as counter:
+            await upsert(server, batch, chunk_size=None)
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
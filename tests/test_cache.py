@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+查询结果缓存测试
+"""
+
+import pytest
+
+from mcp_search_server.utils.cache import MemoryCache, RedisCache, create_cache, make_cache_key
+
+from .helpers import make_project, seed
+
+
+class FakeRedis:
+    """只实现RedisCache用到的get/set/incr"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+def test_cache_key_normalizes_equivalent_queries():
+    assert make_cache_key("search", query=" mcp ", tags=["b", "a"]) == make_cache_key("search", tags=("a", "b"), query="mcp")
+    assert make_cache_key("search", query="mcp") != make_cache_key("facets", query="mcp")
+    assert make_cache_key("search", query="mcp", page=1) != make_cache_key("search", query="mcp", page=2)
+
+
+async def test_memory_cache_expires_entries():
+    cache = MemoryCache(ttl=60)
+    await cache.set("fresh", 1)
+    await cache.set("stale", 2, ttl=-1)
+    assert await cache.get("fresh") == 1
+    assert await cache.get("stale") is None
+    assert cache.stats()["size"] == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_size=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+    assert await cache.get("b") is None
+    assert (await cache.get("a"), await cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.parametrize("make_cache", [MemoryCache, lambda: RedisCache(FakeRedis())])
+async def test_invalidation_discards_entries_and_stale_writes(make_cache):
+    cache = make_cache()
+    await cache.set("key", "old")
+    generation = await cache.generation()
+    await cache.invalidate()
+    assert await cache.get("key") is None
+    # 失效前开始的查询结果不能写入新的代数
+    await cache.set("key", "stale", generation=generation)
+    assert await cache.get("key") is None
+    await cache.set("key", "new", generation=await cache.generation())
+    assert await cache.get("key") == "new"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_unknown_cache_type_is_rejected():
+    with pytest.raises(ValueError):
+        create_cache({"type": "disk"})
+
+
+async def test_search_results_are_cached_until_the_next_write(make_server):
+    """结果缓存用于数据库查询路径，项目存储直接在内存中搜索"""
+    server = make_server(search={"store": False})
+    await seed(server, [make_project(index) for index in range(1, 4)])
+    first = await server._search("mcp", fuzzy=False)
+    hits = server.result_cache.hits
+    assert await server._search("mcp", fuzzy=False) == first
+    assert server.result_cache.hits == hits + 1
+
+    await seed(server, [make_project(4)])
+    assert (await server._search("mcp", fuzzy=False))["total"] == 4
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+目录仓库数据源测试，使用临时目录中的本地git仓库
+"""
+
+import subprocess
+
+import pytest
+from sqlalchemy import select
+
+from mcp_search_server.models.database import Project
+from mcp_search_server.utils.catalogue_source import CatalogueSource, GitError
+
+
+class CatalogueRepo:
+    """临时目录仓库，write写入文件，commit提交并返回提交哈希"""
+
+    def __init__(self, path):
+        self.path = path
+        path.mkdir()
+        self.git("init", "--quiet", "--initial-branch=main")
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            cwd=self.path, check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    def write(self, name: str, *repos: str) -> None:
+        lines = ["# Catalogue", "", "## Servers", ""]
+        lines += [f"- [{repo.rsplit('/', 1)[-1]}](https://github.com/{repo}) - {repo} server" for repo in repos]
+        (self.path / name).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def remove(self, name: str) -> None:
+        self.git("rm", "--quiet", name)
+
+    def commit(self) -> str:
+        self.git("add", "-A")
+        self.git("commit", "--quiet", "-m", "update")
+        return self.git("rev-parse", "HEAD")
+
+
+@pytest.fixture
+def catalogue(tmp_path):
+    return CatalogueRepo(tmp_path / "catalogue")
+
+
+async def project_source(server, repo_url: str) -> str:
+    async with server._read_session() as session:
+        return await session.scalar(select(Project.source).where(Project.repo_url == repo_url))
+
+
+async def test_changes_since_reports_changed_and_deleted_files(catalogue, tmp_path):
+    catalogue.write("databases.md", "a/postgres")
+    catalogue.write("files.md", "a/files")
+    (catalogue.path / "notes.txt").write_text("ignored")
+    first = catalogue.commit()
+    source = CatalogueSource(str(catalogue.path), mirror_dir=str(tmp_path / "mirror.git"), branch="main")
+    assert await source.sync() == first
+
+    full = await source.changes_since(None, first)
+    assert full.full and sorted(full.changed) == ["databases.md", "files.md"]
+
+    catalogue.write("databases.md", "a/postgres", "a/sqlite")
+    catalogue.remove("files.md")
+    second = catalogue.commit()
+    assert await source.sync() == second
+    changes = await source.changes_since(first, second)
+    assert not changes.full
+    assert list(changes.changed) == ["databases.md"]
+    assert "a/sqlite" in changes.changed["databases.md"]
+    assert changes.deleted == ["files.md"]
+
+    # 镜像中不存在的基准提交退回全量索引
+    assert (await source.changes_since("0" * 40, second)).full
+
+
+async def test_referenced_urls_does_not_match_url_prefixes(catalogue, tmp_path):
+    catalogue.write("one.md", "a/bc")
+    catalogue.write("two.md", "a/other")
+    head = catalogue.commit()
+    source = CatalogueSource(str(catalogue.path), mirror_dir=str(tmp_path / "mirror.git"), branch="main")
+    await source.sync()
+    urls = ["https://github.com/a/b", "https://github.com/a/bc", "https://github.com/a/gone"]
+    assert await source.referenced_urls(head, urls) == {"https://github.com/a/bc": "one.md"}
+    assert await source.referenced_urls(head, ["https://github.com/a/gone"]) == {}
+
+
+async def test_referenced_urls_raises_when_git_grep_fails(catalogue, tmp_path):
+    catalogue.write("one.md", "a/b")
+    catalogue.commit()
+    source = CatalogueSource(str(catalogue.path), mirror_dir=str(tmp_path / "mirror.git"), branch="main")
+    await source.sync()
+    # 只有退出状态1（没有匹配）表示没有引用，其他失败不能被当作“已不再引用”
+    with pytest.raises(GitError) as error:
+        await source.referenced_urls("0" * 40, ["https://github.com/a/b"])
+    assert error.value.returncode not in (0, 1)
+
+
+async def test_refresh_catalogue_deletes_projects_removed_from_the_catalogue(make_server, catalogue, tmp_path):
+    catalogue.write("one.md", "a/b", "a/moved")
+    catalogue.write("two.md", "a/bc")
+    catalogue.commit()
+    server = make_server(catalogue={"repo_url": str(catalogue.path), "mirror_dir": str(tmp_path / "mirror.git")})
+    first = await server.refresh_catalogue()
+    assert first["status"] == "success"
+
+    # a/b被删除，但a/bc仍以它为前缀出现；a/moved移到另一个文件
+    catalogue.write("one.md")
+    catalogue.write("two.md", "a/bc", "a/moved")
+    catalogue.commit()
+    await server.refresh_catalogue()
+    results = await server._search("", size=10, fuzzy=False)
+    assert sorted(item["repo_url"] for item in results["items"]) == [
+        "https://github.com/a/bc", "https://github.com/a/moved"
+    ]
+
+
+async def test_kept_projects_take_the_source_of_the_file_still_listing_them(make_server, catalogue, tmp_path):
+    catalogue.write("one.md", "a/shared")
+    catalogue.write("three.md", "a/shared")
+    catalogue.commit()
+    server = make_server(catalogue={"repo_url": str(catalogue.path), "mirror_dir": str(tmp_path / "mirror.git")})
+    await server.refresh_catalogue()
+    assert await project_source(server, "https://github.com/a/shared") == "catalogue:one.md"
+
+    # one.md被删除后项目仍由three.md列出，来源改为three.md
+    catalogue.remove("one.md")
+    catalogue.commit()
+    await server.refresh_catalogue()
+    assert await project_source(server, "https://github.com/a/shared") == "catalogue:three.md"
+
+    # 之后从three.md中移除时项目被删除
+    catalogue.write("three.md")
+    catalogue.commit()
+    result = await server.refresh_catalogue()
+    assert result["deleted_projects"] == 1
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步数据库层测试
+"""
+
+import asyncio
+
+from sqlalchemy import inspect, text
+
+from mcp_search_server.models.database import create_db_engine, init_db
+
+from .helpers import make_project, seed
+
+
+async def test_sqlite_urls_use_the_async_driver(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+    try:
+        assert engine.url.drivername == "sqlite+aiosqlite"
+        await init_db(engine)
+        async with engine.connect() as conn:
+            tables = await conn.run_sync(lambda sync: set(inspect(sync).get_table_names()))
+        assert {"projects", "categories", "tags", "project_category", "project_tag"} <= tables
+    finally:
+        await engine.dispose()
+
+
+async def test_init_db_adds_columns_missing_from_older_databases(tmp_path):
+    engine = create_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "CREATE TABLE projects (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+                "description VARCHAR(1000), repo_url VARCHAR(200) NOT NULL UNIQUE, readme_content VARCHAR(10000))"
+            )
+        await init_db(engine)
+        async with engine.connect() as conn:
+            columns = {row[1] for row in await conn.execute(text("PRAGMA table_info(projects)"))}
+        assert {"stars", "source", "readme_outline", "last_crawled_at"} <= columns
+    finally:
+        await engine.dispose()
+
+
+async def test_setup_is_lazy_and_idempotent(make_server):
+    server = make_server()
+    assert not server._db_ready
+    await asyncio.gather(server.setup(), server.setup())
+    assert server._db_ready
+    await server.setup()
+
+
+async def test_concurrent_tool_calls_and_writes(make_server):
+    server = make_server(search={"store": False})
+    await seed(server, [make_project(index) for index in range(1, 21)])
+
+    async def write():
+        await seed(server, [make_project(index) for index in range(21, 31)])
+
+    results = await asyncio.gather(*[server._search("mcp", size=5, fuzzy=False) for _ in range(8)], write())
+    assert all(result["total"] in (20, 30) for result in results[:-1])
+    assert (await server._search("mcp", fuzzy=False))["total"] == 30
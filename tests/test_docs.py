@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+项目文档分块读取和导出测试
+"""
+
+import json
+
+import pytest
+from sqlalchemy import update
+
+from mcp_search_server.models.database import Project
+from mcp_search_server.services.docs import (
+    MAX_CHUNK_BYTES, MIN_CHUNK_BYTES, clamp_chunk_size, decode_chunk, find_section, outline
+)
+from mcp_search_server.utils.query_counter import count_queries
+
+from .helpers import make_project, seed
+
+README = (
+    "Intro line\n"
+    "# Title\n"
+    "概述：中文内容。\n"
+    "## Install\n"
+    "```bash\n"
+    "# not a heading\n"
+    "pip install demo\n"
+    "```\n"
+    "## Usage\n"
+    + "用法说明。" * 200 + "\n"
+    "### Usage\n"
+    "details\n"
+    "# Appendix\n"
+    "end\n"
+)
+
+
+def test_outline_sections_cover_subsections_and_skip_fences():
+    sections = outline(README)
+    assert [(item["level"], item["title"], item["anchor"]) for item in sections] == [
+        (0, "", ""), (1, "Title", "title"), (2, "Install", "install"),
+        (2, "Usage", "usage"), (3, "Usage", "usage-1"), (1, "Appendix", "appendix"),
+    ]
+    data = README.encode("utf-8")
+    title, appendix = sections[1], sections[5]
+    assert title["end"] == appendix["start"]
+    assert data[appendix["start"]:appendix["end"]].decode() == "# Appendix\nend\n"
+    assert all(item["bytes"] == item["end"] - item["start"] for item in sections)
+    assert outline("") == []
+
+
+def test_find_section_by_anchor_title_and_index():
+    sections = outline(README)
+    assert find_section(sections, "#usage-1")["level"] == 3
+    assert find_section(sections, "INSTALL")["index"] == 2
+    assert find_section(sections, "5")["title"] == "Appendix"
+    assert find_section(sections, "missing") is None
+    assert find_section(sections, "99") is None
+
+
+def test_clamp_chunk_size():
+    assert clamp_chunk_size(1) == MIN_CHUNK_BYTES
+    assert clamp_chunk_size(10 ** 9) == MAX_CHUNK_BYTES
+    assert clamp_chunk_size(1000) == 1000
+
+
+def test_decode_chunk_trims_split_characters():
+    data = "a中b".encode("utf-8")
+    assert decode_chunk(data[:2], at_end=False) == ("a", 0, 1)
+    assert decode_chunk(data[2:], at_start=False) == ("b", 2, 3)
+    assert decode_chunk(data) == ("a中b", 0, len(data))
+
+
+@pytest.fixture
+async def docs_server(make_server):
+    server = make_server(docs={"max_chunk_bytes": 512})
+    await seed(server, [make_project(1, name="demo", readme_content=README), make_project(2)])
+    return server
+
+
+async def test_chunks_reassemble_the_readme(docs_server):
+    first = await docs_server.get_project_docs("demo", length=300)
+    assert first["size"] == len(README.encode("utf-8"))
+    assert [item["title"] for item in first["sections"]][1:3] == ["Title", "Install"]
+    parts, offset = [first["content"]], first["next_offset"]
+    while offset is not None:
+        chunk = await docs_server.get_project_docs("demo", offset=offset, length=10 ** 6)
+        assert len(chunk["content"].encode("utf-8")) <= 512
+        assert chunk["offset"] == offset
+        parts.append(chunk["content"])
+        offset = chunk["next_offset"]
+    assert "".join(parts) == README
+
+
+async def test_section_read_and_errors(docs_server):
+    result = await docs_server.get_project_docs("https://github.com/owner/project-1", section="appendix")
+    assert result["content"] == "# Appendix\nend\n"
+    assert result["section"]["title"] == "Appendix"
+    assert result["next_offset"] is None
+    with pytest.raises(ValueError):
+        await docs_server.get_project_docs("missing")
+    with pytest.raises(ValueError):
+        await docs_server.get_project_docs("demo", section="missing")
+    with pytest.raises(ValueError):
+        await docs_server.get_project_docs("demo", offset=-1)
+
+
+async def test_docs_never_select_the_whole_readme(docs_server):
+    with count_queries(docs_server.read_engine) as counter:
+        await docs_server.get_project_docs("demo", section="usage")
+        await docs_server.get_project_docs("demo", offset=600)
+    readme_reads = [statement for statement in counter.statements if "readme_content" in statement]
+    assert readme_reads
+    assert all("substr" in statement.lower() or "length" in statement.lower() for statement in readme_reads)
+
+
+async def test_outline_follows_readme_updates_and_is_backfilled(docs_server):
+    await seed(docs_server, [make_project(1, name="demo", readme_content="# Only\ntext\n")])
+    result = await docs_server.get_project_docs("demo")
+    assert [item["title"] for item in result["sections"]] == ["Only"]
+
+    async with docs_server._session() as session:
+        await session.execute(update(Project).values(readme_outline=None))
+        await session.commit()
+        assert await docs_server._project_service(session).backfill_readme_outlines(batch_size=1) == 2
+    result = await docs_server.get_project_docs("demo")
+    assert [item["title"] for item in result["sections"]] == ["Only"]
+
+
+async def test_export_pages_and_stream(make_server):
+    server = make_server()
+    await seed(server, [make_project(index) for index in range(1, 6)])
+    ids, cursor = [], None
+    while True:
+        page = await server.export_page(cursor=cursor, limit=2)
+        ids += [json.loads(line)["id"] for line in page["data"].splitlines()]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == [1, 2, 3, 4, 5]
+    with pytest.raises(ValueError):
+        await server.export_page(cursor="bogus")
+
+    lines = "".join([chunk async for chunk in server.iter_export(include_readme=True, batch_size=2)]).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3, 4, 5]
+    assert "An MCP server" in json.loads(lines[0])["readme_content"]
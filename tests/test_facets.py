@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分面过滤表达式测试
+"""
+
+import pytest
+
+from mcp_search_server.services.facets import FilterError, combine_filters, label_filter, parse_filter
+
+from .helpers import make_project, seed
+
+DB = ("term", "category", "database")
+PY = ("term", "tag", "python")
+GO = ("term", "tag", "go")
+
+
+def test_adjacent_terms_are_anded_and_or_binds_loosest():
+    assert parse_filter("category:database tag:python") == ("and", (DB, PY))
+    assert parse_filter("category:database AND tag:python OR tag:go") == ("or", (("and", (DB, PY)), GO))
+    assert parse_filter("category:database (tag:python OR tag:go)") == ("and", (DB, ("or", (PY, GO))))
+
+
+def test_negation_and_quoted_values():
+    assert parse_filter("-language:java") == ("not", ("term", "language", "java"))
+    assert parse_filter('NOT category:"Web Search"') == ("not", ("term", "category", "Web Search"))
+    assert parse_filter("Category:database") == DB
+
+
+@pytest.mark.parametrize("expression, bounds", [
+    ("stars:100..500", (100, 500)),
+    ("stars:100..", (100, None)),
+    ("stars:..500", (None, 500)),
+    ("stars:>=100", (100, None)),
+    ("stars:>100", (101, None)),
+    ("stars:<=500", (None, 500)),
+    ("stars:<500", (None, 499)),
+    ("stars:42", (42, 42)),
+])
+def test_star_ranges(expression, bounds):
+    assert parse_filter(expression) == ("range", "stars", *bounds)
+
+
+@pytest.mark.parametrize("expression", [
+    "owner:me", "stars:..", "stars:abc", "category:database OR", "(tag:python", "tag:python)", "python", "AND",
+])
+def test_invalid_expressions_raise(expression):
+    with pytest.raises(FilterError):
+        parse_filter(expression)
+
+
+def test_empty_expression_and_label_helpers():
+    assert parse_filter(None) is None and parse_filter("   ") is None
+    assert label_filter() is None
+    assert label_filter("database", ["python"]) == ("and", (DB, PY))
+    assert combine_filters(None, DB, None) == DB
+    assert combine_filters(DB, PY) == ("and", (DB, PY))
+
+
+@pytest.mark.parametrize("store", [False, True])
+async def test_filters_and_facet_counts_agree_across_backends(make_server, store):
+    server = make_server(search={"min_score": 0.0, "store": store})
+    await seed(server, [
+        make_project(1, categories=["database"], tags=["python"], language="Python", stars=10),
+        make_project(2, categories=["database"], tags=["go"], language="Go", stars=200),
+        make_project(3, categories=["browser"], tags=["python"], language="Python", stars=300),
+        make_project(4, categories=["browser"], tags=["java"], language="", stars=5),
+    ])
+    results = await server._search(
+        "", filters="(tag:python OR tag:go) -language:go stars:>=10", facets=True, fuzzy=False
+    )
+    assert sorted(item["name"] for item in results["items"]) == ["project-1", "project-3"]
+    assert {entry["value"]: entry["count"] for entry in results["facets"]["category"]} == {"database": 1, "browser": 1}
+    assert {entry["value"]: entry["count"] for entry in results["facets"]["tag"]} == {"python": 2}
+
+    results = await server._search("", filters="-language:python", fuzzy=False)
+    assert sorted(item["name"] for item in results["items"]) == ["project-2", "project-4"]
+    with pytest.raises(ValueError):
+        await server._search("", filters="owner:me")
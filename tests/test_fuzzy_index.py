@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+三元组模糊匹配测试
+"""
+
+import pytest
+
+from mcp_search_server.services.fuzzy_index import FuzzyIndex, edit_distance, max_edits
+
+from .helpers import make_project, seed
+
+ENTRIES = [
+    ("postgres-mcp", ["database"], ["postgres", "sql"], 500),
+    ("postgrest-bridge", ["database"], ["postgrest"], 20),
+    ("weather-server", ["weather"], ["forecast"], 50),
+    ("playwright-browser", ["browser automation"], ["playwright"], 300),
+    ("pg-tools", ["database"], ["postgres"], 5),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FuzzyIndex.build(ENTRIES)
+
+
+def test_allowed_edits_grow_with_word_length():
+    assert [max_edits(length) for length in (3, 4, 7, 8)] == [0, 1, 1, 2]
+
+
+def test_edit_distance_counts_transpositions_and_stops_at_the_limit():
+    assert edit_distance("postgres", "postgres", 2) == 0
+    assert edit_distance("postgers", "postgres", 2) == 1
+    assert edit_distance("weathr", "weather", 1) == 1
+    assert edit_distance("postgres", "playwright", 2) == 3
+    assert edit_distance("a", "abcdef", 2) == 3
+
+
+def test_correct_word(index):
+    assert index.correct_word("postgers") == "postgres"
+    assert index.correct_word("weathr") == "weather"
+    # 距离相同时选择出现项目更多的词
+    assert index.correct_word("postgrex") == "postgres"
+    assert index.correct_word("postgres") is None
+    assert index.correct_word("sqll") == "sql"
+    assert index.correct_word("sq") is None
+    assert index.correct_word("zzzzzzzz") is None
+
+
+def test_correct_query_keeps_phrases_prefixes_and_known_words(index):
+    assert index.correct_query("weathr forcast") == "weather forecast"
+    assert index.correct_query('"weathr forcast" postgers') == '"weathr forcast" postgres'
+    assert index.correct_query("weathr*") == "weathr*"
+    assert index.correct_query("post") == "post"
+    assert index.correct_query("weathr", known=lambda term: True) == "weathr"
+
+
+def test_suggest_orders_by_weight_and_filters_kinds(index):
+    assert [item["text"] for item in index.suggest("post", kinds=["project"])] == ["postgres-mcp", "postgrest-bridge"]
+    tags = index.suggest("post", kinds=["tag"])
+    assert tags[0] == {"text": "postgres", "type": "tag", "weight": 2}
+    assert [item["text"] for item in index.suggest("auto")] == ["browser automation"]
+    assert index.suggest("   ") == []
+
+
+def test_suggest_falls_back_to_a_corrected_prefix(index):
+    assert [item["text"] for item in index.suggest("playwrigth", kinds=["project"])] == ["playwright-browser"]
+
+
+async def test_misspelled_query_is_corrected_and_reported(make_server):
+    server = make_server(search={"min_score": 0.0})
+    await seed(server, [
+        make_project(1, name="weather-server", description="Forecasts"),
+        make_project(2, name="postgres-mcp", description="SQL"),
+    ])
+    results = await server._search("weathr", fuzzy=True)
+    assert results["corrected_query"] == "weather"
+    assert [item["name"] for item in results["items"]] == ["weather-server"]
+    assert "corrected_query" not in await server._search("weather", fuzzy=True)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GitHub爬虫的并发、限流和失败处理测试
+"""
+
+from datetime import datetime
+
+from mcp_search_server.utils.github_crawler import GitHubCrawler, repo_changed_since
+
+
+def crawler_for(api, **options) -> GitHubCrawler:
+    return GitHubCrawler("test", api_base_url=api.url, **options)
+
+
+def search_item(api, full_name: str) -> dict:
+    return {key: value for key, value in api.repos[full_name].items() if key != "readme"}
+
+
+async def test_crawl_repos_respects_concurrency(github_api):
+    for index in range(12):
+        github_api.add_repo(f"owner/repo-{index}")
+    github_api.delay = 0.02
+    async with crawler_for(github_api, concurrency=3) as crawler:
+        items = await crawler.search_all_repos("topic:mcp")
+        details = await crawler.crawl_repos(items)
+    assert len(details) == 12
+    assert github_api.max_in_flight <= 3
+    assert {detail["item"]["full_name"] for detail in details} == set(github_api.repos)
+    assert details[0]["readme"] == "# Readme\n"
+    assert details[0]["stats"]["stars"] == 10
+
+
+async def test_non_200_responses_count_as_failures(github_api):
+    for name in ("ok", "missing-readme", "broken", "forbidden", "readme-error"):
+        github_api.add_repo(f"owner/{name}", readme=None if name == "missing-readme" else "# Readme\n")
+    github_api.fail("/repos/owner/broken", 500)
+    github_api.fail("/repos/owner/forbidden", 403)
+    github_api.fail("/repos/owner/readme-error/readme", 502)
+    done = []
+    async with crawler_for(github_api) as crawler:
+        details = await crawler.crawl_repos(
+            [search_item(github_api, name) for name in github_api.repos],
+            progress=lambda completed, total: done.append((completed, total))
+        )
+    # 没有README（404）不是失败
+    assert sorted(detail["item"]["name"] for detail in details) == ["missing-readme", "ok"]
+    assert next(detail for detail in details if detail["item"]["name"] == "missing-readme")["readme"] == ""
+    assert done[-1] == (5, 5)
+
+
+async def test_rate_limited_response_is_retried_then_fails(github_api):
+    github_api.add_repo("owner/limited")
+    github_api.fail("/repos/owner/limited", 429, {"Retry-After": "0"})
+    async with crawler_for(github_api, max_retries=2) as crawler:
+        details = await crawler.crawl_repos([search_item(github_api, "owner/limited")])
+    assert details == []
+    assert github_api.count("/repos/owner/limited", 429) == 3
+
+
+async def test_search_all_repos_reads_every_page(github_api):
+    for index in range(5):
+        github_api.add_repo(f"owner/repo-{index}")
+    async with crawler_for(github_api) as crawler:
+        items = await crawler.search_all_repos("topic:mcp", per_page=2)
+    # 替身不分页，每页返回全部结果，去重后仍为5个
+    assert len(items) == 5
+    assert github_api.count("/search/repositories") == 3
+
+
+def test_repo_changed_since():
+    crawled = datetime(2024, 1, 1, 12)
+    assert repo_changed_since({"pushed_at": "2024-01-02T00:00:00Z"}, crawled)
+    assert not repo_changed_since({"pushed_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T06:00:00Z"}, crawled)
+    assert repo_changed_since({}, crawled)
+    assert repo_changed_since({"pushed_at": "2020-01-01T00:00:00Z"}, None)
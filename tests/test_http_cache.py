@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP磁盘缓存和条件请求测试
+"""
+
+import threading
+
+from mcp_search_server.utils.github_crawler import GitHubCrawler
+from mcp_search_server.utils.http_cache import HTTPCache
+
+
+def test_key_ignores_parameter_order():
+    assert HTTPCache.make_key("https://x/search", {"q": "mcp", "page": 1}) == \
+        HTTPCache.make_key("https://x/search", {"page": 1, "q": "mcp"})
+    assert HTTPCache.make_key("https://x/search", {"page": 1}) != HTTPCache.make_key("https://x/search", {"page": 2})
+
+
+def test_entries_persist(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    cache.put("key", {"a": 1}, etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    entry = HTTPCache(str(tmp_path)).get("key")
+    assert (entry["body"], entry["etag"], entry["last_modified"]) == ({"a": 1}, '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+    assert cache.get("missing") is None
+
+
+def test_corrupt_entries_are_discarded(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    cache.put("key", {"a": 1})
+    (tmp_path / "key.json").write_text("{not json", encoding="utf-8")
+    assert cache.get("key") is None
+    assert not (tmp_path / "key.json").exists()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    probe = HTTPCache(str(tmp_path / "probe"))
+    probe.put("a", "x" * 60)
+    entry_size = (tmp_path / "probe" / "a.json").stat().st_size
+    cache = HTTPCache(str(tmp_path / "cache"), max_bytes=3 * entry_size + 16)
+    for key in ("a", "b", "c"):
+        cache.put(key, "x" * 60)
+    cache.get("a")
+    cache.put("d", "x" * 60)
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+    cache.clear()
+    assert list((tmp_path / "cache").glob("*.json")) == []
+
+
+async def test_cached_entries_are_revalidated_with_etags(github_api, tmp_path):
+    github_api.add_repo("owner/repo")
+    cache = HTTPCache(str(tmp_path))
+    async with GitHubCrawler("test", api_base_url=github_api.url, cache=cache) as crawler:
+        first = await crawler.get_repo_info("owner", "repo")
+        second = await crawler.get_repo_info("owner", "repo")
+    assert second == first
+    assert github_api.count("/repos/owner/repo", 200) == 1
+    assert github_api.count("/repos/owner/repo", 304) == 1
+
+    # 刚写入的条目也要重新验证，仓库的变化立即可见
+    github_api.repos["owner/repo"]["stargazers_count"] = 99
+    async with GitHubCrawler("test", api_base_url=github_api.url, cache=cache) as crawler:
+        assert (await crawler.get_repo_info("owner", "repo"))["stargazers_count"] == 99
+    assert github_api.count("/repos/owner/repo", 200) == 2
+
+
+async def test_errors_are_not_cached(github_api, tmp_path):
+    github_api.add_repo("owner/repo")
+    github_api.fail("/repos/owner/broken", 500)
+    async with GitHubCrawler("test", api_base_url=github_api.url, cache=HTTPCache(str(tmp_path))) as crawler:
+        for _ in range(2):
+            assert await crawler._get_json(f"{github_api.url}/repos/owner/broken") == (500, None)
+    assert github_api.count("/repos/owner/broken") == 2
+
+
+async def test_cache_files_are_accessed_off_the_event_loop(github_api, tmp_path, monkeypatch):
+    github_api.add_repo("owner/repo")
+    threads = []
+    for name in ("get", "put", "touch"):
+        original = getattr(HTTPCache, name)
+
+        def record(self, *args, _original=original, **kwargs):
+            threads.append(threading.current_thread())
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(HTTPCache, name, record)
+    async with GitHubCrawler("test", api_base_url=github_api.url, cache=HTTPCache(str(tmp_path))) as crawler:
+        await crawler.get_repo_info("owner", "repo")
+        await crawler.get_repo_info("owner", "repo")
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+后台任务测试
+"""
+
+import asyncio
+
+from mcp_search_server.services.jobs import JobManager
+
+from .helpers import make_project, seed
+
+
+def recorder(log, name, delay=0.01, result=None, error=None):
+    async def run(job):
+        log.append(("start", name))
+        job.report("working", 1, 2)
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        if error:
+            raise RuntimeError(error)
+        return result or {"status": "success", "name": name}
+    return run
+
+
+async def test_jobs_run_one_at_a_time_in_submission_order():
+    manager, log = JobManager(), []
+    first, _ = manager.submit("refresh", recorder(log, "a"), force=False)
+    second, _ = manager.submit("ingest", recorder(log, "b"))
+    assert first.status == "queued"
+    await second.wait()
+    assert log == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+    assert (first.status, first.result["name"]) == ("succeeded", "a")
+    assert first.to_dict()["progress"] == {"stage": "working", "done": 1, "total": 2}
+    assert [job.id for job in manager.jobs()] == [second.id, first.id]
+    await manager.stop()
+
+
+async def test_identical_active_jobs_are_merged():
+    manager, log = JobManager(), []
+    first, merged = manager.submit("refresh", recorder(log, "a"), force=False)
+    again, merged_again = manager.submit("refresh", recorder(log, "b"), force=False)
+    other, merged_other = manager.submit("refresh", recorder(log, "c"), force=True)
+    assert (merged, merged_again, merged_other) == (False, True, False)
+    assert again is first and other is not first
+    await other.wait()
+    later, merged_later = manager.submit("refresh", recorder(log, "d"), force=False)
+    assert not merged_later and later is not first
+    await later.wait()
+    assert [name for event, name in log if event == "start"] == ["a", "c", "d"]
+    await manager.stop()
+
+
+async def test_failures_are_recorded():
+    manager = JobManager()
+    raised, _ = manager.submit("a", recorder([], "a", error="boom"))
+    reported, _ = manager.submit("b", recorder([], "b", result={"status": "error", "message": "bad token"}))
+    await reported.wait()
+    assert (raised.status, raised.error) == ("failed", "boom")
+    assert (reported.status, reported.error) == ("failed", "bad token")
+    await manager.stop()
+
+
+async def test_finished_jobs_are_evicted_and_stop_cancels_queued_jobs():
+    manager = JobManager(max_finished=2)
+    jobs = [manager.submit("job", recorder([], str(index), delay=0), index=index)[0] for index in range(4)]
+    await jobs[-1].wait()
+    assert manager.get(jobs[0].id) is None and manager.get(jobs[3].id) is jobs[3]
+
+    slow, _ = manager.submit("slow", recorder([], "slow", delay=10))
+    queued, _ = manager.submit("queued", recorder([], "queued"))
+    await asyncio.sleep(0.01)
+    await manager.stop()
+    assert (slow.status, slow.error) == ("failed", "cancelled")
+    assert (queued.status, queued.error) == ("failed", "cancelled")
+
+
+async def test_scheduled_jobs_merge_while_running():
+    manager, log = JobManager(), []
+    manager.schedule("refresh", recorder(log, "tick", delay=0.05), interval=0.01)
+    await asyncio.sleep(0.12)
+    await manager.stop()
+    starts = sum(1 for event, _ in log if event == "start")
+    # 每次执行约50ms，间隔10ms的提交在执行期间被合并
+    assert 1 <= starts <= 3
+    assert len(manager.jobs(limit=100)) == starts
+
+
+async def test_refresh_runs_in_the_background_while_search_keeps_working(make_server, github_api):
+    github_api.add_repo("owner/alpha", stargazers_count=50)
+    github_api.delay = 0.05
+    server = make_server(github={"api_base_url": github_api.url}, search={"min_score": 0.0})
+    await seed(server, [make_project(1)])
+
+    submitted = server.submit_job("refresh_projects", force=False)
+    assert (submitted["status"], submitted["deduplicated"]) == ("queued", False)
+    assert server.submit_job("refresh_projects", force=False)["deduplicated"]
+    # 刷新期间搜索使用现有数据
+    assert (await server._search("mcp", fuzzy=False))["total"] == 1
+    job = await server.jobs.get(submitted["job_id"]).wait()
+    assert job.status == "succeeded", job.error
+    assert (await server._search("alpha", fuzzy=False))["total"] == 1
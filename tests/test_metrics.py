@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+指标和延迟统计测试
+"""
+
+import inspect
+import json
+
+import pytest
+
+from mcp_search_server.utils.metrics import MetricsRegistry
+
+from .helpers import make_project, seed
+
+
+def test_counters_gauges_and_label_checks():
+    registry = MetricsRegistry(prefix="test")
+    calls = registry.counter("calls_total", "Calls", ("status",))
+    calls.inc("ok")
+    calls.inc("ok", amount=2)
+    assert calls.value("ok") == 3 and calls.value("error") == 0
+    with pytest.raises(ValueError):
+        calls.inc()
+    gauge = registry.gauge("in_flight", "In flight")
+    gauge.inc()
+    gauge.dec()
+    assert gauge.value() == 0
+    assert registry.counter("calls_total", "Calls", ("status",)) is calls
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls", ("status",))
+
+
+def test_histogram_quantiles_are_interpolated_within_buckets():
+    histogram = MetricsRegistry().histogram("latency_seconds", "Latency", buckets=(0.1, 0.2, 0.4))
+    assert histogram.quantile(0.5) is None
+    for value in (0.15, 0.15, 0.15, 0.3):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(0.1 + 0.1 * 2 / 3)
+    assert histogram.quantile(1.0) == pytest.approx(0.3)
+    sample = histogram.snapshot()[0]
+    assert (sample["count"], sample["max_ms"]) == (4, 300.0)
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(prefix="test")
+    registry.counter("requests_total", "Requests", ("name",)).inc('say "hi"')
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1,)).observe(0.05)
+    registry.add_collector(lambda: [("cache_size", "Cache size", 7, {})])
+    text = registry.render_prometheus()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{name="say \\"hi\\""} 1' in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "# TYPE test_cache_size gauge\ntest_cache_size 7" in text
+    assert registry.snapshot()["test_cache_size"] == [{"labels": {}, "value": 7}]
+
+
+async def test_instrument_records_status_and_keeps_the_signature():
+    registry = MetricsRegistry(prefix="test")
+
+    async def tool(query: str, limit: int = 10) -> str:
+        """文档"""
+        if query == "fail":
+            raise ValueError(query)
+        return query
+
+    wrapped = registry.instrument("tool", "tool", tool)
+    assert inspect.signature(wrapped) == inspect.signature(tool) and wrapped.__doc__ == "文档"
+    assert await wrapped("ok") == "ok"
+    with pytest.raises(ValueError):
+        await wrapped("fail")
+    calls = registry.counter("requests_total", "", ("kind", "name", "status"))
+    assert (calls.value("tool", "tool", "ok"), calls.value("tool", "tool", "error")) == (1, 1)
+    assert registry.gauge("requests_in_flight", "", ("kind", "name")).value("tool", "tool") == 0
+
+
+async def test_server_metrics_resource_reports_tool_and_database_activity(make_server):
+    server = make_server(search={"min_score": 0.0, "store": False})
+    await seed(server, [make_project(index) for index in range(1, 4)])
+    await server.mcp.call_tool("search_projects", {"query": "mcp"})
+    await server.mcp.call_tool("search_projects", {"query": "mcp"})
+    contents = await server.mcp.read_resource("metrics://server")
+    snapshot = json.loads(list(contents)[0].content)
+
+    calls = {tuple(sample["labels"].values()): sample["value"] for sample in snapshot["mcp_search_requests_total"]}
+    assert calls[("tool", "search_projects", "ok")] == 2
+    selects = {sample["labels"]["operation"]: sample["value"] for sample in snapshot["mcp_search_db_statements_total"]}
+    assert selects["SELECT"] > 0
+    assert snapshot["mcp_search_result_cache_hits"][0]["value"] == 1
+    assert "mcp_search_request_duration_seconds" in snapshot
+
+
+async def test_metrics_can_be_disabled(make_server):
+    server = make_server(metrics={"enabled": False})
+    await server.mcp.call_tool("search_projects", {"query": "mcp"})
+    assert server.metrics.snapshot() == {}
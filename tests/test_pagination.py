@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+游标分页测试
+"""
+
+import pytest
+
+from mcp_search_server.utils.pagination import decode_cursor, encode_cursor
+
+from .helpers import make_project, seed
+
+
+def test_cursor_round_trip_is_opaque_and_url_safe():
+    cursor = encode_cursor("score", [0.125, 42])
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert decode_cursor(cursor, "score") == [0.125, 42]
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor("stars", [1])[:-2]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "stars")
+
+
+@pytest.mark.parametrize("keys", [["a", 1], [1, None], [1.5, 2], [True, 2], [1], [1, 2, 3], [{"x": 1}, 2]])
+def test_cursor_keys_with_wrong_types_are_rejected(keys):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("stars", keys), "stars")
+
+
+def test_cursor_from_another_order_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("stars", [1, 2]), "score")
+
+
+async def walk(server, query, size):
+    names, cursor = [], None
+    while True:
+        results = await server._search(query, size=size, cursor=cursor, fuzzy=False)
+        names += [item["name"] for item in results["items"]]
+        cursor = results["next_cursor"]
+        if cursor is None:
+            return names
+
+
+@pytest.mark.parametrize("store", [False, True])
+@pytest.mark.parametrize("query", ["", "mcp"])
+async def test_cursor_pages_match_one_large_page(make_server, store, query):
+    """相同star数的项目按id打破平局，逐页读取既不重复也不遗漏"""
+    server = make_server(search={"store": store})
+    await seed(server, [make_project(index, stars=index % 3) for index in range(1, 24)])
+    expected = [item["name"] for item in (await server._search(query, size=100, fuzzy=False))["items"]]
+    assert len(expected) == 23
+    assert await walk(server, query, size=4) == expected
+
+
+async def test_stale_cursor_for_other_order_raises(make_server):
+    server = make_server()
+    await seed(server, [make_project(index) for index in range(1, 6)])
+    cursor = (await server._search("", size=2, fuzzy=False))["next_cursor"]
+    with pytest.raises(ValueError):
+        await server._search("mcp", size=2, cursor=cursor, fuzzy=False)
+
+
+@pytest.mark.parametrize("store", [False, True])
+@pytest.mark.parametrize("query, order", [("", "stars"), ("mcp", "score")])
+async def test_forged_cursor_raises_value_error(make_server, store, query, order):
+    server = make_server(search={"store": store})
+    await seed(server, [make_project(index) for index in range(1, 6)])
+    with pytest.raises(ValueError):
+        await server._search(query, size=2, cursor=encode_cursor(order, ["x", "y"]), fuzzy=False)
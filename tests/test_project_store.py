@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+内存项目存储测试
+"""
+
+import pytest
+
+from mcp_search_server.services.project_store import ProjectStore, bits_from, iter_bits
+
+from .helpers import make_project, seed
+
+PROJECTS = [
+    make_project(1, name="weather-server", categories=["weather"], tags=["api"], language="Go", stars=40),
+    make_project(2, name="postgres-mcp", categories=["database"], tags=["sql", "api"], stars=300),
+    make_project(3, name="sqlite-mcp", categories=["database"], tags=["sql"], language="", stars=40),
+    make_project(4, name="browser", categories=["browser"], tags=[], language="TypeScript", stars=7),
+    make_project(5, name="notes", readme_content="Weather notes and SQL snippets", stars=0),
+]
+
+
+def test_bitmap_helpers_round_trip():
+    docs = [0, 3, 8, 63, 64, 200]
+    bits = bits_from(docs, 201)
+    assert list(iter_bits(bits)) == docs
+    assert bits.bit_count() == len(docs)
+    assert list(iter_bits(0)) == []
+
+
+def test_rare_labels_are_stored_sparsely():
+    records = [
+        {"id": doc + 1, "name": f"p{doc}", "repo_url": f"https://github.com/o/p{doc}",
+         "categories": ["common"] + (["rare"] if doc in (5, 70) else []), "tags": [], "stars": doc}
+        for doc in range(100)
+    ]
+    store = ProjectStore.from_records(records)
+    assert isinstance(store.category_sets["common"], int)
+    assert list(store.category_sets["rare"]) == [5, 70]
+    assert list(iter_bits(store.bits_for(category="rare"))) == [5, 70]
+    results = store.search("", filters="category:rare OR stars:<=2", facets=True, size=10)
+    assert results["total"] == 5
+    assert {entry["value"]: entry["count"] for entry in results["facets"]["category"]} == {"common": 5, "rare": 2}
+
+
+def test_records_are_slotted_and_exclude_readmes():
+    store = ProjectStore.from_records([{**project, "id": index} for index, project in enumerate(PROJECTS, 1)])
+    record = store.records[0]
+    assert not hasattr(record, "__dict__")
+    assert not hasattr(record, "readme_content")
+    assert list(store.stars) == [40, 300, 40, 7, 0]
+    # 浏览顺序：star数降序，相同时id降序
+    assert [store.ids[doc] for doc in store.order_by_stars] == [2, 3, 1, 4, 5]
+
+
+@pytest.fixture
+async def servers(make_server):
+    database = make_server(search={"store": False, "min_score": 0.0})
+    await seed(database, PROJECTS)
+    store = make_server(search={"store": True, "min_score": 0.0})
+    await store.setup()
+    assert store.store is not None and store.store.size == len(PROJECTS)
+    return database, store
+
+
+@pytest.mark.parametrize("filters", [
+    None, "stars:40", "stars:>=10 -tag:api", "category:database OR language:go", "-language:go", "tag:sql tag:api",
+])
+async def test_browse_matches_the_database(servers, filters):
+    database, store = servers
+    expected = await database._search("", size=50, filters=filters, facets=True, fuzzy=False)
+    actual = await store._search("", size=50, filters=filters, facets=True, fuzzy=False)
+    assert actual["total"] == expected["total"]
+    assert actual["items"] == expected["items"]
+    for field, entries in expected["facets"].items():
+        counts = {entry["value"]: entry["count"] for entry in actual["facets"][field]}
+        assert counts == {entry["value"]: entry["count"] for entry in entries}
+
+
+@pytest.mark.parametrize("query", ["weather", "sql", "mcp", "browser"])
+async def test_keyword_search_matches_the_database(servers, query):
+    database, store = servers
+    expected = await database._search(query, size=50, fuzzy=False)
+    actual = await store._search(query, size=50, fuzzy=False)
+    assert actual["total"] == expected["total"]
+    assert {item["name"] for item in actual["items"]} == {item["name"] for item in expected["items"]}
+    assert actual["items"][0]["name"] == expected["items"][0]["name"]
+
+
+async def test_store_is_rebuilt_after_writes(servers):
+    _, store = servers
+    await seed(store, [make_project(6, name="forecast-mcp", description="weather forecasts", stars=1000)])
+    results = await store._search("", size=1, fuzzy=False)
+    assert results["items"][0]["name"] == "forecast-mcp"
+    assert store.store.size == len(PROJECTS) + 1
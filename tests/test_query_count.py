@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索分页的SQL语句数测试：每页的语句数固定，不随页大小增长（没有N+1查询）
+"""
+
+import pytest
+
+from mcp_search_server.utils.query_counter import count_queries
+
+from .helpers import make_project, seed
+
+
+@pytest.fixture
+async def server(make_server):
+    server = make_server(search={"store": False, "min_score": 0.0}, cache={"max_size": 0})
+    await seed(server, [
+        make_project(index, categories=[f"category-{index % 3}"], tags=[f"tag-{index % 4}", "mcp"])
+        for index in range(1, 61)
+    ])
+    return server
+
+
+async def statements(server, **search) -> int:
+    with count_queries(server.read_engine) as counter:
+        results = await server._search(fuzzy=False, **search)
+    assert results["items"] and all(item["categories"] and item["tags"] for item in results["items"])
+    return counter.count
+
+
+@pytest.mark.parametrize("query", ["", "mcp"])
+async def test_page_statements_do_not_grow_with_page_size(server, query):
+    small = await statements(server, query=query, size=5)
+    large = await statements(server, query=query, size=50)
+    assert small == large
+    # 只读会话的BEGIN、总数、当前页，以及分类和标签的两次批量预加载
+    assert large == 5
+
+
+async def test_cursor_pages_run_the_same_statements(server):
+    first = await server._search("mcp", size=10, fuzzy=False)
+    with count_queries(server.read_engine) as counter:
+        second = await server._search("mcp", size=10, cursor=first["next_cursor"], fuzzy=False)
+    assert counter.count == 5
+    assert not {item["id"] for item in first["items"]} & {item["id"] for item in second["items"]}
+
+
+async def test_count_mode_none_skips_the_total(make_server):
+    server = make_server(search={"store": False, "count_mode": "none"})
+    await seed(server, [make_project(index) for index in range(1, 21)])
+    with count_queries(server.read_engine) as counter:
+        results = await server._search("", size=10, fuzzy=False)
+    assert results["total"] is None
+    assert counter.count == 4
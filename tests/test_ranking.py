@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+排序规则与关键词搜索得分的测试
+"""
+
+import pytest
+
+from mcp_search_server.services.ranking import (
+    POPULARITY_WEIGHT, RELEVANCE_WEIGHT, blend_score, normalize_relevance, popularity_prior,
+    reciprocal_rank_fusion
+)
+
+from .helpers import make_project, seed
+
+
+def test_popularity_prior_is_bounded_and_monotonic():
+    assert popularity_prior(0, 0) == 0.0
+    assert popularity_prior(None, None) == 0.0
+    assert 0 < popularity_prior(10, 0) < popularity_prior(100, 0) < 1.0
+    assert popularity_prior(10 ** 6, 10 ** 5) == 1.0
+
+
+def test_relevance_is_relative_to_the_best_match():
+    assert normalize_relevance(2.0, 4.0) == 0.5
+    assert normalize_relevance(1e-9, 1e-9) == 1.0
+    assert normalize_relevance(0.0, 0.0) == 1.0
+    # 最佳匹配的得分不低于相关度权重，与原始BM25的量纲无关
+    assert blend_score(normalize_relevance(1e-6, 1e-6), 0.0) == pytest.approx(RELEVANCE_WEIGHT)
+    assert blend_score(1.0, 1.0) == pytest.approx(RELEVANCE_WEIGHT + POPULARITY_WEIGHT)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [2, 1, 4]])
+    assert [project_id for project_id, _ in fused][:2] == [2, 1]
+    assert {project_id for project_id, _ in fused} == {1, 2, 3, 4}
+
+
+@pytest.mark.parametrize("path", ["database", "store", "snapshot"])
+async def test_common_term_passes_min_score(make_server, tmp_path, path):
+    """几乎每个项目都包含的词IDF接近0，按相对相关度打分后仍应返回结果"""
+    overrides = {"search": {"min_score": 0.5, "store": path != "database"}}
+    if path == "snapshot":
+        overrides["snapshot"] = {"path": str(tmp_path / "search.snapshot")}
+    server = make_server(**overrides)
+    await seed(server, [make_project(index) for index in range(1, 31)])
+    if path == "snapshot":
+        await server.build_snapshot()
+        await server._load_store()
+        assert server._store_snapshot is not None
+
+    results = await server._search("mcp", size=50, fuzzy=False)
+    assert results["total"] == 30
+    assert len(results["items"]) == 30
+    assert results["items"][0]["score"] >= RELEVANCE_WEIGHT - 1e-6
+
+
+@pytest.mark.parametrize("store", [False, True])
+async def test_name_match_ranks_above_readme_match(make_server, store):
+    server = make_server(search={"min_score": 0.0, "store": store})
+    await seed(server, [
+        make_project(1, name="weather-server", description="Forecasts"),
+        make_project(2, readme_content="# project-2\n\nAlso reports the weather.\n"),
+    ])
+    results = await server._search("weather", fuzzy=False)
+    assert [item["name"] for item in results["items"]] == ["weather-server", "project-2"]
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQLite读写分离和快照隔离测试
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from mcp_search_server.models.database import Project, is_file_sqlite, sqlite_pragmas
+
+from .helpers import make_project, seed
+
+
+def test_pragmas_for_writer_and_reader_connections():
+    writer = sqlite_pragmas({"cache_size_mb": 8})
+    reader = sqlite_pragmas(read_only=True)
+    assert writer[0] == "PRAGMA journal_mode = wal"
+    assert "PRAGMA cache_size = -8192" in writer and "PRAGMA synchronous = normal" in writer
+    assert "PRAGMA query_only = ON" in reader
+    assert not any("journal_mode" in pragma or "synchronous" in pragma for pragma in reader)
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite+aiosqlite:///data/x.db", True),
+    ("sqlite:///:memory:", False),
+    ("sqlite+aiosqlite://", False),
+    ("postgresql+asyncpg://user@host/db", False),
+])
+def test_is_file_sqlite(url, expected):
+    assert is_file_sqlite(url) is expected
+
+
+async def count_projects(session):
+    return await session.scalar(select(func.count()).select_from(Project))
+
+
+async def test_file_sqlite_uses_a_read_only_wal_pool(make_server):
+    server = make_server()
+    await server.setup()
+    assert server.read_engine is not server.engine
+    async with server._read_session() as session:
+        assert (await session.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        with pytest.raises(OperationalError):
+            await session.execute(insert(Project).values(name="x", repo_url="x"))
+
+
+async def test_memory_database_shares_one_engine(make_server):
+    server = make_server(database={"url": "sqlite+aiosqlite:///:memory:"})
+    assert server.read_engine is server.engine
+
+
+async def test_read_session_sees_one_snapshot(make_server):
+    server = make_server()
+    await seed(server, [make_project(1)])
+    async with server._read_session() as reader:
+        assert await count_projects(reader) == 1
+        await seed(server, [make_project(2)])
+        # 同一只读会话内看到开始时的快照
+        assert await count_projects(reader) == 1
+    async with server._read_session() as reader:
+        assert await count_projects(reader) == 2
+
+
+async def test_open_write_transaction_does_not_block_reads(make_server):
+    server = make_server()
+    await seed(server, [make_project(1)])
+    async with server._session() as writer:
+        await writer.execute(insert(Project).values(name="pending", repo_url="https://github.com/o/pending"))
+        # 写事务未提交时，读取不等待写锁，也看不到未提交的行
+        async with server._read_session() as reader:
+            assert await asyncio.wait_for(count_projects(reader), timeout=1) == 1
+        await writer.rollback()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+README解析测试
+"""
+
+import asyncio
+
+from mcp_search_server.utils import readme_parser
+from mcp_search_server.utils.readme_parser import parse_readme, parse_readmes
+
+README = """<p align="center"><img src="logo.png" alt="logo"></p>
+
+# Weather MCP
+
+[![PyPI](https://img.shields.io/pypi/v/weather-mcp)](https://pypi.org/project/weather-mcp)
+[![License](https://img.shields.io/badge/license-MIT-blue)](LICENSE)
+
+Short tagline.
+
+A Model Context Protocol server that exposes forecasts and alerts from the
+[National Weather Service](https://www.weather.gov) API.
+
+## Table of contents
+
+- [Installation](#installation)
+- [License](#license)
+
+## Installation
+
+```bash
+pip install weather-mcp
+$ uvx weather-mcp --help
+```
+
+```python
+# Not a heading
+import weather_mcp
+```
+
+Configuration
+-------------
+
+See <https://github.com/example/weather-mcp/wiki>.
+
+## License
+
+MIT
+"""
+
+
+def test_extracts_title_description_and_headings():
+    parsed = parse_readme(README)
+    assert parsed["title"] == "Weather MCP"
+    assert parsed["description"].startswith("A Model Context Protocol server")
+    assert "National Weather Service API" in parsed["description"]
+    assert [(h["level"], h["text"]) for h in parsed["headings"]] == [
+        (1, "Weather MCP"), (2, "Table of contents"), (2, "Installation"), (2, "Configuration"), (2, "License")
+    ]
+
+
+def test_readme_headings_are_not_categories():
+    parsed = parse_readme(README)
+    assert (parsed["categories"], parsed["tags"]) == ([], [])
+
+
+def test_extracts_links_badges_and_install_commands():
+    parsed = parse_readme(README)
+    assert [badge["alt"] for badge in parsed["badges"]] == ["PyPI", "License"]
+    assert "https://www.weather.gov" in parsed["links"]
+    assert "#installation" not in parsed["links"]
+    assert parsed["related_links"] == ["https://github.com/example/weather-mcp/wiki"]
+    assert parsed["install_commands"] == ["pip install weather-mcp", "uvx weather-mcp --help"]
+
+
+def test_empty_and_html_only_readmes():
+    assert parse_readme("")["title"] == ""
+    parsed = parse_readme('<h1 align="center">Html Title</h1>\n\n<p>An HTML paragraph that is long enough to be a description.</p>\n')
+    assert parsed["title"] == "Html Title"
+    assert parsed["description"] == "An HTML paragraph that is long enough to be a description."
+
+
+def test_parse_readmes_keeps_input_order():
+    contents = [f"# Project {index}\n" for index in range(70)]
+    titles = [parsed["title"] for parsed in parse_readmes(contents, max_workers=2)]
+    assert titles == [f"Project {index}" for index in range(70)]
+
+
+async def test_parse_readmes_spawns_workers_from_a_thread(monkeypatch):
+    contexts = []
+
+    class RecordingExecutor(readme_parser.ProcessPoolExecutor):
+        def __init__(self, *args, mp_context=None, **kwargs):
+            contexts.append(mp_context.get_start_method())
+            super().__init__(*args, mp_context=mp_context, **kwargs)
+
+    monkeypatch.setattr(readme_parser, "ProcessPoolExecutor", RecordingExecutor)
+    contents = [f"# Project {index}\n" for index in range(70)]
+    parsed = await asyncio.to_thread(parse_readmes, contents, 2)
+    assert [item["title"] for item in parsed] == [f"Project {index}" for index in range(70)]
+    assert contexts == ["spawn"]
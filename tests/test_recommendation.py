@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+推荐快照测试
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from mcp_search_server.models.database import Project
+from mcp_search_server.services.recommendation import DAILY_PICK_SIZE, RecommendationScheduler
+from mcp_search_server.utils.query_counter import count_queries
+
+from .helpers import make_project, seed
+
+
+async def test_daily_recommendations_keep_the_search_result_fields(make_server):
+    server = make_server(recommendation={"min_stars": 0})
+    await seed(server, [make_project(index, categories=["database"], tags=["sql"]) for index in range(1, 4)])
+    snapshot = await server.recommendations.run_once()
+    project = snapshot.daily[0]
+    assert set(project) == {
+        "id", "name", "description", "repo_url", "stars", "forks", "language",
+        "categories", "tags", "created_at", "updated_at"
+    }
+    assert (project["categories"], project["tags"]) == (["database"], ["sql"])
+    assert "readme_content" not in project
+
+
+async def test_snapshot_does_not_load_readmes(make_server):
+    server = make_server(recommendation={"min_stars": 0})
+    await seed(server, [make_project(index) for index in range(1, 4)])
+    with count_queries(server.read_engine) as counter:
+        await server.recommendations.run_once()
+    selects = [statement for statement in counter.statements if statement.lstrip().upper().startswith("SELECT")]
+    assert selects
+    assert not any("readme_content" in statement for statement in selects)
+
+
+async def test_new_project_counts_and_daily_rotation(make_server):
+    server = make_server(recommendation={"min_stars": 0})
+    await seed(server, [make_project(index) for index in range(1, 13)])
+    now = datetime.utcnow()
+    async with server._session() as session:
+        await session.execute(
+            update(Project).where(Project.stars <= 4).values(created_at=now - timedelta(days=30))
+        )
+        await session.commit()
+
+    snapshot = await server.recommendations.run_once(now=now)
+    assert (snapshot.total_projects, snapshot.today_new, snapshot.week_new) == (12, 8, 8)
+    assert "今日新增: 8" in snapshot.stats_markdown
+    assert len(snapshot.daily) == DAILY_PICK_SIZE
+    # 同一天内结果稳定，第二天轮换
+    assert snapshot.daily == RecommendationScheduler._daily_pick(snapshot.pool, now)
+    assert snapshot.daily != RecommendationScheduler._daily_pick(snapshot.pool, now + timedelta(days=1))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+增量刷新测试
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select
+
+from mcp_search_server.models.database import Project
+
+
+async def stored(server, name: str) -> Project:
+    async with server._read_session() as session:
+        return (await session.execute(select(Project).where(Project.name == name))).scalar_one()
+
+
+async def test_incremental_refresh_skips_unchanged_repos(make_server, github_api):
+    github_api.add_repo("owner/alpha", stargazers_count=50)
+    github_api.add_repo("owner/beta", stargazers_count=5)
+    server = make_server(github={"api_base_url": github_api.url})
+
+    first = await server.refresh_projects()
+    assert (first["status"], first["new_projects"], first["skipped_projects"]) == ("success", 2, 0)
+
+    second = await server.refresh_projects()
+    assert (second["new_projects"], second["updated_projects"], second["skipped_projects"]) == (0, 0, 2)
+    assert github_api.count("/repos/owner/alpha") == 1
+
+    github_api.repos["owner/beta"]["pushed_at"] = "2999-01-01T00:00:00Z"
+    third = await server.refresh_projects()
+    assert (third["updated_projects"], third["skipped_projects"]) == (1, 1)
+
+
+async def test_failed_crawl_keeps_stored_stats(make_server, github_api):
+    github_api.add_repo("owner/alpha", stargazers_count=50, forks_count=7)
+    server = make_server(github={"api_base_url": github_api.url})
+    await server.refresh_projects()
+    before = await stored(server, "alpha")
+
+    github_api.repos["owner/alpha"]["pushed_at"] = "2999-01-01T00:00:00Z"
+    github_api.fail("/repos/owner/alpha", 403)
+    result = await server.refresh_projects()
+    assert (result["status"], result["updated_projects"], result["failed_projects"]) == ("success", 0, 1)
+    after = await stored(server, "alpha")
+    assert (after.stars, after.forks, after.last_crawled_at) == (50, 7, before.last_crawled_at)
+
+    # 失败的仓库仍被视为有变更，下一次增量刷新重试
+    github_api.responses.clear()
+    retried = await server.refresh_projects()
+    assert (retried["updated_projects"], retried["failed_projects"]) == (1, 0)
+    assert (await stored(server, "alpha")).last_crawled_at > before.last_crawled_at
+
+
+async def test_tags_come_from_topics_not_readme_headings(make_server, github_api):
+    github_api.add_repo(
+        "owner/alpha",
+        readme="# Alpha\n\n## Installation\n\n## License\n",
+        topics=["mcp-server", "database", "postgres"]
+    )
+    server = make_server(github={"api_base_url": github_api.url})
+    await server.refresh_projects()
+    results = await server._search("", fuzzy=False)
+    assert (results["items"][0]["categories"], sorted(results["items"][0]["tags"])) == ([], ["database", "postgres"])
+
+
+async def test_refresh_replaces_topic_tags_and_keeps_categories(make_server, github_api):
+    github_api.add_repo("owner/alpha", topics=["database", "postgres"])
+    server = make_server(github={"api_base_url": github_api.url})
+    await server.refresh_projects()
+    # awesome列表或目录仓库写入的分类
+    async with server._session() as session:
+        await server._project_service(session).upsert_projects(
+            [{"repo_url": github_api.repos["owner/alpha"]["html_url"], "categories": ["Databases"]}],
+            replace_labels=False, mark_crawled=False
+        )
+
+    github_api.repos["owner/alpha"].update(topics=["database", "sqlite"], pushed_at="2999-01-01T00:00:00Z")
+    await server.refresh_projects()
+    item = (await server._search("", fuzzy=False))["items"][0]
+    assert (item["categories"], sorted(item["tags"])) == (["Databases"], ["database", "sqlite"])
+
+
+async def test_changes_are_fetched_while_the_cache_entry_is_fresh(make_server, github_api):
+    github_api.add_repo("owner/alpha", stargazers_count=50)
+    server = make_server(github={"api_base_url": github_api.url})
+    await server.refresh_projects()
+    before = await stored(server, "alpha")
+
+    # 默认缓存配置下刚缓存的仓库发生变化，刷新必须拿到新数据
+    github_api.repos["owner/alpha"].update(stargazers_count=80, pushed_at="2999-01-01T00:00:00Z")
+    started = datetime.utcnow()
+    result = await server.refresh_projects()
+    assert result["updated_projects"] == 1
+    after = await stored(server, "alpha")
+    assert after.stars == 80
+    assert github_api.count("/repos/owner/alpha", 200) == 2
+    # last_crawled_at是本次请求发出的时间
+    assert before.last_crawled_at < started <= after.last_crawled_at
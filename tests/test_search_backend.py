@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+全文检索后端测试
+"""
+
+import pytest
+
+from mcp_search_server.services.search_backend import (
+    LikeSearchBackend, SQLiteFTSBackend, create_search_backend, parse_query
+)
+
+from .helpers import make_project, seed
+
+
+def test_parse_query_splits_phrases_and_prefix_terms():
+    assert parse_query('"Model Context" file*  db') == [
+        {"type": "phrase", "terms": ["model", "context"]},
+        {"type": "prefix", "terms": ["file"]},
+        {"type": "prefix", "terms": ["db"]},
+    ]
+    assert parse_query("  ") == []
+
+
+def test_match_expression_quotes_operators():
+    assert SQLiteFTSBackend.build_match_expression('weather "open api" NEAR') == '"weather"* AND "open api" AND "near"*'
+    assert SQLiteFTSBackend.build_match_expression("-*:()") == ""
+
+
+async def test_backend_selection(make_server):
+    server = make_server()
+    assert isinstance(create_search_backend(server.engine), SQLiteFTSBackend)
+    assert isinstance(create_search_backend(server.engine, "like"), LikeSearchBackend)
+    with pytest.raises(ValueError):
+        create_search_backend(server.engine, "elasticsearch")
+
+
+async def names(server, query):
+    return sorted(item["name"] for item in (await server._search(query, size=50, fuzzy=False))["items"])
+
+
+@pytest.mark.parametrize("backend", ["fts5", "like"])
+async def test_prefix_phrase_and_symbol_queries(make_server, backend):
+    server = make_server(search={"backend": backend, "store": False})
+    await seed(server, [
+        make_project(1, name="filesystem", description="Read files on disk", readme_content=""),
+        make_project(2, name="weather", description="Open weather forecasts", readme_content=""),
+        make_project(3, name="c++ tools", description="Build c++ projects", readme_content=""),
+    ])
+    assert await names(server, "file") == ["filesystem"]
+    # LIKE匹配整个查询子串，FTS5按词匹配，与词序无关
+    assert await names(server, "forecasts weather") == (["weather"] if backend == "fts5" else [])
+    assert await names(server, '"open weather"') == (["weather"] if backend == "fts5" else [])
+    assert await names(server, "c++") == ["c++ tools"]
+    assert await names(server, 'NEAR( "AND') == []
+
+
+async def test_fts_index_follows_writes_and_is_rebuilt_for_existing_rows(make_server):
+    seeded = make_server(search={"backend": "like", "store": False})
+    await seed(seeded, [make_project(1, name="weather", description="Forecasts", readme_content="")])
+    await seeded.stop()
+
+    server = make_server(search={"backend": "fts5", "store": False})
+    assert await names(server, "forecasts") == ["weather"]
+    await seed(server, [make_project(1, name="weather", description="Climate alerts", readme_content="")])
+    assert await names(server, "forecasts") == []
+    assert await names(server, "climate") == ["weather"]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+语义索引测试，需要安装semantic扩展（numpy）
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from mcp_search_server.services.semantic_index import SemanticIndex  # noqa: E402
+
+from .helpers import make_project, seed  # noqa: E402
+
+TOPICS = {
+    "database": "postgres sql query tables schema database rows",
+    "weather": "weather forecast temperature rain climate alerts",
+    "browser": "browser web page scraping html automation chrome",
+}
+
+
+def corpus(count_per_topic: int = 6):
+    records = []
+    for topic, words in TOPICS.items():
+        for index in range(count_per_topic):
+            records.append({
+                "id": len(records) + 1,
+                "name": f"{topic}-server-{index}",
+                "description": words,
+                "readme_content": f"{words} {words.split()[index % 3]}",
+            })
+    return records
+
+
+def test_update_embeds_only_changed_records():
+    records = corpus()
+    index = SemanticIndex(dimensions=8)
+    first = index.update(records)
+    assert (first["embedded"], first["reused"], first["refit"]) == (len(records), 0, True)
+
+    records[0] = {**records[0], "description": "completely different text"}
+    second = index.update(records[:-1])
+    assert (second["embedded"], second["reused"], second["removed"], second["refit"]) == (1, len(records) - 2, 2, False)
+
+
+def test_search_ranks_by_meaning_and_respects_allowed_ids():
+    records = corpus()
+    index = SemanticIndex(dimensions=8)
+    index.update(records)
+    ranked = index.search("sql tables", limit=5)
+    names = {record["id"]: record["name"] for record in records}
+    assert ranked and all(names[project_id].startswith("database") for project_id, _ in ranked)
+
+    weather_ids = [record["id"] for record in records if record["name"].startswith("weather")]
+    restricted = index.search("sql tables", limit=5, allowed_ids=weather_ids)
+    assert all(project_id in weather_ids for project_id, _ in restricted)
+    assert index.search("zzzz-unknown-term") == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = SemanticIndex(dimensions=8)
+    index.update(corpus())
+    index.save(str(tmp_path))
+    loaded = SemanticIndex(dimensions=8)
+    assert loaded.load(str(tmp_path))
+    assert loaded.search("weather forecast", limit=3) == index.search("weather forecast", limit=3)
+    assert not SemanticIndex(dimensions=4).load(str(tmp_path))
+
+
+async def test_semantic_and_hybrid_modes(make_server):
+    server = make_server(semantic={"enabled": True, "dimensions": 8}, search={"min_score": 0.0})
+    await seed(server, [make_project(record["id"], **{key: record[key] for key in ("name", "description", "readme_content")})
+                        for record in corpus()])
+    semantic = await server._search("sql tables", mode="semantic", fuzzy=False, size=3)
+    assert [item["name"].split("-")[0] for item in semantic["items"]] == ["database"] * 3
+    hybrid = await server._search("weather", mode="hybrid", fuzzy=False, size=3)
+    assert hybrid["items"][0]["name"].startswith("weather")
+    with pytest.raises(ValueError):
+        await server._search("weather", mode="semantic", facets=True)
+
+
+async def test_semantic_mode_requires_configuration(make_server):
+    server = make_server()
+    with pytest.raises(ValueError):
+        await server._search("weather", mode="semantic")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索快照测试
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from mcp_search_server.models.database import Project
+from mcp_search_server.services.snapshot import SearchSnapshot
+
+from .helpers import make_project, seed
+
+CREATED_AT = datetime(2024, 3, 1, 12, 0)
+
+
+async def build_source(make_server, tmp_path) -> str:
+    """在一个数据库中写入项目（id不连续、创建时间较早）并构建快照，返回快照路径"""
+    path = str(tmp_path / "search.snapshot")
+    source = make_server(
+        database={"url": f"sqlite+aiosqlite:///{tmp_path / 'source.db'}"},
+        snapshot={"path": path, "rebuild_on_write": False}
+    )
+    await seed(source, [make_project(index, categories=[f"c{index % 2}"]) for index in range(1, 11)])
+    async with source._session() as session:
+        service = source._project_service(session)
+        await service.delete_projects([make_project(index)["repo_url"] for index in (2, 3, 5)])
+        await session.execute(update(Project).values(created_at=CREATED_AT, updated_at=CREATED_AT))
+        await session.commit()
+    await source.build_snapshot()
+    await source.stop()
+    return path
+
+
+async def test_snapshot_round_trips_records(make_server, tmp_path):
+    path = await build_source(make_server, tmp_path)
+    snapshot = SearchSnapshot.open(path)
+    assert snapshot.size == 7
+    records = {record["repo_url"]: record for record in snapshot.iter_records()}
+    record = records[make_project(4)["repo_url"]]
+    assert (record["name"], record["stars"], record["categories"], record["tags"]) == ("project-4", 4, ["c0"], ["mcp"])
+    assert record["created_at"] == CREATED_AT
+    assert sorted(record["id"] for record in records.values()) == [1, 4, 6, 7, 8, 9, 10]
+
+
+def test_open_missing_or_invalid_snapshot(tmp_path):
+    assert SearchSnapshot.open(None) is None
+    assert SearchSnapshot.open(str(tmp_path / "missing.snapshot")) is None
+    invalid = tmp_path / "invalid.snapshot"
+    invalid.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        SearchSnapshot.open(str(invalid))
+
+
+async def test_seed_keeps_snapshot_ids_and_created_at(make_server, tmp_path):
+    path = await build_source(make_server, tmp_path)
+    server = make_server(snapshot={"path": path, "rebuild_on_write": False}, recommendation={"min_stars": 0})
+    await server.setup()
+
+    # 搜索（基于快照）返回的id在数据库中指向同一个项目
+    results = await server._search("project", size=20, fuzzy=False)
+    assert results["total"] == 7
+    async with server._read_session() as session:
+        rows = dict((await session.execute(select(Project.id, Project.repo_url))).all())
+        created = set((await session.execute(select(Project.created_at))).scalars())
+    assert {item["id"]: item["repo_url"] for item in results["items"]} == rows
+    assert created == {CREATED_AT}
+
+    snapshot = await server.recommendations.run_once(now=CREATED_AT + timedelta(days=30))
+    assert (snapshot.total_projects, snapshot.today_new, snapshot.week_new) == (7, 0, 0)
+
+    # 恢复后新写入的项目不会与快照中的id冲突
+    await seed(server, [make_project(99)])
+    async with server._read_session() as session:
+        assert (await session.execute(select(Project.id).where(Project.name == "project-99"))).scalar_one() == 11
+
+
+async def test_store_from_snapshot_matches_database_search(make_server, tmp_path):
+    path = await build_source(make_server, tmp_path)
+    from_snapshot = make_server(snapshot={"path": path, "rebuild_on_write": False}, search={"min_score": 0.0})
+    from_database = make_server(
+        database={"url": f"sqlite+aiosqlite:///{tmp_path / 'source.db'}"},
+        search={"store": False, "min_score": 0.0}
+    )
+    for query, options in (("", {}), ("project", {}), ("", {"filters": "category:c1"})):
+        expected = await from_database._search(query, size=5, fuzzy=False, **options)
+        actual = await from_snapshot._search(query, size=5, fuzzy=False, **options)
+        assert [item["id"] for item in actual["items"]] == [item["id"] for item in expected["items"]]
+        assert actual["total"] == expected["total"]
+
+
+async def test_store_and_fuzzy_index_load_without_decoding_records(make_server, tmp_path, monkeypatch):
+    path = await build_source(make_server, tmp_path)
+    snapshot = SearchSnapshot.open(path)
+    decoded = []
+    original = SearchSnapshot.record
+    monkeypatch.setattr(SearchSnapshot, "record", lambda self, doc: decoded.append(doc) or original(self, doc))
+
+    store = snapshot.to_store()
+    fuzzy_index = snapshot.fuzzy_index()
+    assert decoded == []
+    assert store.bits_for(category="c1").bit_count() == 3
+    assert store.to_dict(store.doc_by_id[4])["name"] == "project-4"
+    assert decoded == [store.doc_by_id[4]]
+
+    # 快照中的词表与由数据库构建的索引一致
+    database = make_server(database={"url": f"sqlite+aiosqlite:///{tmp_path / 'source.db'}"}, search={"store": False})
+    await database.setup()
+    assert fuzzy_index.words == database.fuzzy_index.words
+    assert [tuple(entry) for entry in fuzzy_index.completions] == [tuple(entry) for entry in database.fuzzy_index.completions]
+
+
+async def test_writes_do_not_rebuild_the_snapshot_by_default(make_server, tmp_path):
+    path = await build_source(make_server, tmp_path)
+    built = SearchSnapshot.open(path).directory["built_at"]
+    server = make_server(database={"url": f"sqlite+aiosqlite:///{tmp_path / 'source.db'}"}, snapshot={"path": path})
+    await server.setup()
+    assert server._store_snapshot is server.snapshot
+
+    # 写入后快照过期，搜索改用从数据库构建的存储
+    await seed(server, [make_project(42)])
+    assert server._store_snapshot is None
+    assert (await server._search("project-42", fuzzy=False))["total"] == 1
+    assert SearchSnapshot.open(path).directory["built_at"] == built
+    assert [job for job in server.jobs.jobs() if job.kind == "build_snapshot"] == []
+    await server.stop()
+
+    # 重启时快照与数据库不一致，不使用快照
+    restarted = make_server(database={"url": f"sqlite+aiosqlite:///{tmp_path / 'source.db'}"}, snapshot={"path": path})
+    await restarted.setup()
+    assert restarted._store_snapshot is None
+    assert (await restarted._search("project-42", fuzzy=False))["total"] == 1
+
+
+async def test_rebuild_on_write_runs_one_background_job(make_server, tmp_path):
+    path = await build_source(make_server, tmp_path)
+    server = make_server(
+        database={"url": f"sqlite+aiosqlite:///{tmp_path / 'source.db'}"},
+        snapshot={"path": path, "rebuild_on_write": True, "rebuild_delay": 0.5}
+    )
+    await seed(server, [make_project(42)])
+    await seed(server, [make_project(43)])
+    jobs = [job for job in server.jobs.jobs() if job.kind == "build_snapshot"]
+    assert len(jobs) == 1
+    await jobs[0].wait()
+    assert jobs[0].status == "succeeded"
+    assert SearchSnapshot.open(path).size == 9
+    assert server._snapshot_current
+    await server.stop()